@@ -0,0 +1,57 @@
+"""
+Compare the JSON backends of hrflow.core.codec on profiles of typical sizes.
+
+Usage:
+    python benchmarks/bench_json_codec.py
+"""
+
+import timeit
+
+from hrflow.core.codec import JSON_BACKENDS, JsonCodec
+
+
+def _profile_get(n_experiences: int) -> dict:
+    location = dict(text="12 Privet Drive, Little Whinging", lat=51.4, lng=-0.4)
+    skills = [dict(name=f"skill {i}", type="hard", value=None) for i in range(15)]
+    section = dict(
+        title="Magic Investigator",
+        description="Solving mysteries about the Sorcerer's stone. " * 20,
+        location=location,
+        date_start="2002-04-01T00:00:00+0000",
+        date_end="2002-07-01T00:00:00+0000",
+        skills=skills,
+        tasks=[dict(name=f"task {i}", value=None) for i in range(5)],
+    )
+    return dict(
+        key="0" * 40,
+        text="Harry James Potter, Sorcerer Apprentice. " * 100 * n_experiences,
+        info=dict(full_name="Harry James Potter", email="harry@hogwarts.net"),
+        experiences=[dict(section, company="Hogwarts")] * n_experiences,
+        educations=[dict(section, school="Hogwarts")] * n_experiences,
+        skills=skills * 3,
+    )
+
+
+def main(number: int = 200) -> None:
+    codecs = []
+    for name in JSON_BACKENDS:
+        try:
+            codecs.append(JsonCodec(name))
+        except ImportError:
+            print(f"{name}: not installed")
+
+    for n_experiences in (2, 10, 50):
+        profile = _profile_get(n_experiences)
+        payload = JsonCodec("json").dumps_bytes(profile)
+        print(f"\nprofile of {len(payload) / 1024:.0f} KB ({number} runs)")
+        for codec in codecs:
+            dumps = timeit.timeit(lambda: codec.dumps_bytes(profile), number=number)
+            loads = timeit.timeit(lambda: codec.loads(payload), number=number)
+            print(
+                f"{codec.name:>8}: dumps {dumps / number * 1e3:.3f} ms, loads"
+                f" {loads / number * 1e3:.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare the webhook signature decoding and verification with the former
+implementation (character by character translation, py2-compat wrappers and
+an HMAC keyed for each request).
+
+Usage:
+    python benchmarks/bench_webhook_decode.py
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import timeit
+from types import SimpleNamespace
+
+from hrflow.webhook import Webhook
+from hrflow.webhook import base64Wrapper as base64W
+from hrflow.webhook import bytesutils, hmacutils
+
+SECRET = "webhook-secret"
+
+
+def _legacy_strtr(inp, fr, to):
+    res = ""
+    for c in inp:
+        for idx, c_to_replace in enumerate(fr):
+            if c == c_to_replace and idx < len(to):
+                c = to[idx]
+        res = res + c
+    return res
+
+
+def _legacy_base64_urldecode(inp):
+    inp = _legacy_strtr(inp, "-_", "+/")
+    byte_inp = base64W.decodebytes(bytesutils.strtobytes(inp, "ascii"))
+    return byte_inp.decode("ascii")
+
+
+def _legacy_decode_request(encoded_request):
+    encoded_sign, payload = encoded_request.split(".", 2)[:2]
+    sign = _legacy_base64_urldecode(encoded_sign)
+    data = _legacy_base64_urldecode(payload)
+    utf8_payload = bytesutils.strtobytes(data, "utf8")
+    utf8_wb_secret = bytesutils.strtobytes(SECRET, "utf8")
+    hasher = hmac.new(utf8_wb_secret, utf8_payload, hashlib.sha256)
+    if not hmacutils.compare_digest(hasher.hexdigest(), sign):
+        raise ValueError("Error: invalid signature.")
+    return json.loads(data)
+
+
+def _signature_header(event: dict) -> str:
+    payload = json.dumps(event).encode("ascii")
+    signature = hmac.new(SECRET.encode(), payload, hashlib.sha256).hexdigest()
+    return ".".join(
+        base64.urlsafe_b64encode(part).decode("ascii")
+        for part in (signature.encode("ascii"), payload)
+    )
+
+
+def main(number: int = 2000) -> None:
+    webhook = Webhook(SimpleNamespace(webhook_secret=SECRET))
+    for size in (0, 1000, 10000):
+        event = dict(
+            type="profile.parse.success",
+            message="profile parsed",
+            profile=dict(key="0" * 40, text="Harry James Potter " * (size // 19)),
+        )
+        header = _signature_header(event)
+        assert _legacy_decode_request(header) == webhook._decode_request(header)
+        legacy = timeit.timeit(lambda: _legacy_decode_request(header), number=number)
+        current = timeit.timeit(lambda: webhook._decode_request(header), number=number)
+        print(
+            f"header of {len(header) / 1024:.1f} KB: legacy"
+            f" {legacy / number * 1e6:.1f} us, current {current / number * 1e6:.1f}"
+            f" us ({legacy / current:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,28 @@ def format_item_payload(item, provider_key, key, reference=None, email=None):
     return payload
 
 
+def require_numpy():
+    """Raise an ImportError if numpy, an optional dependency, is not installed"""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "numpy is required for this feature, install it with `pip install"
+            " hrflow[numpy]`"
+        )
+
+
+def require_pyarrow():
+    """Raise an ImportError if pyarrow, an optional dependency, is not installed"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "pyarrow is required for this feature, install it with `pip install"
+            " hrflow[parquet]`"
+        )
+
+
 def get_files_from_dir(dir_path, is_recurcive):
     file_res = []
     files_path = os.listdir(dir_path)
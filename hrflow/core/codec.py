@@ -0,0 +1,92 @@
+"""
+JSON encoding and decoding of the requests and responses.
+
+The fastest installed backend among orjson, ujson and the standard library json
+is used by default. Another one can be selected with `set_json_backend`.
+"""
+
+import importlib
+import json
+import typing as t
+
+JSON_BACKENDS = ("orjson", "ujson", "json")
+
+
+class JsonCodec:
+    """dumps/loads functions of a JSON backend"""
+
+    def __init__(self, name: str):
+        if name not in JSON_BACKENDS:
+            raise ValueError(f"JSON backend must be in {JSON_BACKENDS}")
+        self.name = name
+        self.module = importlib.import_module(name)
+
+    def dumps_bytes(self, obj: t.Any) -> bytes:
+        """Serialize obj to UTF-8 encoded JSON"""
+        try:
+            if self.name == "orjson":
+                return self.module.dumps(obj, option=self.module.OPT_NON_STR_KEYS)
+            if self.name == "ujson":
+                return self.module.dumps(obj, escape_forward_slashes=False).encode()
+        except (TypeError, OverflowError):
+            # Fallback on the standard library for the values it supports only
+            pass
+        return json.dumps(obj).encode()
+
+    def dumps(self, obj: t.Any) -> str:
+        """Serialize obj to a JSON string"""
+        if self.name == "json":
+            return json.dumps(obj)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, data: t.Union[str, bytes]) -> t.Any:
+        """Deserialize a JSON string or UTF-8 encoded bytes"""
+        return self.module.loads(data)
+
+
+def _best_backend() -> str:
+    for name in JSON_BACKENDS:
+        try:
+            importlib.import_module(name)
+            return name
+        except ImportError:
+            continue
+    return "json"
+
+
+_codec = JsonCodec(_best_backend())
+
+
+def set_json_backend(name: t.Optional[str] = None) -> JsonCodec:
+    """
+    Select the JSON backend used by the package
+
+    Args:
+        name:                   <Optional[str]>
+                                "orjson", "ujson" or "json". If None, the fastest
+                                installed backend is selected.
+
+    Returns:
+        <JsonCodec>
+        The selected codec
+    """
+    global _codec
+    _codec = JsonCodec(name or _best_backend())
+    return _codec
+
+
+def get_json_codec() -> JsonCodec:
+    """The codec currently used by the package"""
+    return _codec
+
+
+def dumps(obj: t.Any) -> str:
+    return _codec.dumps(obj)
+
+
+def dumps_bytes(obj: t.Any) -> bytes:
+    return _codec.dumps_bytes(obj)
+
+
+def loads(data: t.Union[str, bytes]) -> t.Any:
+    return _codec.loads(data)
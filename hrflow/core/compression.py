@@ -0,0 +1,159 @@
+"""
+Compression of the request bodies and byte counters of the transfers.
+
+The responses are negotiated in gzip or deflate and decoded by requests, the
+JSON request bodies can be compressed by setting `request_compression` on the
+client. Every call is measured in a `Transfer`, accumulated in the client
+`transfer_stats`.
+"""
+
+import gzip
+import threading
+import typing as t
+import zlib
+
+ACCEPT_ENCODING = "gzip, deflate"
+REQUEST_ENCODINGS = [None, "gzip", "deflate"]
+# Encodings of the responses decoded by requests (urllib3)
+RESPONSE_ENCODINGS = ("identity", "gzip", "x-gzip", "deflate")
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+DEFAULT_COMPRESSION_LEVEL = 6
+
+
+def compress_body(
+    body: bytes, encoding: str, level: int = DEFAULT_COMPRESSION_LEVEL
+) -> bytes:
+    """Compress a request body with the gzip or deflate Content-Encoding"""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level)
+    if encoding == "deflate":
+        return zlib.compress(body, level)
+    raise ValueError(f"encoding must be in {REQUEST_ENCODINGS[1:]}")
+
+
+def check_content_encoding(response) -> str:
+    """
+    Check that the body of a response has been decoded, raise a ValueError if
+    the server used an encoding that was not negotiated.
+    """
+    encoding = response.headers.get("Content-Encoding", "identity").lower()
+    supported = getattr(response.raw, "CONTENT_DECODERS", RESPONSE_ENCODINGS)
+    for part in encoding.split(","):
+        part = part.strip()
+        if part and part != "identity" and part not in supported:
+            raise ValueError(f"Unsupported response Content-Encoding: {encoding}")
+    return encoding
+
+
+def _body_size(body: t.Any) -> int:
+    if isinstance(body, str):
+        return len(body.encode())
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    return 0
+
+
+class Transfer(t.NamedTuple):
+    """Bytes sent and received by a call"""
+
+    method: str
+    endpoint: str
+    # Request body, as sent and before compression
+    bytes_sent: int
+    bytes_sent_raw: int
+    # Response body, as received and after decoding. For streamed responses the
+    # body is not read yet and both are 0.
+    bytes_received: int
+    bytes_received_raw: int
+    content_encoding: str
+
+    @classmethod
+    def from_response(
+        cls,
+        endpoint: str,
+        response,
+        raw_size: t.Optional[int] = None,
+        stream: bool = False,
+    ) -> "Transfer":
+        """
+        Measure a response of requests
+
+        Args:
+            endpoint:               <str>
+                                    The resource endpoint
+            response:               <requests.Response>
+            raw_size:               <Optional[int]>
+                                    Size of the request body before compression
+            stream:                 <bool>
+                                    Whether the response body is not read yet
+        """
+        bytes_sent = _body_size(response.request.body)
+        encoding = check_content_encoding(response)
+        bytes_received = bytes_received_raw = 0
+        if not stream:
+            bytes_received_raw = len(response.content)
+            tell = getattr(response.raw, "tell", None)
+            # Bytes pulled over the wire by urllib3, before decoding
+            bytes_received = tell() if callable(tell) else bytes_received_raw
+        return cls(
+            method=response.request.method,
+            endpoint=endpoint,
+            bytes_sent=bytes_sent,
+            bytes_sent_raw=bytes_sent if raw_size is None else raw_size,
+            bytes_received=bytes_received,
+            bytes_received_raw=bytes_received_raw,
+            content_encoding=encoding,
+        )
+
+
+class TransferStats:
+    """
+    Byte counters accumulated over the calls of a client.
+
+    The `Transfer` of the last call made by the current thread is available in
+    `last`.
+    """
+
+    _FIELDS = ("bytes_sent", "bytes_sent_raw", "bytes_received", "bytes_received_raw")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.bytes_sent = 0
+            self.bytes_sent_raw = 0
+            self.bytes_received = 0
+            self.bytes_received_raw = 0
+
+    @property
+    def last(self) -> t.Optional[Transfer]:
+        return getattr(self._local, "transfer", None)
+
+    def record(self, transfer: Transfer) -> Transfer:
+        self._local.transfer = transfer
+        with self._lock:
+            self.calls += 1
+            for field in self._FIELDS:
+                setattr(self, field, getattr(self, field) + getattr(transfer, field))
+        return transfer
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes not transferred thanks to the compression, in both directions"""
+        return self.to_dict()["bytes_saved"]
+
+    def to_dict(self) -> t.Dict[str, int]:
+        with self._lock:
+            stats = {field: getattr(self, field) for field in self._FIELDS}
+            stats["calls"] = self.calls
+        stats["bytes_saved"] = (
+            stats["bytes_sent_raw"]
+            - stats["bytes_sent"]
+            + stats["bytes_received_raw"]
+            - stats["bytes_received"]
+        )
+        return stats
@@ -0,0 +1,190 @@
+"""
+Request lifecycle hooks and timings of the calls made by a client.
+
+Usage:
+>>> def trace(event):
+...     if event.timings.total > 1:
+...         print(event.method, event.endpoint, event.timings.to_dict())
+>>> client.hooks.add("after_response", trace)
+"""
+
+import socket
+import threading
+import time
+import typing as t
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+HOOK_NAMES = (
+    # (event), before the first attempt, event.headers can be modified
+    "before_request",
+    # (event), with the final response
+    "after_response",
+    # (event), when the call fails without response, event.error is raised
+    "on_error",
+    # (event, delay), before sleeping delay seconds and sending the call again
+    "on_retry",
+    # (seconds, function_name), after rate_limiter slept before a call
+    "on_rate_limit_wait",
+)
+
+# Timings of the current call, and time slept by rate_limiter before it
+_local = threading.local()
+
+Hook = t.Callable[..., t.Any]
+
+
+class RequestTimings:
+    """
+    Durations in seconds of the phases of a call, None when not measured
+
+    connect (the DNS resolution and the TCP connection, to the first address
+    reachable) and tls are only measured with `connection_timings=True` on the
+    client, when a new connection is opened. ttfb runs from the request sent to
+    the response headers received, and download until the body is read (not
+    measured for streamed responses).
+    """
+
+    __slots__ = (
+        "rate_limit_wait",
+        "connect",
+        "tls",
+        "ttfb",
+        "download",
+        "total",
+    )
+
+    def __init__(self, rate_limit_wait: float = 0.0):
+        self.rate_limit_wait = rate_limit_wait
+        self.connect: t.Optional[float] = None
+        self.tls: t.Optional[float] = None
+        self.ttfb: t.Optional[float] = None
+        self.download: t.Optional[float] = None
+        self.total: t.Optional[float] = None
+
+    def to_dict(self) -> t.Dict[str, t.Optional[float]]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class RequestEvent:
+    """
+    A call of the client, passed to the hooks
+
+    Attributes:
+        method:                      <str>
+                                     The HTTP method
+        endpoint:                    <str>
+                                     The resource endpoint, e.g. "profile/parsing"
+        url:                         <str>
+        headers:                     <Dict[str, str]>
+                                     The request headers
+        attempt:                     <int>
+                                     0, then the number of retries
+        timings:                     <RequestTimings>
+                                     The timings of the current attempt
+        response:                    <Optional[requests.Response]>
+        error:                       <Optional[Exception]>
+        context:                     <Dict[str, Any]>
+                                     Free for the hooks, e.g. to keep a span from
+                                     before_request to after_response
+    """
+
+    def __init__(self, method: str, endpoint: str, url: str, headers: dict):
+        self.method = method
+        self.endpoint = endpoint
+        self.url = url
+        self.headers = headers
+        self.attempt = 0
+        self.timings = RequestTimings(pop_rate_limit_wait())
+        self.response = None
+        self.error: t.Optional[BaseException] = None
+        self.context: t.Dict[str, t.Any] = {}
+
+
+class RequestHooks:
+    """The callbacks of the lifecycle of the calls of a client, see HOOK_NAMES"""
+
+    def __init__(self):
+        self._hooks: t.Dict[str, t.List[Hook]] = {name: [] for name in HOOK_NAMES}
+
+    def _check(self, name: str) -> None:
+        if name not in self._hooks:
+            raise ValueError(
+                f"{name} is not a valid hook, expected one of {HOOK_NAMES}"
+            )
+
+    def add(self, name: str, hook: Hook) -> Hook:
+        """Add a hook, called after the ones added before"""
+        self._check(name)
+        if not callable(hook):
+            raise TypeError(f"{hook} is not callable")
+        self._hooks[name].append(hook)
+        return hook
+
+    def remove(self, name: str, hook: Hook) -> None:
+        self._check(name)
+        self._hooks[name].remove(hook)
+
+    def emit(self, name: str, *args: t.Any) -> None:
+        for hook in self._hooks[name]:
+            hook(*args)
+
+
+def add_rate_limit_wait(seconds: float) -> None:
+    """Count the time slept by rate_limiter in the timings of the next call"""
+    _local.rate_limit_wait = getattr(_local, "rate_limit_wait", 0.0) + seconds
+
+
+def pop_rate_limit_wait() -> float:
+    seconds = getattr(_local, "rate_limit_wait", 0.0)
+    _local.rate_limit_wait = 0.0
+    return seconds
+
+
+def set_current_timings(timings: t.Optional[RequestTimings]) -> None:
+    """Set the timings where the connections opened by this thread are measured"""
+    _local.timings = timings
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self) -> socket.socket:
+        timings = getattr(_local, "timings", None)
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        if timings is not None:
+            # Timed as a whole, urllib3 tries all the resolved addresses
+            timings.connect = time.perf_counter() - start
+        return sock
+
+
+class _TimedHTTPSConnection(HTTPSConnection, _TimedHTTPConnection):
+    def connect(self) -> None:
+        timings = getattr(_local, "timings", None)
+        start = time.perf_counter()
+        super().connect()
+        if timings is not None and timings.connect is not None:
+            timings.tls = time.perf_counter() - start - timings.connect
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingAdapter(HTTPAdapter):
+    """
+    Transport adapter measuring the DNS resolution, the TCP connection and the
+    TLS handshake of the new connections, in the timings of the current call
+    """
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
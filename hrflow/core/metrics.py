@@ -0,0 +1,211 @@
+"""
+Per-endpoint metrics of the calls made by a client.
+
+Usage:
+>>> client.metrics.snapshot()["POST profile/parsing/file"]["latency"]["mean"]
+>>> print(client.metrics.to_prometheus())
+"""
+
+import bisect
+import collections
+import threading
+import typing as t
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_PROMETHEUS_PREFIX = "hrflow_client"
+
+
+class EndpointMetrics:
+    """Counters of the calls of a method on an endpoint"""
+
+    def __init__(self, method: str, endpoint: str, bucket_count: int):
+        self.method = method
+        self.endpoint = endpoint
+        # Calls with a response
+        self.count = 0
+        # Calls failed without response, e.g. on a connection error
+        self.errors = 0
+        self.retries = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        # Calls per latency bucket, the last one above the last bound
+        self.latency_counts = [0] * (bucket_count + 1)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.status_codes: t.Counter[int] = collections.Counter()
+
+
+class RequestMetrics:
+    """
+    Count, latency histogram, bytes in and out, status codes and retries of
+    the calls of a client, per method and endpoint
+
+    Args:
+        latency_buckets:             <Sequence[float]>
+                                     The upper bounds in seconds of the buckets
+                                     of the latency histograms
+    """
+
+    def __init__(self, latency_buckets: t.Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        if list(latency_buckets) != sorted(set(latency_buckets)):
+            raise ValueError("latency_buckets must be increasing")
+        self.latency_buckets = tuple(latency_buckets)
+        self._lock = threading.Lock()
+        self._endpoints: t.Dict[t.Tuple[str, str], EndpointMetrics] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints = {}
+
+    def _get(self, method: str, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get((method, endpoint))
+        if metrics is None:
+            metrics = self._endpoints[(method, endpoint)] = EndpointMetrics(
+                method, endpoint, len(self.latency_buckets)
+            )
+        return metrics
+
+    def record(
+        self,
+        method: str,
+        endpoint: str,
+        latency: float,
+        status_code: t.Optional[int] = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        """
+        Record a call
+
+        Args:
+            method:                  <str>
+                                     The HTTP method
+            endpoint:                <str>
+                                     The resource endpoint, e.g. "profile/parsing"
+            latency:                 <float>
+                                     The duration of the call in seconds
+            status_code:             <Optional[int]>
+                                     The status of the response, None if the
+                                     call failed without response
+            bytes_sent:              <int>
+                                     The size of the request body
+            bytes_received:          <int>
+                                     The size of the response body
+        """
+        bucket = bisect.bisect_left(self.latency_buckets, latency)
+        with self._lock:
+            metrics = self._get(method, endpoint)
+            if status_code is None:
+                metrics.errors += 1
+            else:
+                metrics.count += 1
+                metrics.status_codes[status_code] += 1
+            metrics.latency_sum += latency
+            metrics.latency_max = max(metrics.latency_max, latency)
+            metrics.latency_counts[bucket] += 1
+            metrics.bytes_sent += bytes_sent
+            metrics.bytes_received += bytes_received
+
+    def record_retry(self, method: str, endpoint: str) -> None:
+        """Record that a call is sent again"""
+        with self._lock:
+            self._get(method, endpoint).retries += 1
+
+    def snapshot(self) -> t.Dict[str, t.Dict[str, t.Any]]:
+        """
+        The metrics, by "METHOD endpoint"
+
+        Returns:
+            <Dict[str, Dict[str, Any]]>
+            For each method and endpoint: count, errors, retries, bytes_sent,
+            bytes_received, status_codes (count by status) and latency (sum,
+            mean, max and buckets, the cumulative count of calls by upper bound)
+        """
+        with self._lock:
+            snapshot = {}
+            for metrics in self._endpoints.values():
+                calls = metrics.count + metrics.errors
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(
+                    (*self.latency_buckets, float("inf")), metrics.latency_counts
+                ):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                snapshot[f"{metrics.method} {metrics.endpoint}"] = {
+                    "method": metrics.method,
+                    "endpoint": metrics.endpoint,
+                    "count": metrics.count,
+                    "errors": metrics.errors,
+                    "retries": metrics.retries,
+                    "bytes_sent": metrics.bytes_sent,
+                    "bytes_received": metrics.bytes_received,
+                    "status_codes": dict(metrics.status_codes),
+                    "latency": {
+                        "sum": metrics.latency_sum,
+                        "mean": metrics.latency_sum / calls if calls else 0.0,
+                        "max": metrics.latency_max,
+                        "buckets": buckets,
+                    },
+                }
+            return snapshot
+
+    def to_prometheus(self, prefix: str = DEFAULT_PROMETHEUS_PREFIX) -> str:
+        """
+        The metrics in the Prometheus text exposition format
+
+        Args:
+            prefix:                  <str>
+                                     The prefix of the metric names
+
+        Returns:
+            <str>
+            The requests_total (by status), request_errors_total,
+            request_retries_total, request_duration_seconds (histogram),
+            request_bytes_sent_total and response_bytes_received_total metrics,
+            labelled by method and endpoint
+        """
+        snapshot = self.snapshot()
+        # name, type, description, field of the snapshot
+        families = [
+            ("requests_total", "counter", "Calls with a response", "status_codes"),
+            ("request_errors_total", "counter", "Calls without response", "errors"),
+            ("request_retries_total", "counter", "Calls sent again", "retries"),
+            ("request_duration_seconds", "histogram", "Call durations", "latency"),
+            ("request_bytes_sent_total", "counter", "Request bytes", "bytes_sent"),
+            (
+                "response_bytes_received_total",
+                "counter",
+                "Response bytes",
+                "bytes_received",
+            ),
+        ]
+        lines = []
+        for name, kind, description, field in families:
+            name = f"{prefix}_{name}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for metrics in snapshot.values():
+                labels = (
+                    f'method="{_escape(metrics["method"])}",'
+                    f'endpoint="{_escape(metrics["endpoint"])}"'
+                )
+                value = metrics[field]
+                if field == "latency":
+                    for bound, count in value["buckets"].items():
+                        le = "+Inf" if bound == float("inf") else repr(float(bound))
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {value['sum']!r}")
+                    count = metrics["count"] + metrics["errors"]
+                    lines.append(f"{name}_count{{{labels}}} {count}")
+                elif field == "status_codes":
+                    for status, count in sorted(value.items()):
+                        lines.append(f'{name}{{{labels},status="{status}"}} {count}')
+                else:
+                    lines.append(f"{name}{{{labels}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
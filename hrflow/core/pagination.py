@@ -0,0 +1,119 @@
+import inspect
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PREFETCH = 2
+
+Page = t.Dict[str, t.Any]
+ScoredItem = t.Tuple[t.Dict[str, t.Any], t.Optional[float]]
+
+
+def check_page(response: Page) -> Page:
+    """
+    Check that a paginated response is successful, raise a ValueError otherwise.
+    """
+    if response.get("code") != 200:
+        raise ValueError(
+            "Unable to retrieve page: {code} {message}".format(
+                code=response.get("code"), message=response.get("message")
+            )
+        )
+    return response
+
+
+def page_items(response: Page, item_field: t.Optional[str]) -> t.List[ScoredItem]:
+    """
+    Pair the items of a page with their score.
+
+    The score of an item is the last value of its prediction, None for endpoints
+    returning no predictions (searching, storing).
+    """
+    if item_field is None:
+        return [(item, None) for item in response.get("data") or []]
+    data = response.get("data") or {}
+    items = data.get(item_field) or []
+    predictions = data.get("predictions") or []
+    scores = [prediction[-1] if prediction else None for prediction in predictions]
+    scores += [None] * (len(items) - len(scores))
+    return list(zip(items, scores))
+
+
+def bind_pages(
+    list_method: t.Callable[..., Page], args: t.Sequence, kwargs: t.Dict[str, t.Any]
+) -> t.Callable[[int], Page]:
+    """
+    Bind the arguments of a `list` method but its page, for `iterate_pages`.
+    A ValueError is raised if a page is given, positionally or by name.
+    """
+    bound = inspect.signature(list_method).bind_partial(*args, **kwargs)
+    if "page" in bound.arguments or "page" in kwargs:
+        raise ValueError("page can not be given, all the pages are iterated")
+    return lambda page: list_method(*args, page=page, **kwargs)
+
+
+def iterate_pages(
+    list_page: t.Callable[[int], Page],
+    item_field: t.Optional[str],
+    prefetch: int = DEFAULT_PREFETCH,
+    max_items: t.Optional[int] = None,
+    min_score: t.Optional[float] = None,
+) -> t.Iterator[ScoredItem]:
+    """
+    Iterate over the items of a paginated endpoint while the next `prefetch`
+    pages are being retrieved in background threads.
+
+    Args:
+        list_page:              <Callable[[int], dict]>
+                                Function returning the response of a page
+        item_field:             <Optional[str]>
+                                Field of `data` holding the items, "profiles" or
+                                "jobs". None if `data` is the list of the items
+                                (storing).
+        prefetch:               <int>
+                                Number of pages retrieved ahead of the current one
+        max_items:              <Optional[int]>
+                                Stop after this number of items
+        min_score:              <Optional[float]>
+                                Stop at the first item scored below this value.
+                                The results must be sorted by decreasing score
+                                (sort_by="scoring", order_by="desc").
+
+    Yields:
+        <Tuple[dict, Optional[float]]>
+        Each item with its score
+    """
+    if max_items is not None and max_items <= 0:
+        return
+    first_page = check_page(list_page(1))
+    max_page = first_page.get("meta", {}).get("maxPage") or 1
+
+    executor = ThreadPoolExecutor(max_workers=max(1, prefetch))
+    pending = {}
+    next_page = 2
+    count = 0
+    try:
+        page, response = 1, first_page
+        while True:
+            while next_page <= max_page and len(pending) < prefetch:
+                pending[next_page] = executor.submit(list_page, next_page)
+                next_page += 1
+
+            for item, score in page_items(response, item_field):
+                if min_score is not None and score is not None and score < min_score:
+                    return
+                yield item, score
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+
+            page += 1
+            if page > max_page:
+                return
+            if page not in pending:
+                pending[page] = executor.submit(list_page, page)
+                next_page = max(next_page, page + 1)
+            response = check_page(pending.pop(page).result())
+    finally:
+        for future in pending.values():
+            future.cancel()
+        executor.shutdown(wait=False)
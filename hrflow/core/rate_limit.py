@@ -1,5 +1,8 @@
 from functools import wraps
-from time import sleep, time
+from threading import Lock
+from time import perf_counter, sleep, time
+
+from .hooks import add_rate_limit_wait, pop_rate_limit_wait
 
 DEFAULT_MAX_REQUESTS_PER_MINUTE = None
 DEFAULT_MIN_SLEEP_PER_REQUEST = 0
@@ -25,6 +28,9 @@ def rate_limiter(func):
     """
     requests_per_minute = 0
     last_reset_time = time()
+    # The counters are shared by the threads calling the function (e.g. the
+    # pages fetched ahead), the ones over the limit wait in turn
+    lock = Lock()
 
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -36,24 +42,45 @@ def rate_limiter(func):
         )
         nonlocal requests_per_minute, last_reset_time
 
-        current_time = time()
-        elapsed_time = current_time - last_reset_time
+        start = perf_counter()
+        slept = min_sleep_per_request > 0
+        with lock:
+            current_time = time()
+            elapsed_time = current_time - last_reset_time
 
-        if elapsed_time < SECONDS_IN_MINUTE:
-            requests_per_minute += 1
-            if (
-                max_requests_per_minute is not None
-                and requests_per_minute > max_requests_per_minute
-            ):
+            if elapsed_time < SECONDS_IN_MINUTE:
+                requests_per_minute += 1
+                if (
+                    max_requests_per_minute is not None
+                    and requests_per_minute > max_requests_per_minute
+                ):
 
-                sleep(SECONDS_IN_MINUTE - elapsed_time)
+                    sleep(SECONDS_IN_MINUTE - elapsed_time)
+                    slept = True
+                    requests_per_minute = 0
+                    last_reset_time = time()
+            else:
                 requests_per_minute = 0
-                last_reset_time = time()
-        else:
-            requests_per_minute = 0
-            last_reset_time = current_time
+                last_reset_time = current_time
 
         sleep(min_sleep_per_request)
-        return func(*args, **kwargs)
+        waited = perf_counter() - start
+        if slept:
+            # Counted in the timings of the call made by func, and reported to
+            # the hooks of the client of API methods
+            add_rate_limit_wait(waited)
+            hooks = (
+                getattr(getattr(args[0], "client", None), "hooks", None)
+                if args
+                else None
+            )
+            if hooks is not None:
+                hooks.emit("on_rate_limit_wait", waited, func.__qualname__)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if slept:
+                # Not charged to a later call when func made no request
+                pop_rate_limit_wait()
 
     return wrapper
@@ -0,0 +1,207 @@
+"""
+Incremental decoding of JSON responses holding a large array.
+"""
+
+import codecs
+import json
+import re
+import typing as t
+
+from .pagination import check_page
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_END = re.compile(r'["\\]')
+# Characters continuing a number
+_NUMBER_PART = frozenset("0123456789.eE+-")
+_decoder = json.JSONDecoder()
+
+
+class JsonArrayStream:
+    """
+    Iterate over the elements of an array field of a JSON object received in
+    chunks, without buffering the whole document.
+
+    The other top-level fields (code, message, meta, ...) are stored in `fields`
+    as they are parsed. They are all available once the iteration is over.
+    """
+
+    def __init__(self, chunks: t.Iterable[bytes], field: str = "data"):
+        self.field = field
+        self.fields: t.Dict[str, t.Any] = {}
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._exhausted = False
+
+    def _read(self) -> bool:
+        """Append the next chunk to the buffer, False once the stream is over"""
+        if self._exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            self._buffer += self._utf8.decode(b"", final=True)
+            return False
+        # Drop the part of the buffer already parsed
+        self._buffer = self._buffer[self._position :] + self._utf8.decode(chunk)
+        self._position = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non whitespace character, without consuming it"""
+        while True:
+            self._position = _WHITESPACE.match(self._buffer, self._position).end()
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read():
+                raise ValueError("Unexpected end of the JSON stream")
+
+    def _expect(self, characters: str) -> str:
+        character = self._peek()
+        if character not in characters:
+            raise ValueError(
+                f"Expecting one of {characters!r} at {self._position}, got"
+                f" {character!r}"
+            )
+        self._position += 1
+        return character
+
+    def _scan(self) -> None:
+        """
+        Read chunks until the buffer holds the whole object, array or string
+        starting at the position. Each character is scanned once, instead of
+        decoding the value again from its start after every chunk.
+        """
+        offset, depth, in_string = self._position, 0, False
+        while True:
+            while True:
+                if in_string:
+                    match = _STRING_END.search(self._buffer, offset)
+                    if match is None:
+                        offset = len(self._buffer)
+                        break
+                    if match.group() == "\\":
+                        if match.end() == len(self._buffer):
+                            # The escaped character is in the next chunk
+                            offset = match.start()
+                            break
+                        offset = match.end() + 1
+                        continue
+                    in_string = False
+                else:
+                    match = _STRUCTURE.search(self._buffer, offset)
+                    if match is None:
+                        offset = len(self._buffer)
+                        break
+                    if match.group() == '"':
+                        in_string = True
+                    elif match.group() in "[{":
+                        depth += 1
+                    else:
+                        depth -= 1
+                offset = match.end()
+                if not in_string and depth <= 0:
+                    return
+            scanned = offset - self._position
+            if not self._read():
+                return
+            offset = self._position + scanned
+
+    def _value(self) -> t.Any:
+        if self._peek() in '"[{':
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                self._scan()
+                value, end = _decoder.raw_decode(self._buffer, self._position)
+            self._position = end
+            return value
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._read():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk,
+            # e.g. 1 then .5, or 1. then 5 decoded as 1 up to the "."
+            if (
+                end == len(self._buffer) or self._buffer[end] in _NUMBER_PART
+            ) and self._read():
+                continue
+            self._position = end
+            return value
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._position += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == self.field and self._peek() == "[":
+                self._position += 1
+                if self._peek() == "]":
+                    self._position += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(",]") == "]":
+                            break
+                self.fields[key] = None
+            else:
+                self.fields[key] = self._value()
+            if self._expect(",}") == "}":
+                break
+
+
+class ResponseArrayStream(JsonArrayStream):
+    """
+    JsonArrayStream over the body of a streamed response, closed once iterated.
+
+    `fields` holds the other top-level fields, e.g. `fields["meta"]["maxPage"]`
+    to paginate. A ValueError is raised by the iteration if the response is
+    not successful.
+    """
+
+    def __init__(self, response, field: str = "data"):
+        super().__init__(response.iter_content(chunk_size=DEFAULT_CHUNK_SIZE), field)
+        self.response = response
+
+    def __iter__(self) -> t.Iterator[t.Any]:
+        try:
+            if self.response.headers.get("Content-Type") != "application/json":
+                check_page({
+                    "code": self.response.status_code,
+                    "message": "A generic error occurred on the server",
+                })
+            yield from super().__iter__()
+            check_page(self.fields)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.response.close()
+
+
+def stream_response(response, field: str = "data") -> ResponseArrayStream:
+    """
+    Iterate over the elements of the `field` array of a streamed response
+
+    Args:
+        response:               <requests.Response>
+                                A response requested with stream=True
+        field:                  <str>
+                                Top-level field holding the array
+
+    Returns:
+        <ResponseArrayStream>
+        Yields the elements of the array as soon as they are received. The
+        other top-level fields (code, message, meta) are in its `fields`.
+        A ValueError is raised if the response is not successful.
+    """
+    return ResponseArrayStream(response, field)
@@ -1,6 +1,8 @@
 import os
 import re
 
+from .codec import loads
+
 KEY_REGEX = r"^[0-9a-f]{40}$"
 STAGE_VALUES = [None, "new", "yes", "later", "no"]
 SORT_BY_VALUES = [
@@ -115,4 +117,4 @@ def validate_response(response):
             "code": response.status_code,
             "message": "A generic error occurred on the server",
         }
-    return response.json()
+    return loads(response.content)
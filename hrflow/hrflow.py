@@ -1,9 +1,27 @@
-import json
+import time
 
 import requests as req
 
 from .auth import Auth
 from .board import Board
+from .core import codec
+from .core.compression import (
+    ACCEPT_ENCODING,
+    DEFAULT_COMPRESSION_THRESHOLD,
+    REQUEST_ENCODINGS,
+    Transfer,
+    TransferStats,
+    compress_body,
+)
+from .core.hooks import (
+    RequestEvent,
+    RequestHooks,
+    RequestTimings,
+    TimingAdapter,
+    set_current_timings,
+)
+from .core.metrics import RequestMetrics
+from .core.validation import validate_value
 from .job import Job
 from .profile import Profile
 from .rating import Rating
@@ -13,6 +31,10 @@ from .tracking import Tracking
 from .webhook import Webhook
 
 CLIENT_API_URL = "https://api.hrflow.ai/v1/"
+# Only the idempotent calls are sent again
+RETRY_METHODS = ("GET", "PUT")
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+DEFAULT_RETRY_BACKOFF = 0.5
 
 
 class Hrflow(object):
@@ -24,6 +46,11 @@ class Hrflow(object):
         api_secret=None,
         api_user=None,
         webhook_secret=None,
+        request_compression=None,
+        compression_threshold=DEFAULT_COMPRESSION_THRESHOLD,
+        max_retries=0,
+        retry_backoff=DEFAULT_RETRY_BACKOFF,
+        connection_timings=False,
     ):
         """
         Hrflow client. This class is the main entry point to the Hrflow API.
@@ -42,12 +69,51 @@ class Hrflow(object):
 
             webhook_secret:         <string>
 
+            request_compression:    <string>
+                                    Content-Encoding of the JSON request bodies:
+                                    None (default), "gzip" or "deflate".
+
+            compression_threshold:  <int>
+                                    Bodies smaller than this number of bytes are
+                                    sent uncompressed.
+
+            max_retries:            <int>
+                                    Number of times a GET or PUT call is sent
+                                    again after a connection error or a 429, 502,
+                                    503 or 504 status. 0 by default.
+
+            retry_backoff:          <float>
+                                    Seconds before the first retry, doubled at
+                                    each retry. The Retry-After header of the
+                                    response is used instead when present.
+
+            connection_timings:     <bool>
+                                    Measure the connection (DNS resolution and TCP
+                                    connection) and TLS handshake of the calls, in
+                                    the timings passed to the hooks. The calls then
+                                    share a session, and its connections.
+
         Returns
             Hrflow client object
         """
         self.api_url = api_url
         self.auth_header = {"X-API-KEY": api_secret, "X-USER-EMAIL": api_user}
         self.webhook_secret = webhook_secret
+        self.request_compression = validate_value(
+            request_compression, REQUEST_ENCODINGS, "request_compression"
+        )
+        self.compression_threshold = compression_threshold
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.transfer_stats = TransferStats()
+        self.metrics = RequestMetrics()
+        self.hooks = RequestHooks()
+        self._session = None
+        if connection_timings:
+            self._session = req.Session()
+            adapter = TimingAdapter()
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
         self.auth = Auth(self)
         self.job = Job(self)
         self.profile = Profile(self)
@@ -71,10 +137,103 @@ class Hrflow(object):
     def _validate_args(self, bodyparams):
         for key, value in bodyparams.items():
             if isinstance(value, list):
-                bodyparams[key] = json.dumps(value)
+                bodyparams[key] = codec.dumps(value)
         return bodyparams
 
-    def get(self, resource_endpoint, query_params={}):
+    def _request(self, method, url, headers=None, raw_size=None, **kwargs):
+        """
+        Send a request, record its byte counters in transfer_stats and its
+        metrics, send it again on transient failures (see max_retries) and call
+        the hooks of its lifecycle.
+        """
+        headers = {
+            **self.auth_header,
+            "Accept-Encoding": ACCEPT_ENCODING,
+            **(headers or {}),
+        }
+        http_method = method.__name__.upper()
+        if self._session is not None:
+            method = getattr(self._session, method.__name__)
+        endpoint = url[len(self.api_url) :] if url.startswith(self.api_url) else url
+        event = RequestEvent(http_method, endpoint, url, headers)
+        self.hooks.emit("before_request", event)
+        retries = self.max_retries if http_method in RETRY_METHODS else 0
+        stream = kwargs.get("stream", False)
+        while True:
+            timings = event.timings
+            set_current_timings(timings)
+            start = time.perf_counter()
+            try:
+                response = method(url, headers=event.headers, **kwargs)
+                transfer = self.transfer_stats.record(
+                    Transfer.from_response(endpoint, response, raw_size, stream)
+                )
+            except Exception as error:
+                timings.total = time.perf_counter() - start
+                self.metrics.record(http_method, endpoint, timings.total)
+                event.response, event.error = None, error
+                if event.attempt >= retries or not isinstance(
+                    error, (req.ConnectionError, req.Timeout)
+                ):
+                    self.hooks.emit("on_error", event)
+                    raise
+            else:
+                timings.total = time.perf_counter() - start
+                # Until the response headers, the connection aside
+                timings.ttfb = response.elapsed.total_seconds() - sum(
+                    phase or 0.0 for phase in (timings.connect, timings.tls)
+                )
+                if not stream:
+                    timings.download = timings.total - response.elapsed.total_seconds()
+                self.metrics.record(
+                    http_method,
+                    endpoint,
+                    timings.total,
+                    response.status_code,
+                    transfer.bytes_sent,
+                    transfer.bytes_received,
+                )
+                event.response, event.error = response, None
+                if (
+                    event.attempt >= retries
+                    or response.status_code not in RETRY_STATUS_CODES
+                ):
+                    self.hooks.emit("after_response", event)
+                    return response
+            finally:
+                set_current_timings(None)
+            delay = self._retry_delay(event.response, event.attempt)
+            self.metrics.record_retry(http_method, endpoint)
+            self.hooks.emit("on_retry", event, delay)
+            time.sleep(delay)
+            event.attempt += 1
+            event.timings = RequestTimings()
+
+    def _retry_delay(self, response, attempt):
+        if response is None:
+            return self.retry_backoff * 2**attempt
+        response.close()
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return max(float(retry_after), 0)
+            except ValueError:  # an HTTP date
+                pass
+        return self.retry_backoff * 2**attempt
+
+    def _json_request(self, method, url, json):
+        """Send a json payload serialized with the package JSON codec."""
+        if json is None:
+            return self._request(method, url)
+        body = codec.dumps_bytes(json)
+        headers = {"Content-Type": "application/json"}
+        raw_size = len(body)
+        if self.request_compression and raw_size >= self.compression_threshold:
+            body = compress_body(body, self.request_compression)
+            headers["Content-Encoding"] = self.request_compression
+        return self._request(method, url, headers, raw_size, data=body)
+
+    def get(self, resource_endpoint, query_params={}, stream=False):
         """
         This a method for internal use only.
         It is used to make a GET request to the Hrflow API.
@@ -88,6 +247,10 @@ class Hrflow(object):
                                     The query parameters to be sent to the API. It
                                     must be a dictionary.
 
+            stream:                 <bool>
+                                    If True, the body is not downloaded until it is
+                                    read from the response object.
+
         Returns
             Make the corresponding GET request to the Hrflow API and returns the
             response object.
@@ -95,9 +258,9 @@ class Hrflow(object):
         url = self._create_request_url(resource_endpoint)
         if query_params:
             query_params = self._validate_args(query_params)
-            return req.get(url, headers=self.auth_header, params=query_params)
+            return self._request(req.get, url, params=query_params, stream=stream)
         else:
-            return req.get(url, headers=self.auth_header)
+            return self._request(req.get, url, stream=stream)
 
     def post(self, resource_endpoint, data={}, json={}, files=None):
         """
@@ -129,9 +292,11 @@ class Hrflow(object):
         url = self._create_request_url(resource_endpoint)
         if files:
             data = self._validate_args(data)
-            return req.post(url, headers=self.auth_header, files=files, data=data)
+            return self._request(req.post, url, files=files, data=data)
+        elif data:
+            return self._request(req.post, url, data=data)
         else:
-            return req.post(url, headers=self.auth_header, data=data, json=json)
+            return self._json_request(req.post, url, json)
 
     def patch(self, resource_endpoint, json={}):
         """
@@ -153,7 +318,7 @@ class Hrflow(object):
         """
         url = self._create_request_url(resource_endpoint)
         data = self._validate_args(json)
-        return req.patch(url, headers=self.auth_header, json=data)
+        return self._json_request(req.patch, url, data)
 
     def put(self, resource_endpoint, json={}):
         """
@@ -174,4 +339,4 @@ class Hrflow(object):
             response object.
         """
         url = self._create_request_url(resource_endpoint)
-        return req.put(url, headers=self.auth_header, json=json)
+        return self._json_request(req.put, url, json)
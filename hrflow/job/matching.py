@@ -1,5 +1,5 @@
-import json
-
+from ..core.codec import dumps
+from ..core.pagination import DEFAULT_PREFETCH, bind_pages, iterate_pages
 from ..core.rate_limit import rate_limiter
 from ..core.validation import (
     KEY_REGEX,
@@ -99,7 +99,7 @@ class JobMatching:
             "board_key": validate_key("Board", board_key, regex=KEY_REGEX),
             "job_key": validate_key("Key", job_key, regex=KEY_REGEX),
             "job_reference": validate_reference(job_reference),
-            "board_keys": json.dumps(validate_provider_keys(board_keys)),
+            "board_keys": dumps(validate_provider_keys(board_keys)),
             "limit": validate_limit(limit),
             "page": validate_page(page),
             "sort_by": validate_value(sort_by, SORT_BY_VALUES, "sort by"),
@@ -111,3 +111,37 @@ class JobMatching:
         params = {**query_params, **kwargs}
         response = self.client.get("jobs/matching", params)
         return validate_response(response)
+
+    def iterate(
+        self,
+        *args,
+        prefetch=DEFAULT_PREFETCH,
+        max_items=None,
+        min_score=None,
+        **kwargs,
+    ):
+        """
+        Iterate over the jobs of all the pages of `list`, the next pages being
+        retrieved in background while the current one is consumed.
+
+        Args:
+            *args, **kwargs:    Arguments of `list`, except page
+            prefetch:           <int> (default to 2)
+                                number of pages retrieved ahead
+            max_items:          <int> (Optional)
+                                stop after this number of jobs
+            min_score:          <float> (Optional)
+                                Stop at the first job scored below this value.
+                                Requires sort_by="scoring" and order_by="desc".
+
+        Yields
+            (job, score) pairs, score being None when no prediction is returned
+
+        """
+        return iterate_pages(
+            bind_pages(self.list, args, kwargs),
+            "jobs",
+            prefetch=prefetch,
+            max_items=max_items,
+            min_score=min_score,
+        )
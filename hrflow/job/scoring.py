@@ -1,5 +1,5 @@
-import json
-
+from ..core.codec import dumps
+from ..core.pagination import DEFAULT_PREFETCH, bind_pages, iterate_pages
 from ..core.rate_limit import rate_limiter
 from ..core.validation import (
     ORDER_BY_VALUES,
@@ -65,7 +65,7 @@ class JobScoring:
         """
 
         query_params = {
-            "board_keys": json.dumps(validate_provider_keys(board_keys)),
+            "board_keys": dumps(validate_provider_keys(board_keys)),
             "source_key": validate_key("Source", source_key),
             "profile_key": validate_key("Profile", profile_key),
             "use_agent": use_agent,
@@ -80,3 +80,37 @@ class JobScoring:
         params = {**query_params, **kwargs}
         response = self.client.get("jobs/scoring", params)
         return validate_response(response)
+
+    def iterate(
+        self,
+        *args,
+        prefetch=DEFAULT_PREFETCH,
+        max_items=None,
+        min_score=None,
+        **kwargs,
+    ):
+        """
+        Iterate over the jobs of all the pages of `list`, the next pages being
+        retrieved in background while the current one is consumed.
+
+        Args:
+            *args, **kwargs:    Arguments of `list`, except page
+            prefetch:           <int> (default to 2)
+                                number of pages retrieved ahead
+            max_items:          <int> (Optional)
+                                stop after this number of jobs
+            min_score:          <float> (Optional)
+                                Stop at the first job scored below this value.
+                                Requires sort_by="scoring" and order_by="desc".
+
+        Yields
+            (job, score) pairs, score being None when no prediction is returned
+
+        """
+        return iterate_pages(
+            bind_pages(self.list, args, kwargs),
+            "jobs",
+            prefetch=prefetch,
+            max_items=max_items,
+            min_score=min_score,
+        )
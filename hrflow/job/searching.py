@@ -1,5 +1,4 @@
-import json
-
+from ..core.codec import dumps
 from ..core.rate_limit import rate_limiter
 from ..core.validation import (
     ORDER_BY_VALUES,
@@ -52,7 +51,7 @@ class JobSearching:
         """
 
         query_params = {
-            "board_keys": json.dumps(validate_provider_keys(board_keys)),
+            "board_keys": dumps(validate_provider_keys(board_keys)),
             "stage": validate_value(stage, STAGE_VALUES),
             "limit": validate_limit(limit),
             "page": validate_page(page),
@@ -1,7 +1,7 @@
-import json
-
 from ..core import format_item_payload
+from ..core.codec import dumps
 from ..core.rate_limit import rate_limiter
+from ..core.streaming import stream_response
 from ..core.validation import (
     ORDER_BY_VALUES,
     SORT_BY_VALUES,
@@ -214,6 +214,7 @@ class JobStoring:
         sort_by="created_at",
         created_at_min=None,
         created_at_max=None,
+        stream=False,
     ):
         """
         This method allows you to retrieve the list of jobs stored in a Board.
@@ -255,6 +256,13 @@ class JobStoring:
             created_at_max:     <string>
                                 The maximum date of creation of the targeted Jobs.
                                 Format : "YYYY-MM-DD".
+            stream:             <boolean>
+                                If set to true, an iterator over the Jobs is
+                                returned instead of the response. The Jobs are
+                                decoded as they are received, without buffering
+                                the whole response. A ValueError is raised by the
+                                iterator if the request fails. Its `fields` hold
+                                the code, message and meta (e.g. maxPage).
         Returns:
             Applies the params to filter on Jobs in the targeted Boards and returns
             the response from the endpoint.
@@ -284,7 +292,7 @@ class JobStoring:
         """
 
         params = {
-            "board_keys": json.dumps(validate_provider_keys(board_keys)),
+            "board_keys": dumps(validate_provider_keys(board_keys)),
             "name": validate_key("Job", name),
             "key": validate_key("Job", key),
             "reference": validate_reference(reference),
@@ -300,5 +308,8 @@ class JobStoring:
             "created_at_max": created_at_max,  # TODO validate dates format
         }
 
+        if stream:
+            response = self.client.get("storing/jobs", params, stream=True)
+            return stream_response(response)
         response = self.client.get("storing/jobs", params)
         return validate_response(response)
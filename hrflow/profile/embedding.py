@@ -1,6 +1,5 @@
-import json
-
 from ..core import format_item_payload
+from ..core.codec import dumps
 from ..core.rate_limit import rate_limiter
 from ..core.validation import validate_response
 
@@ -35,6 +34,6 @@ class ProfileEmbedding:
         """
         query_params = format_item_payload("profile", source_key, key, reference, email)
         if fields:
-            query_params["fields"] = json.dumps(fields)
+            query_params["fields"] = dumps(fields)
         response = self.client.get("profile/embedding", query_params)
         return validate_response(response)
@@ -1,5 +1,5 @@
-import json
-
+from ..core.codec import dumps
+from ..core.pagination import DEFAULT_PREFETCH, bind_pages, iterate_pages
 from ..core.rate_limit import rate_limiter
 from ..core.validation import (
     KEY_REGEX,
@@ -99,7 +99,7 @@ class ProfileMatching:
             "source_key": validate_key("Source", source_key, regex=KEY_REGEX),
             "profile_key": validate_key("Key", profile_key, regex=KEY_REGEX),
             "profile_reference": validate_reference(profile_reference),
-            "source_keys": json.dumps(validate_provider_keys(source_keys)),
+            "source_keys": dumps(validate_provider_keys(source_keys)),
             "limit": validate_limit(limit),
             "page": validate_page(page),
             "sort_by": validate_value(sort_by, SORT_BY_VALUES, "sort by"),
@@ -111,3 +111,37 @@ class ProfileMatching:
         params = {**query_params, **kwargs}
         response = self.client.get("profiles/matching", params)
         return validate_response(response)
+
+    def iterate(
+        self,
+        *args,
+        prefetch=DEFAULT_PREFETCH,
+        max_items=None,
+        min_score=None,
+        **kwargs,
+    ):
+        """
+        Iterate over the profiles of all the pages of `list`, the next pages being
+        retrieved in background while the current one is consumed.
+
+        Args:
+            *args, **kwargs:    Arguments of `list`, except page
+            prefetch:           <int> (default to 2)
+                                number of pages retrieved ahead
+            max_items:          <int> (Optional)
+                                stop after this number of profiles
+            min_score:          <float> (Optional)
+                                Stop at the first profile scored below this value.
+                                Requires sort_by="scoring" and order_by="desc".
+
+        Yields
+            (profile, score) pairs, score being None when no prediction is returned
+
+        """
+        return iterate_pages(
+            bind_pages(self.list, args, kwargs),
+            "profiles",
+            prefetch=prefetch,
+            max_items=max_items,
+            min_score=min_score,
+        )
@@ -1,4 +1,4 @@
-import json
+import asyncio
 import os
 import shutil
 import uuid
@@ -6,8 +6,10 @@ import uuid
 from tqdm import tqdm
 
 from ..core import format_item_payload, get_files_from_dir
+from ..core.codec import dumps
 from ..core.rate_limit import rate_limiter
 from ..core.validation import validate_key, validate_reference, validate_response
+from .waiting import ParsingWaiter
 
 DEFAULT_FILE_NAME = "resume.pdf"
 
@@ -18,6 +20,7 @@ class ProfileParsing:
     def __init__(self, api):
         """Init."""
         self.client = api
+        self._waiter = None
 
     @rate_limiter
     def add_file(
@@ -79,9 +82,9 @@ class ProfileParsing:
             "profile_content_type": profile_content_type,
             "reference": validate_reference(reference),
             "created_at": created_at,
-            "labels": json.dumps(labels),
-            "tags": json.dumps(tags),
-            "metadatas": json.dumps(metadatas),
+            "labels": dumps(labels),
+            "tags": dumps(tags),
+            "metadatas": dumps(metadatas),
             "sync_parsing": sync_parsing,
             "sync_parsing_indexing": sync_parsing_indexing,
             "webhook_parsing_sending": webhook_parsing_sending,
@@ -198,6 +201,38 @@ class ProfileParsing:
         response = self.client.get("profile/parsing", query_params)
         return validate_response(response)
 
+    def wait(self, source_key, key=None, reference=None, timeout=None):
+        """
+        Wait for an asynchronous parsing (add_file with sync_parsing=0).
+
+        The future resolves when the profile.parse.success webhook of the profile
+        is received (see Webhook.receiver), or otherwise when the parsing is
+        found by polling `get` with an exponential backoff.
+
+        Args:
+            source_key:             <string>
+                                    source_key
+            key:                    <string>
+                                    key
+            reference:              <string>
+                                    profile_reference, when the key is unknown
+            timeout:                <float>
+                                    maximum time to wait in seconds
+
+        Returns
+            <concurrent.futures.Future> resolved with the response of `get`.
+            It fails with a ValueError on the profile.parse.error webhook and a
+            TimeoutError after the timeout.
+
+        """
+        if self._waiter is None:
+            self._waiter = ParsingWaiter(self)
+        return self._waiter.wait(source_key, key, reference, timeout)
+
+    async def wait_async(self, source_key, key=None, reference=None, timeout=None):
+        """Await an asynchronous parsing, see `wait`."""
+        return await asyncio.wrap_future(self.wait(source_key, key, reference, timeout))
+
 
 def move_to_failed_dir(file_path: str, move_failure_to: str):
     file_name = os.path.basename(file_path)
@@ -1,5 +1,5 @@
-import json
-
+from ..core.codec import dumps
+from ..core.pagination import DEFAULT_PREFETCH, bind_pages, iterate_pages
 from ..core.rate_limit import rate_limiter
 from ..core.validation import (
     ORDER_BY_VALUES,
@@ -52,7 +52,7 @@ class ProfileSearching:
         """
 
         query_params = {
-            "source_keys": json.dumps(validate_provider_keys(source_keys)),
+            "source_keys": dumps(validate_provider_keys(source_keys)),
             "stage": validate_value(stage, STAGE_VALUES, "stage"),
             "limit": validate_limit(limit),
             "page": validate_page(page),
@@ -63,3 +63,32 @@ class ProfileSearching:
         params = {**query_params, **kwargs}
         response = self.client.get("profiles/searching", params)
         return validate_response(response)
+
+    def iterate(
+        self,
+        *args,
+        prefetch=DEFAULT_PREFETCH,
+        max_items=None,
+        **kwargs,
+    ):
+        """
+        Iterate over the profiles of all the pages of `list`, the next pages being
+        retrieved in background while the current one is consumed.
+
+        Args:
+            *args, **kwargs:    Arguments of `list`, except page
+            prefetch:           <int> (default to 2)
+                                number of pages retrieved ahead
+            max_items:          <int> (Optional)
+                                stop after this number of profiles
+
+        Yields
+            (profile, score) pairs, score being None when no prediction is returned
+
+        """
+        return iterate_pages(
+            bind_pages(self.list, args, kwargs),
+            "profiles",
+            prefetch=prefetch,
+            max_items=max_items,
+        )
@@ -1,7 +1,7 @@
-import json
-
 from ..core import format_item_payload
+from ..core.codec import dumps
 from ..core.rate_limit import rate_limiter
+from ..core.streaming import stream_response
 from ..core.validation import (
     ORDER_BY_VALUES,
     SORT_BY_VALUES,
@@ -267,6 +267,7 @@ class ProfileStoring:
         sort_by="created_at",
         created_at_min=None,
         created_at_max=None,
+        stream=False,
     ):
         """
         This method allows you to retrieve the list of profiles stored in a Source.
@@ -309,6 +310,13 @@ class ProfileStoring:
             created_at_max:     <string>
                                 The maximum date of creation of the targeted Profiles.
                                 Format : "YYYY-MM-DD".
+            stream:             <boolean>
+                                If set to true, an iterator over the Profiles is
+                                returned instead of the response. The Profiles are
+                                decoded as they are received, without buffering
+                                the whole response. A ValueError is raised by the
+                                iterator if the request fails. Its `fields` hold
+                                the code, message and meta (e.g. maxPage).
         Returns:
             Applies the params to filter on Profiles in the targeted Sources and
             returns the response from the endpoint.
@@ -338,7 +346,7 @@ class ProfileStoring:
         """
 
         params = {
-            "source_keys": json.dumps(validate_provider_keys(source_keys)),
+            "source_keys": dumps(validate_provider_keys(source_keys)),
             "name": validate_key("Profile", name),
             "key": validate_key("Profile", key),
             "reference": validate_reference(reference),
@@ -353,5 +361,8 @@ class ProfileStoring:
             "created_at_min": created_at_min,  # TODO validate dates format
             "created_at_max": created_at_max,  # TODO validate dates format
         }
+        if stream:
+            response = self.client.get("storing/profiles", params, stream=True)
+            return stream_response(response)
         response = self.client.get("storing/profiles", params)
         return validate_response(response)
@@ -0,0 +1,253 @@
+"""
+Waiting for asynchronous parsings to complete.
+
+A wait resolves when the `profile.parse.success` or `profile.parse.error`
+webhook of the profile is received, or when `ProfileParsing.get` finds the
+parsing. Without a webhook receiver, `ProfileParsing.get` is polled with an
+exponential backoff, starting from the typical parsing duration observed so far.
+"""
+
+import heapq
+import itertools
+import random
+import statistics
+import threading
+import time
+import typing as t
+from collections import deque
+from concurrent.futures import Future
+
+from ..webhook import EVENT_PROFILE_PARSE_ERROR, EVENT_PROFILE_PARSE_SUCCESS
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_MAX_POLL_INTERVAL = 60.0
+DEFAULT_BACKOFF = 2.0
+# Number of parsing durations kept to adapt the first poll
+_DURATION_HISTORY = 100
+
+
+class _Wait:
+    __slots__ = (
+        "query",
+        "future",
+        "started",
+        "interval",
+        "deadline",
+        "due",
+        "resolved",
+    )
+
+    def __init__(
+        self, query: t.Dict[str, t.Any], interval: float, timeout: t.Optional[float]
+    ):
+        self.query = query
+        self.future: Future = Future()
+        # Not cancellable, the timeout stops waiting
+        self.future.set_running_or_notify_cancel()
+        self.started = time.monotonic()
+        self.interval = interval
+        self.deadline = None if timeout is None else self.started + timeout
+        # Time of the next poll, the former ones in the schedule are ignored
+        self.due = self.started
+        self.resolved = False
+
+    @property
+    def ids(self) -> t.List[t.Tuple[str, str]]:
+        return [
+            (field, self.query[field])
+            for field in ("key", "reference")
+            if self.query[field] is not None
+        ]
+
+
+class ParsingWaiter:
+    """
+    Resolve futures when the parsings of profiles complete
+
+    Args:
+        parsing:                     <ProfileParsing>
+                                     Used to poll `ProfileParsing.get`, and to
+                                     listen to the webhooks of its client
+        poll_interval:               <float>
+                                     The minimum time in seconds between polls
+        max_poll_interval:           <float>
+                                     The maximum time between polls. While the
+                                     webhooks are received, polls only happen at
+                                     this interval, in case a delivery is lost.
+        backoff:                     <float>
+                                     The factor of the interval after each poll
+    """
+
+    def __init__(
+        self,
+        parsing: t.Any,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        if poll_interval <= 0 or max_poll_interval < poll_interval or backoff < 1:
+            raise ValueError(
+                "Expected 0 < poll_interval <= max_poll_interval and backoff >= 1"
+            )
+        self.parsing = parsing
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self._durations: t.Deque[float] = deque(maxlen=_DURATION_HISTORY)
+        self._lock = threading.Lock()
+        self._scheduled = threading.Condition(self._lock)
+        # (time, order, wait) of the next poll of each wait
+        self._schedule: t.List[t.Tuple[float, int, _Wait]] = []
+        self._order = itertools.count()
+        # ("key", key) or ("reference", reference) -> waits
+        self._waits: t.Dict[t.Tuple[str, str], t.List[_Wait]] = {}
+        self._thread: t.Optional[threading.Thread] = None
+        self.webhook = getattr(parsing.client, "webhooks", None)
+        if self.webhook is not None:
+            self.webhook._add_listener(self._on_event)
+
+    @property
+    def listening(self) -> bool:
+        """Whether the parsing webhooks are received"""
+        return self.webhook is not None and self.webhook.listening
+
+    def _first_interval(self) -> float:
+        if self.listening:
+            return self.max_poll_interval
+        if not self._durations:
+            return self.poll_interval
+        # Half of the typical parsing duration, so that most parsings complete
+        # within two polls
+        median = statistics.median(self._durations)
+        return min(max(median / 2, self.poll_interval), self.max_poll_interval)
+
+    def wait(
+        self,
+        source_key: str,
+        key: t.Optional[str] = None,
+        reference: t.Optional[str] = None,
+        timeout: t.Optional[float] = None,
+    ) -> Future:
+        """
+        Wait for the parsing of a profile to complete
+
+        Args:
+            source_key:              <str>
+                                     The source of the profile
+            key:                     <Optional[str]>
+                                     The key of the profile
+            reference:               <Optional[str]>
+                                     The reference of the profile, when its key
+                                     is not known yet
+            timeout:                 <Optional[float]>
+                                     The maximum time to wait in seconds
+
+        Returns:
+            <Future>
+            Resolved with the response of `ProfileParsing.get`. Fails with a
+            ValueError on a `profile.parse.error` webhook and a TimeoutError
+            after the timeout.
+        """
+        if key is None and reference is None:
+            raise ValueError("A key or a reference is required")
+        query = dict(source_key=source_key, key=key, reference=reference)
+        wait = _Wait(query, self._first_interval(), timeout)
+        with self._lock:
+            for wait_id in wait.ids:
+                self._waits.setdefault(wait_id, []).append(wait)
+            # Checked right away, the parsing may be complete already
+            self._push(wait, wait.started)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return wait.future
+
+    def _push(self, wait: _Wait, when: float) -> None:
+        if wait.deadline is not None:
+            when = min(when, wait.deadline)
+        wait.due = when
+        heapq.heappush(self._schedule, (when, next(self._order), wait))
+        self._scheduled.notify()
+
+    def _resolve(self, wait: _Wait, result=None, error=None) -> None:
+        with self._lock:
+            if wait.resolved:
+                return
+            wait.resolved = True
+            for wait_id in wait.ids:
+                self._waits[wait_id].remove(wait)
+                if not self._waits[wait_id]:
+                    del self._waits[wait_id]
+            if error is None:
+                self._durations.append(time.monotonic() - wait.started)
+        # Out of the lock, the callbacks of the future may wait again
+        if error is None:
+            wait.future.set_result(result)
+        else:
+            wait.future.set_exception(error)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while True:
+                    if not self._waits:
+                        # Idle, the next wait starts a new thread. The polls
+                        # left in the schedule are of resolved waits.
+                        self._schedule.clear()
+                        self._thread = None
+                        return
+                    if not self._schedule:
+                        self._scheduled.wait()
+                        continue
+                    delay = self._schedule[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._scheduled.wait(delay)
+                when, _, wait = heapq.heappop(self._schedule)
+            if when == wait.due and not wait.resolved:
+                self._poll(wait)
+
+    def _poll(self, wait: _Wait) -> None:
+        try:
+            response = self.parsing.get(**wait.query)
+        except Exception:  # e.g. a network error, polled again
+            response = None
+        if isinstance(response, dict) and response.get("code") == 200:
+            self._resolve(wait, result=response)
+            return
+        now = time.monotonic()
+        if wait.deadline is not None and now >= wait.deadline:
+            self._resolve(wait, error=TimeoutError("The parsing is not complete"))
+            return
+        if self.listening:
+            interval = self.max_poll_interval
+        else:
+            interval = wait.interval
+            wait.interval = min(wait.interval * self.backoff, self.max_poll_interval)
+        with self._lock:
+            # Jittered, so that the waits started together do not poll together
+            self._push(wait, now + interval * random.uniform(0.8, 1.0))
+
+    def _on_event(self, event: t.Dict[str, t.Any]) -> None:
+        if event.get("type") not in (
+            EVENT_PROFILE_PARSE_SUCCESS,
+            EVENT_PROFILE_PARSE_ERROR,
+        ):
+            return
+        profile = event.get("profile") or {}
+        with self._lock:
+            waits = {
+                wait
+                for field in ("key", "reference")
+                if profile.get(field) is not None
+                for wait in self._waits.get((field, profile[field]), [])
+            }
+            if event["type"] == EVENT_PROFILE_PARSE_SUCCESS:
+                # The parsing is fetched by the polling thread
+                for wait in waits:
+                    self._push(wait, time.monotonic())
+                return
+        for wait in waits:
+            self._resolve(
+                wait, error=ValueError(event.get("message") or "The parsing failed")
+            )
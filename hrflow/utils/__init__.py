@@ -1,5 +1,22 @@
 # noqa: F401
-from .evaluation import generate_parsing_evaluation_report
-from .scoring import is_valid_for_scoring
-from .searching import is_valid_for_searching
-from .storing import get_all_jobs, get_all_profiles
+from .embedding import (
+    EmbeddingStore,
+    fetch_job_embeddings,
+    fetch_profile_embeddings,
+)
+from .evaluation import generate_parsing_evaluation_report, prefetch_templates
+from .matching import ExactIndex, IVFIndex
+from .scoring import (
+    bulk_is_valid_for_scoring,
+    is_valid_for_scoring,
+    score_across_sources,
+    score_jobs_batch,
+    score_profiles_batch,
+)
+from .searching import bulk_is_valid_for_searching, is_valid_for_searching
+from .storing import (
+    get_all_jobs,
+    get_all_profiles,
+    iterate_all_jobs,
+    iterate_all_profiles,
+)
@@ -0,0 +1,301 @@
+import base64
+import json
+import os
+import typing as t
+
+from tqdm import tqdm
+
+from ..core import require_numpy
+from ..core.pagination import check_page
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+VECTORS_FILENAME = "vectors.f32"
+INDEX_FILENAME = "index.json"
+VECTOR_DTYPE = "<f4"
+API_VECTOR_DTYPE = ">f4"
+
+
+def decode_embedding(
+    data: t.Union[str, t.List[float], t.List[t.List[float]]],
+    dimension: t.Optional[int] = None,
+) -> "np.ndarray":
+    """
+    Decode the `data` field of a profile/job embedding response into a vector
+
+    The API returns the embedding either as a base64 string of big-endian float32
+    values or as a (nested) list of floats. When several vectors are returned
+    (sequences), they are mean-pooled into a single one.
+
+    Args:
+        data:                   <str> or <list>
+                                The `data` field of the embedding response
+        dimension:              <Optional[int]>
+                                Size of a single vector, used to split a base64
+                                payload holding several vectors
+
+    Returns:
+        <np.ndarray>
+        A 1-D float32 vector
+    """
+    require_numpy()
+    if isinstance(data, str):
+        vectors = np.frombuffer(base64.b64decode(data), dtype=API_VECTOR_DTYPE)
+        if dimension:
+            vectors = vectors.reshape(-1, dimension)
+    else:
+        vectors = np.asarray(data, dtype=np.float32)
+
+    if vectors.ndim > 1:
+        vectors = vectors.reshape(-1, vectors.shape[-1]).mean(axis=0)
+    return vectors.astype(VECTOR_DTYPE)
+
+
+class EmbeddingStore:
+    """
+    Embeddings of profiles or jobs kept on disk in a directory holding:
+        - vectors.f32: a row-major little-endian float32 matrix
+        - index.json: the vector dimension and the item keys, in row order
+
+    Vectors are exposed as a read-only memory map, so any number of worker
+    processes can open the same store and share the pages of the OS cache
+    without copying them.
+    """
+
+    def __init__(self, path: str, dimension: t.Optional[int] = None):
+        """
+        Open the store located at `path`, it is created on first append
+
+        Args:
+            path:                   <str>
+                                    Directory of the store
+            dimension:              <Optional[int]>
+                                    Size of the vectors. Inferred from the first
+                                    appended vectors if not provided.
+        """
+        require_numpy()
+        self.path = path
+        self.dimension = dimension
+        self.keys: t.List[str] = []
+        self._rows: t.Dict[str, int] = {}
+        self._vectors = None
+        self.refresh()
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.path, VECTORS_FILENAME)
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.path, INDEX_FILENAME)
+
+    def refresh(self) -> None:
+        """Reload the index, to see the rows appended by another process"""
+        if not os.path.isfile(self.index_path):
+            return
+        with open(self.index_path, "r") as file:
+            index = json.load(file)
+        if self.dimension is not None and index["dimension"] != self.dimension:
+            raise ValueError(
+                f"Store dimension is {index['dimension']}, not {self.dimension}"
+            )
+        self.dimension = index["dimension"]
+        self.keys = index["keys"]
+        self._rows = {key: row for row, key in enumerate(self.keys)}
+        self._vectors = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def row(self, key: str) -> int:
+        """Row of the vector of the item `key`"""
+        return self._rows[key]
+
+    @property
+    def vectors(self) -> "np.ndarray":
+        """Read-only (len(store), dimension) matrix mapped from disk"""
+        if self._vectors is None:
+            if not self.keys:
+                return np.empty((0, self.dimension or 0), dtype=VECTOR_DTYPE)
+            self._vectors = np.memmap(
+                self.vectors_path,
+                dtype=VECTOR_DTYPE,
+                mode="r",
+                shape=(len(self.keys), self.dimension),
+            )
+        return self._vectors
+
+    def get(self, key: str) -> "np.ndarray":
+        """Vector of the item `key`"""
+        return self.vectors[self._rows[key]]
+
+    def append(
+        self, keys: t.Sequence[str], vectors: t.Union["np.ndarray", t.Sequence]
+    ) -> int:
+        """
+        Append vectors to the store. Keys already stored are skipped.
+
+        The vectors are written before the index, so a store interrupted in
+        the middle of an append still opens with its previous content.
+
+        Args:
+            keys:                   <Sequence[str]>
+                                    Keys of the items
+            vectors:                <np.ndarray>
+                                    (len(keys), dimension) matrix
+
+        Returns:
+            <int>
+            Number of appended vectors
+        """
+        vectors = np.asarray(vectors, dtype=VECTOR_DTYPE).reshape(len(keys), -1)
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"vectors must be of dimension {self.dimension}, not {vectors.shape[1]}"
+            )
+
+        new_rows = []
+        new_keys = []
+        seen = set()
+        for row, key in enumerate(keys):
+            if key in self._rows or key in seen:
+                continue
+            new_rows.append(row)
+            new_keys.append(key)
+            seen.add(key)
+        if not new_keys:
+            return 0
+
+        os.makedirs(self.path, exist_ok=True)
+        mode = "r+b" if os.path.isfile(self.vectors_path) else "wb"
+        with open(self.vectors_path, mode) as file:
+            # Anything past the indexed rows is left over by an interrupted append
+            file.seek(len(self.keys) * self.dimension * vectors.itemsize)
+            file.write(np.ascontiguousarray(vectors[new_rows]).tobytes())
+            file.truncate()
+
+        keys = self.keys + new_keys
+        tmp_index_path = f"{self.index_path}.tmp"
+        with open(tmp_index_path, "w") as file:
+            json.dump({"dimension": self.dimension, "keys": keys}, file)
+        os.replace(tmp_index_path, self.index_path)
+
+        self.keys = keys
+        self._rows.update({key: row for row, key in enumerate(keys)})
+        self._vectors = None
+        return len(new_keys)
+
+
+def _fetch_embeddings(
+    store: EmbeddingStore,
+    list_page: t.Callable[[int], t.Dict[str, t.Any]],
+    get_embedding: t.Callable[[str], t.Dict[str, t.Any]],
+    description: str,
+    show_progress: bool,
+) -> EmbeddingStore:
+    first_page = check_page(list_page(1))
+    page_range = range(1, first_page["meta"]["maxPage"] + 1)
+    if show_progress:
+        page_range = tqdm(page_range, description)
+    for page in page_range:
+        keys = []
+        vectors = []
+        response = first_page if page == 1 else check_page(list_page(page))
+        for item in response["data"]:
+            if item["key"] in store:
+                continue
+            data = get_embedding(item["key"]).get("data")
+            if not data:
+                continue
+            keys.append(item["key"])
+            vectors.append(decode_embedding(data, store.dimension))
+        if keys:
+            store.append(keys, np.stack(vectors))
+
+    return store
+
+
+def fetch_profile_embeddings(
+    client: "Hrflow",  # noqa: F821
+    source_key: str,
+    path: str,
+    dimension: t.Optional[int] = None,
+    show_progress: bool = False,
+) -> EmbeddingStore:
+    """
+    Fetch the embeddings of all the profiles of a source into a local store
+
+    Profiles already in the store are not fetched again, so calling this function
+    on an existing store only appends the new profiles. Profiles without embedding
+    are skipped.
+
+    Args:
+        client:                 <hrflow.Client>
+                                hrflow client
+        source_key:             <string>
+                                source_key
+        path:                   <string>
+                                Directory of the store
+        dimension:              <Optional[int]>
+                                Size of the vectors
+        show_progress:          <bool>
+                                Show the progress bar
+
+    Returns
+        <EmbeddingStore>:
+        The store of the source embeddings
+    """
+    return _fetch_embeddings(
+        EmbeddingStore(path, dimension),
+        lambda page: client.profile.storing.list(source_keys=[source_key], page=page),
+        lambda key: client.profile.embedding.get(source_key, key=key),
+        "Retrieving profile embeddings",
+        show_progress,
+    )
+
+
+def fetch_job_embeddings(
+    client: "Hrflow",  # noqa: F821
+    board_key: str,
+    path: str,
+    dimension: t.Optional[int] = None,
+    show_progress: bool = False,
+) -> EmbeddingStore:
+    """
+    Fetch the embeddings of all the jobs of a board into a local store
+
+    Jobs already in the store are not fetched again, so calling this function
+    on an existing store only appends the new jobs. Jobs without embedding
+    are skipped.
+
+    Args:
+        client:                 <hrflow.Client>
+                                hrflow client
+        board_key:              <string>
+                                board_key
+        path:                   <string>
+                                Directory of the store
+        dimension:              <Optional[int]>
+                                Size of the vectors
+        show_progress:          <bool>
+                                Show the progress bar
+
+    Returns
+        <EmbeddingStore>:
+        The store of the board embeddings
+    """
+    return _fetch_embeddings(
+        EmbeddingStore(path, dimension),
+        lambda page: client.job.storing.list(board_keys=[board_key], page=page),
+        lambda key: client.job.embedding.get(board_key, key=key),
+        "Retrieving job embeddings",
+        show_progress,
+    )
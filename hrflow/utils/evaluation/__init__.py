@@ -1,18 +1,19 @@
 import os
 import typing as t
-import urllib
-from io import BytesIO
+import warnings
 
-from openpyxl import load_workbook
 from openpyxl.workbook.workbook import Workbook
-
-from ..storing import get_all_jobs, get_all_profiles
-from .job import TEMPLATE_URL as JOB_TEMPLATE_URL
-from .job import fill_work_sheet as fill_job_work_sheet
-from .job import parsing_evaluator as job_parsing_evaluator
-from .profile import TEMPLATE_URL as PROFILE_TEMPLATE_URL
-from .profile import fill_work_sheet as fill_profile_work_sheet
-from .profile import parsing_evaluator as profile_parsing_evaluator
+from tqdm import tqdm
+
+from ...core.pagination import DEFAULT_PREFETCH
+from ..storing import iterate_all_jobs, iterate_all_profiles
+from . import job, profile
+from .backends import REPORT_EXTENSIONS, write_report
+from .incremental import EvaluationStore
+from .job import JobEvaluation
+from .parallel import iterate_in_thread, parallel_evaluate
+from .profile import ProfileEvaluation
+from .template import load_template, prefetch_templates
 
 STATISTICS_SHEET_NAME = "1. Statistics"
 
@@ -21,6 +22,8 @@ def load_workbook_from_url(url: str) -> Workbook:
     """
     Load an excel file from a url
 
+    Deprecated, use `template.load_template`: the file is now cached locally.
+
     Args:
         url:                         <str>
                                      The url of the excel file
@@ -29,8 +32,12 @@ def load_workbook_from_url(url: str) -> Workbook:
         <Workbook>
         The loaded workbook
     """
-    file = urllib.request.urlopen(url).read()
-    return load_workbook(filename=BytesIO(file))
+    warnings.warn(
+        "load_workbook_from_url is deprecated, use load_template",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return load_template(url)
 
 
 def prepare_report_path(path: str) -> str:
@@ -43,7 +50,7 @@ def prepare_report_path(path: str) -> str:
     """
     if os.path.isdir(path):
         return os.path.join(path, "parsing_evaluation.xlsx")
-    if not path.endswith(".xlsx"):
+    if os.path.splitext(path)[1].lower() not in REPORT_EXTENSIONS:
         return f"{path}.xlsx"
     return path
 
@@ -54,6 +61,10 @@ def generate_parsing_evaluation_report(
     source_key: t.Optional[str] = None,
     board_key: t.Optional[str] = None,
     show_progress: bool = False,
+    write_only: bool = False,
+    parallel: bool = False,
+    template_cache_dir: t.Optional[str] = None,
+    incremental_dir: t.Optional[str] = None,
 ):
     """
     Generate a parsing evaluation report
@@ -77,33 +88,113 @@ def generate_parsing_evaluation_report(
                                      This can be a already existing directory where
                                      the report will be saved as parsing_evaluation.xlsx
                                      This can be directly the path of the report.
-                                     If the path is not an excel file (xlsx),
-                                     the report will be saved as {path}.xlsx
+                                     The extension selects the format: .xlsx,
+                                     .csv, .jsonl or .parquet (requires pyarrow).
+                                     Otherwise the report will be saved as
+                                     {path}.xlsx. The rows of the .csv, .jsonl and
+                                     .parquet reports are written as they are
+                                     evaluated.
         show_progress:               <bool>
                                      Show the progress bar
+        write_only:                  <bool>
+                                     For .xlsx reports, write the evaluations in a
+                                     single pass in a new write-only workbook, with
+                                     the same columns but without the statistics of
+                                     the template. Much faster and lighter for large
+                                     sources or boards.
+        parallel:                    <bool>
+                                     Evaluate the profiles or jobs in a pool of
+                                     processes, one per CPU. Best combined with
+                                     write_only, the evaluations are otherwise
+                                     converted back to models for the template.
+        template_cache_dir:          <Optional[str]>
+                                     The directory where the templates are cached,
+                                     downloaded on the first report only. By default
+                                     the HRFLOW_TEMPLATE_CACHE environment variable
+                                     or the user cache directory.
+        incremental_dir:             <Optional[str]>
+                                     A directory where the evaluations are stored
+                                     by key and updated_at. Only the profiles or
+                                     jobs updated since the last report are
+                                     fetched and evaluated, and the report is
+                                     regenerated from the stored evaluations.
+                                     Deleted profiles or jobs are kept in the
+                                     store. Can not be combined with parallel.
     """
 
     if not source_key and not board_key:
         raise ValueError("You must provide either source_key or board_key")
     if source_key and board_key:
         raise ValueError("You must provide only one of source_key or board_key")
+    if parallel and incremental_dir is not None:
+        raise ValueError(
+            "parallel can not be combined with incremental_dir, the updated"
+            " profiles or jobs are evaluated one by one"
+        )
 
+    report_path = prepare_report_path(report_path)
+    # The incremental updates stop at the first item older than the last update,
+    # the pages are not fetched ahead not to retrieve pages beyond it
+    if incremental_dir is None:
+        options = dict(prefetch=DEFAULT_PREFETCH, sort_by="created_at")
+    else:
+        options = dict(prefetch=0, sort_by="updated_at")
     if source_key:
-        profile_list = get_all_profiles(client, source_key, show_progress)
-        evaluation_list = profile_parsing_evaluator(profile_list, show_progress)
-
-        work_book = load_workbook_from_url(PROFILE_TEMPLATE_URL)
-        work_sheet = work_book[STATISTICS_SHEET_NAME]
-        fill_profile_work_sheet(work_sheet, evaluation_list, show_progress)
+        item_list = iterate_all_profiles(client, source_key, show_progress, **options)
+        evaluation, evaluation_class = profile, ProfileEvaluation
+        description = "Evaluating profiles"
     else:
         assert board_key is not None
-        job_list = get_all_jobs(client, board_key, show_progress)
-        evaluation_list = job_parsing_evaluator(job_list, show_progress)
-
-        work_book = load_workbook_from_url(JOB_TEMPLATE_URL)
-        work_sheet = work_book[STATISTICS_SHEET_NAME]
-        fill_job_work_sheet(work_sheet, evaluation_list, show_progress)
-
-    report_path = prepare_report_path(report_path)
+        item_list = iterate_all_jobs(client, board_key, show_progress, **options)
+        evaluation, evaluation_class = job, JobEvaluation
+        description = "Evaluating jobs"
+
+    if incremental_dir is not None:
+        store = EvaluationStore(incremental_dir)
+        # Counts the items evaluated, the ones up to date are skipped
+        with tqdm(desc=description, disable=not show_progress) as progress:
+
+            def evaluation_row(item: t.Dict[str, t.Any]) -> t.List[t.Any]:
+                row = evaluation.evaluation_row(item)
+                progress.update()
+                return row
+
+            store.update(item_list, evaluation_row)
+        row_list = store.rows()
+    elif parallel:
+        row_list = parallel_evaluate(
+            evaluation.evaluation_row,
+            item_list,
+            show_progress=show_progress,
+            description=description,
+        )
+    else:
+        row_list = None
+
+    if write_only or os.path.splitext(report_path)[1].lower() != ".xlsx":
+        # The pages are fetched in background threads, evaluated in another
+        # thread (or pool of processes) and written as they come, so only a few
+        # pages are held in memory
+        if row_list is None:
+            row_list = map(evaluation.evaluation_row, item_list)
+            if show_progress:
+                row_list = tqdm(row_list, desc=description)
+        write_report(
+            report_path,
+            evaluation.SECTION_LIST,
+            iterate_in_thread(row_list),
+            evaluation.START_ROW_ID,
+            evaluation.HYPERLINK_COLUMN_ID_LIST,
+            STATISTICS_SHEET_NAME,
+        )
+        return
+
+    if row_list is None:
+        evaluation_list = evaluation.parsing_evaluator(item_list, show_progress)
+    else:
+        evaluation_list = [evaluation_class.from_row(row) for row in row_list]
+    work_book = load_template(evaluation.TEMPLATE_URL, template_cache_dir)
+    work_sheet = work_book[STATISTICS_SHEET_NAME]
+    evaluation.fill_work_sheet(work_sheet, evaluation_list, show_progress)
     work_book.save(report_path)
     work_book.close()
@@ -0,0 +1,151 @@
+"""
+Report backends writing the evaluation rows in a streaming fashion.
+
+The backend is selected by the extension of the report path: .xlsx (write-only
+workbook), .csv, .jsonl or .parquet (requires pyarrow).
+"""
+
+import csv
+import itertools
+import os
+import typing as t
+
+from ...core import require_pyarrow
+from ...core.codec import dumps
+from .writer import Section, column_names, create_write_only_work_sheet, write_rows
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+REPORT_EXTENSIONS = (".xlsx", ".csv", ".jsonl", ".parquet")
+PARQUET_BATCH_SIZE = 10000
+
+
+def get_report_extension(path: str) -> str:
+    """
+    Get the extension of a report path, raise a ValueError if no backend
+    supports it
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in REPORT_EXTENSIONS:
+        raise ValueError(f"Report extension must be in {REPORT_EXTENSIONS}")
+    return extension
+
+
+def _write_xlsx(
+    path: str,
+    section_list: t.Sequence[Section],
+    row_list: t.Iterable[t.List[t.Any]],
+    start_row_id: int,
+    hyperlink_column_id_list: t.Sequence[str],
+    sheet_name: str,
+) -> int:
+    work_book, work_sheet = create_write_only_work_sheet(sheet_name)
+    count = write_rows(
+        work_sheet, section_list, row_list, start_row_id, hyperlink_column_id_list
+    )
+    work_book.save(path)
+    work_book.close()
+    return count
+
+
+def _write_csv(
+    path: str, section_list: t.Sequence[Section], row_list: t.Iterable[t.List[t.Any]]
+) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(column_names(section_list))
+        for row in row_list:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _write_jsonl(
+    path: str, section_list: t.Sequence[Section], row_list: t.Iterable[t.List[t.Any]]
+) -> int:
+    names = column_names(section_list)
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        for row in row_list:
+            file.write(dumps(dict(zip(names, row))))
+            file.write("\n")
+            count += 1
+    return count
+
+
+def _write_parquet(
+    path: str, section_list: t.Sequence[Section], row_list: t.Iterable[t.List[t.Any]]
+) -> int:
+    require_pyarrow()
+    names = column_names(section_list)
+    # The metadata (file name, urls, key) are strings, the evaluations numbers
+    metadata_size = len(section_list[0][3])
+    schema = pa.schema([
+        (name, pa.string() if index < metadata_size else pa.float64())
+        for index, name in enumerate(names)
+    ])
+    row_list = iter(row_list)
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        while True:
+            batch = list(itertools.islice(row_list, PARQUET_BATCH_SIZE))
+            if not batch:
+                break
+            columns = [list(column) for column in zip(*batch)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            count += len(batch)
+    return count
+
+
+def write_report(
+    path: str,
+    section_list: t.Sequence[Section],
+    row_list: t.Iterable[t.List[t.Any]],
+    start_row_id: int,
+    hyperlink_column_id_list: t.Sequence[str] = (),
+    sheet_name: str = "1. Statistics",
+) -> int:
+    """
+    Write evaluation rows to a report, with the backend of its extension
+
+    The rows are written as they are consumed, they can be a generator.
+
+    Args:
+        path:                        <str>
+                                     The path of the report, ending with .xlsx,
+                                     .csv, .jsonl or .parquet
+        section_list:                <Sequence[Section]>
+                                     The sections of the columns, in order
+        row_list:                    <Iterable[List[Any]]>
+                                     The evaluation rows, as returned by `to_row`
+        start_row_id:                <int>
+                                     The row of the first values in a workbook
+        hyperlink_column_id_list:    <Sequence[str]>
+                                     The columns holding urls in a workbook
+        sheet_name:                  <str>
+                                     The name of the worksheet of a workbook
+
+    Returns:
+        <int>
+        The number of rows written
+    """
+    extension = get_report_extension(path)
+    if extension == ".xlsx":
+        return _write_xlsx(
+            path,
+            section_list,
+            row_list,
+            start_row_id,
+            hyperlink_column_id_list,
+            sheet_name,
+        )
+    if extension == ".csv":
+        return _write_csv(path, section_list, row_list)
+    if extension == ".jsonl":
+        return _write_jsonl(path, section_list, row_list)
+    return _write_parquet(path, section_list, row_list)
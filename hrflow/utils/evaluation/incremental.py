@@ -0,0 +1,148 @@
+"""
+Incremental parsing evaluations.
+
+The evaluation rows are stored per profile (or job) key with its `updated_at`,
+so that a new report only fetches and evaluates what changed since the last
+complete update, and is regenerated from the stored rows.
+"""
+
+import os
+import typing as t
+
+from ...core.codec import dumps, loads
+from .statistics import EvaluationColumns
+from .writer import Section
+
+RESULTS_FILE_NAME = "evaluations.jsonl"
+STATE_FILE_NAME = "state.json"
+
+# key -> (updated_at, row)
+Results = t.Dict[str, t.Tuple[str, t.List[t.Any]]]
+
+
+def _updated_at(item: t.Dict[str, t.Any]) -> str:
+    return item.get("updated_at") or item.get("created_at") or ""
+
+
+class EvaluationStore:
+    """
+    Evaluation rows stored in a directory, keyed by item key and updated_at
+
+    The rows are appended to a JSONL file, the last row of a key wins. The
+    state file holds the most recent updated_at of the last complete update.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.results_path = os.path.join(path, RESULTS_FILE_NAME)
+        self.state_path = os.path.join(path, STATE_FILE_NAME)
+
+    def load(self) -> Results:
+        """The stored rows, by key"""
+        results: Results = {}
+        if not os.path.isfile(self.results_path):
+            return results
+        with open(self.results_path, "rb") as file:
+            for line in file:
+                try:
+                    record = loads(line)
+                except ValueError:  # line truncated by an interruption
+                    continue
+                results[record["key"]] = (record["updated_at"], record["row"])
+        return results
+
+    @property
+    def synced_until(self) -> t.Optional[str]:
+        """The most recent updated_at of the last complete update"""
+        if not os.path.isfile(self.state_path):
+            return None
+        with open(self.state_path, "rb") as file:
+            return loads(file.read()).get("synced_until")
+
+    def _save_state(self, synced_until: t.Optional[str]) -> None:
+        temporary_path = f"{self.state_path}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(dumps({"synced_until": synced_until}))
+        os.replace(temporary_path, self.state_path)
+
+    def compact(self, results: t.Optional[Results] = None) -> None:
+        """Rewrite the results file with one line per key"""
+        if results is None:
+            results = self.load()
+        temporary_path = f"{self.results_path}.tmp"
+        with open(temporary_path, "w") as file:
+            for key, (updated_at, row) in results.items():
+                file.write(dumps({"key": key, "updated_at": updated_at, "row": row}))
+                file.write("\n")
+        os.replace(temporary_path, self.results_path)
+
+    def update(
+        self,
+        item_list: t.Iterable[t.Dict[str, t.Any]],
+        evaluate: t.Callable[[t.Dict[str, t.Any]], t.List[t.Any]],
+    ) -> t.Dict[str, int]:
+        """
+        Evaluate the items changed since the last complete update
+
+        Args:
+            item_list:               <Iterable[Dict[str, Any]]>
+                                     The profiles or jobs, sorted by decreasing
+                                     updated_at. The iteration stops at the first
+                                     item older than the last complete update, so
+                                     the following pages are not fetched.
+            evaluate:                <Callable[[Dict[str, Any]], List[Any]]>
+                                     Function evaluating an item as a row
+
+        Returns:
+            <Dict[str, int]>
+            The number of "evaluated" items and of "stored" rows
+        """
+        results = self.load()
+        synced_until = self.synced_until
+        most_recent = synced_until
+        evaluated = 0
+        with open(self.results_path, "a") as file:
+            for item in item_list:
+                updated_at = _updated_at(item)
+                if synced_until and updated_at and updated_at < synced_until:
+                    break
+                key = item.get("key")
+                if key in results and results[key][0] == updated_at:
+                    continue
+                row = evaluate(item)
+                results[key] = (updated_at, row)
+                file.write(dumps({"key": key, "updated_at": updated_at, "row": row}))
+                file.write("\n")
+                evaluated += 1
+                if updated_at and (most_recent is None or updated_at > most_recent):
+                    most_recent = updated_at
+        close = getattr(item_list, "close", None)
+        if close is not None:
+            close()
+        if evaluated:
+            self.compact(results)
+        self._save_state(most_recent)
+        return {"evaluated": evaluated, "stored": len(results)}
+
+    def rows(self) -> t.List[t.List[t.Any]]:
+        """The stored rows, most recently updated first"""
+        results = self.load()
+        return [
+            row
+            for _, row in sorted(
+                results.values(), key=lambda result: result[0], reverse=True
+            )
+        ]
+
+    def columns(self, section_list: t.Sequence[Section]) -> EvaluationColumns:
+        """
+        The stored evaluations as columns, to compute the aggregate statistics
+        (requires numpy)
+
+        Args:
+            section_list:            <Sequence[Section]>
+                                     The sections of the rows, profile.SECTION_LIST
+                                     or job.SECTION_LIST
+        """
+        return EvaluationColumns.from_rows(self.rows(), section_list)
@@ -1,10 +1,14 @@
 import typing as t
 
 from openpyxl.utils.cell import get_column_interval
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 from openpyxl.worksheet.worksheet import Worksheet
 from pydantic import BaseModel
 from tqdm import tqdm
 
+from .parallel import DEFAULT_CHUNK_SIZE, parallel_evaluate
+from .writer import Section, write_rows
+
 TEMPLATE_URL = "https://riminder-documents-eu-2019-12-dev.s3.eu-west-1.amazonaws.com/evaluation/parsing-evaluation-template-v3-job.xlsx"  # noqa: E501
 START_ROW_ID = 5
 
@@ -53,6 +57,25 @@ OTHER_FIELD_LIST = (
 )
 OTHER_START_COLUMN_ID, OTHER_END_COLUMN_ID = ("X", "AB")
 
+SECTION_LIST: t.Tuple[Section, ...] = (
+    ("metadata", NAME_COLUMN_ID, KEY_COLUMN_ID, ("name", "url", "key")),
+    ("overview", INFO_START_COLUMN_ID, INFO_END_COLUMN_ID, OVERVIEW_FIELD_LIST),
+    (
+        "ranges_float",
+        EXPERIENCE_START_COLUMN_ID,
+        EXPERIENCE_END_COLUMN_ID,
+        RANGES_FLOATS_FIELD_LIST,
+    ),
+    (
+        "ranges_date",
+        EDUCATION_START_COLUMN_ID,
+        EDUCATION_END_COLUMN_ID,
+        RANGES_DATES_FIELD_LIST,
+    ),
+    ("other", OTHER_START_COLUMN_ID, OTHER_END_COLUMN_ID, OTHER_FIELD_LIST),
+)
+HYPERLINK_COLUMN_ID_LIST = (URL_COLUMN_ID,)
+
 
 class OverviewEvaluation(BaseModel):
     score: float
@@ -211,6 +234,44 @@ class JobEvaluation(BaseModel):
     url: str
     key: str
 
+    def to_row(self) -> t.List[t.Any]:
+        """The values of the evaluation, in the order of the report columns"""
+        row = [self.name, self.url, self.key]
+        row += [getattr(self.overview, field) for field in OVERVIEW_FIELD_LIST]
+        row += [getattr(self.range_float, field) for field in RANGES_FLOATS_FIELD_LIST]
+        row += [getattr(self.range_date, field) for field in RANGES_DATES_FIELD_LIST]
+        row += [getattr(self.other, field) for field in OTHER_FIELD_LIST]
+        return row
+
+    @staticmethod
+    def from_row(row: t.Sequence[t.Any]) -> "JobEvaluation":
+        """Rebuild an evaluation from the values of `to_row`, without validation"""
+        values = iter(row)
+        name = next(values)
+        url = next(values)
+        key = next(values)
+        overview = OverviewEvaluation.model_construct(
+            **{field: next(values) for field in OVERVIEW_FIELD_LIST}
+        )
+        range_float = RangeFloatEvaluation.model_construct(
+            **{field: next(values) for field in RANGES_FLOATS_FIELD_LIST}
+        )
+        range_date = RangeDateEvaluation.model_construct(
+            **{field: next(values) for field in RANGES_DATES_FIELD_LIST}
+        )
+        other = OtherEvaluation.model_construct(
+            **{field: next(values) for field in OTHER_FIELD_LIST}
+        )
+        return JobEvaluation.model_construct(
+            overview=overview,
+            range_float=range_float,
+            range_date=range_date,
+            other=other,
+            name=name,
+            url=url,
+            key=key,
+        )
+
     @staticmethod
     def from_job(job: t.Dict[str, t.Any]) -> "JobEvaluation":
         return JobEvaluation(
@@ -245,6 +306,52 @@ def parsing_evaluator(
     return [JobEvaluation.from_job(job) for job in job_list]
 
 
+def evaluation_row(job: t.Dict[str, t.Any]) -> t.List[t.Any]:
+    """Evaluate a job, as a row of values in the order of the report columns"""
+    return JobEvaluation.from_job(job).to_row()
+
+
+def parallel_parsing_evaluator(
+    job_list: t.Iterable[t.Dict[str, t.Any]],
+    show_progress: bool = False,
+    max_workers: t.Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> t.List[t.List[t.Any]]:
+    """
+    Evaluate a list of jobs in a pool of processes
+
+    The workers send back the evaluations as rows of values, in the order of the
+    report columns (see `JobEvaluation.to_row`), as building the pydantic
+    models costs as much as the evaluation itself. The rows can be written
+    directly with `write_work_sheet`, or converted with `JobEvaluation.from_row`.
+
+    Args:
+        job_list:               <Iterable[Dict[str, Any]]>
+                                 List of jobs
+        show_progress:          <bool>
+                                 Show the progress bar
+        max_workers:            <Optional[int]>
+                                 The number of processes, the number of CPUs by
+                                 default
+        chunk_size:             <int>
+                                 The number of jobs sent at once to a process
+
+    Returns:
+        <List[List[Any]]>:
+        List of job evaluation rows, in the order of the jobs
+    """
+    return list(
+        parallel_evaluate(
+            evaluation_row,
+            job_list,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            show_progress=show_progress,
+            description="Evaluating jobs",
+        )
+    )
+
+
 def fill_metadata(
     work_sheet: Worksheet,
     job_eval_list: t.List[JobEvaluation],
@@ -395,3 +502,41 @@ def fill_work_sheet(
     fill_range_float(work_sheet, job_eval_list, show_progress)
     fill_range_date(work_sheet, job_eval_list, show_progress)
     fill_other(work_sheet, job_eval_list, show_progress)
+
+
+def write_work_sheet(
+    work_sheet: WriteOnlyWorksheet,
+    job_eval_list: t.Iterable[t.Union[JobEvaluation, t.List[t.Any]]],
+    show_progress: bool = False,
+) -> int:
+    """
+    Write the job evaluations in a write-only worksheet, in a single pass
+
+    The columns are the same as in the template filled by `fill_work_sheet`,
+    the evaluations can be a generator, of models or of rows returned by
+    `parallel_parsing_evaluator`.
+
+    Args:
+        work_sheet:                  <WriteOnlyWorksheet>
+                                     The worksheet to write
+        job_eval_list:               <Iterable[Union[JobEvaluation, List[Any]]]>
+                                     The job evaluations or their rows
+        show_progress:               <bool>
+                                     Show the progress bar
+
+    Returns:
+        <int>
+        The number of job evaluations written
+    """
+    if show_progress:
+        job_eval_list = tqdm(job_eval_list, desc="Writing job evaluations")
+    return write_rows(
+        work_sheet,
+        SECTION_LIST,
+        (
+            job_eval if isinstance(job_eval, list) else job_eval.to_row()
+            for job_eval in job_eval_list
+        ),
+        START_ROW_ID,
+        HYPERLINK_COLUMN_ID_LIST,
+    )
@@ -0,0 +1,156 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import typing as t
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from tqdm import tqdm
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_BUFFER_SIZE = 1000
+# Marks the end of the items in the buffer of iterate_in_thread
+_END = object()
+# The workers are not forked: the pools are started while other threads run
+# (e.g. the pages fetched ahead, iterate_in_thread), whose locks a fork copies
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+Item = t.TypeVar("Item")
+Result = t.TypeVar("Result")
+
+
+def _evaluate_chunk(
+    evaluate: t.Callable[[Item], Result], chunk: t.List[Item]
+) -> t.List[Result]:
+    return [evaluate(item) for item in chunk]
+
+
+def parallel_evaluate(
+    evaluate: t.Callable[[Item], Result],
+    item_list: t.Iterable[Item],
+    max_workers: t.Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    show_progress: bool = False,
+    description: str = "Evaluating",
+) -> t.Iterator[Result]:
+    """
+    Evaluate items in a pool of processes, chunk by chunk
+
+    At most two chunks per worker are in flight, so the items can be a
+    generator of any length.
+
+    Args:
+        evaluate:                    <Callable[[Item], Result]>
+                                     Top-level function (or static method)
+                                     evaluating an item, run in the workers.
+                                     They are started with forkserver (spawn
+                                     where unavailable), so the main module of
+                                     a script must be guarded by
+                                     `if __name__ == "__main__"`.
+        item_list:                   <Iterable[Item]>
+                                     The items to evaluate
+        max_workers:                 <Optional[int]>
+                                     The number of processes, the number of CPUs
+                                     by default
+        chunk_size:                  <int>
+                                     The number of items sent at once to a worker
+        show_progress:               <bool>
+                                     Show the progress bar
+        description:                 <str>
+                                     The description of the progress bar
+
+    Yields:
+        <Result>
+        The evaluation of each item, in the order of the items
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    max_workers = max_workers or os.cpu_count() or 1
+    items = iter(item_list)
+    progress = tqdm(desc=description, disable=not show_progress)
+    pending: t.List[Future] = []
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=_MP_CONTEXT
+    ) as executor:
+        try:
+            while True:
+                while len(pending) < 2 * max_workers:
+                    chunk = list(itertools.islice(items, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(_evaluate_chunk, evaluate, chunk))
+                if not pending:
+                    break
+                results = pending.pop(0).result()
+                progress.update(len(results))
+                yield from results
+        finally:
+            for future in pending:
+                future.cancel()
+            progress.close()
+
+
+def iterate_in_thread(
+    item_list: t.Iterable[Item], buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> t.Iterator[Item]:
+    """
+    Consume an iterable in a background thread, ahead of the caller
+
+    The items are passed through a queue of at most `buffer_size` items, so that
+    the producer (e.g. fetching and evaluating) runs while the consumer (e.g.
+    writing) processes the previous items, with a bounded memory. An exception
+    raised by the producer is raised again in the consumer.
+
+    Args:
+        item_list:                   <Iterable[Item]>
+                                     The items, consumed in the background thread
+        buffer_size:                 <int>
+                                     The maximum number of items produced ahead
+
+    Yields:
+        <Item>
+        The items, in order
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=buffer_size)
+    stopped = threading.Event()
+
+    def put(item: t.Any) -> bool:
+        # Give up when the consumer stops iterating, the queue may stay full
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in item_list:
+                if not put((item, None)):
+                    return
+            put((_END, None))
+        except BaseException as error:
+            put((_END, error))
+        finally:
+            # Release the resources of a generator (threads, processes) here
+            close = getattr(item_list, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is _END:
+                return
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
@@ -1,10 +1,14 @@
 import typing as t
 
 from openpyxl.utils.cell import get_column_interval
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 from openpyxl.worksheet.worksheet import Worksheet
 from pydantic import BaseModel
 from tqdm import tqdm
 
+from .parallel import DEFAULT_CHUNK_SIZE, parallel_evaluate
+from .writer import Section, write_rows
+
 TEMPLATE_URL = "https://riminder-documents-eu-2019-12-dev.s3.eu-west-1.amazonaws.com/evaluation/parsing-evaluation-template-v3-profile.xlsx"  # noqa: E501
 START_ROW_ID = 5
 
@@ -67,6 +71,78 @@ OTHER_FIELD_LIST = (
 )
 OTHER_START_COLUMN_ID, OTHER_END_COLUMN_ID = ("AK", "AP")
 
+SECTION_LIST: t.Tuple[Section, ...] = (
+    (
+        "metadata",
+        FILENAME_COLUMN_ID,
+        PROFILE_COLUMN_ID,
+        ("filename", "resume_url", "profile_url"),
+    ),
+    ("info", INFO_START_COLUMN_ID, INFO_END_COLUMN_ID, INFO_FIELD_LIST),
+    (
+        "experience",
+        EXPERIENCE_START_COLUMN_ID,
+        EXPERIENCE_END_COLUMN_ID,
+        EXPERIENCE_FIELD_LIST,
+    ),
+    (
+        "education",
+        EDUCATION_START_COLUMN_ID,
+        EDUCATION_END_COLUMN_ID,
+        EDUCATION_FIELD_LIST,
+    ),
+    ("other", OTHER_START_COLUMN_ID, OTHER_END_COLUMN_ID, OTHER_FIELD_LIST),
+)
+HYPERLINK_COLUMN_ID_LIST = (RESUME_COLUMN_ID, PROFILE_COLUMN_ID)
+
+
+# Keys of the experiences and educations evaluated by the date fields
+_ITEM_KEYS = {"start_date": "date_start", "end_date": "date_end"}
+
+
+def _has_location(value: t.Dict[str, t.Any]) -> int:
+    return 1 if (value.get("location") or {}).get("text") else 0
+
+
+def evaluate_info(info: t.Dict[str, t.Any]) -> t.Dict[str, float]:
+    """
+    The values of INFO_FIELD_LIST for the info of a profile: 1 for the fields
+    present, 0 otherwise, and the score, their mean without full_name
+    """
+    values = {field: 1 if info.get(field) else 0 for field in INFO_FIELD_LIST[1:]}
+    values["location"] = _has_location(info)
+    values["score"] = sum(values[field] for field in INFO_FIELD_LIST[2:]) / 7
+    return values
+
+
+def evaluate_items(
+    items: t.List[t.Dict[str, t.Any]], field_list: t.Sequence[str]
+) -> t.Dict[str, float]:
+    """
+    The values of EXPERIENCE_FIELD_LIST or EDUCATION_FIELD_LIST for the
+    experiences or educations of a profile: their count, the share of them
+    where each field is present, the score, mean of these shares, and the
+    total number of skills, tasks, courses and certifications
+    """
+    count = len(items)
+    values = {"count": count}
+    for field in field_list[2:8]:
+        if field == "location":
+            present = sum(_has_location(item) for item in items)
+        else:
+            key = _ITEM_KEYS.get(field, field)
+            present = sum(1 for item in items if item.get(key))
+        values[field] = present / count if count else 0
+    values["score"] = sum(values[field] for field in field_list[2:8]) / 6
+    for field in field_list[8:]:
+        values[field] = sum(len(item.get(field) or []) for item in items)
+    return values
+
+
+def evaluate_other(profile: t.Dict[str, t.Any]) -> t.Dict[str, int]:
+    """The values of OTHER_FIELD_LIST, the number of items of each field"""
+    return {field: len(profile.get(field) or []) for field in OTHER_FIELD_LIST}
+
 
 class InfoEvaluation(BaseModel):
     score: float
@@ -81,37 +157,7 @@ class InfoEvaluation(BaseModel):
 
     @staticmethod
     def from_profile(profile: t.Dict[str, t.Any]) -> "InfoEvaluation":
-        info = profile["info"]
-        first_name = 1 if info.get("first_name") else 0
-        last_name = 1 if info.get("last_name") else 0
-        phone = 1 if info.get("phone") else 0
-        email = 1 if info.get("email") else 0
-        location = 1 if info.get("location", {}).get("text") else 0
-        summary = 1 if info.get("summary") else 0
-        driving_license = 1 if info.get("driving_license") else 0
-        full_name = 1 if info.get("full_name") else 0
-
-        score = (
-            first_name
-            + last_name
-            + phone
-            + email
-            + location
-            + summary
-            + driving_license
-        )
-        score /= 7
-        return InfoEvaluation(
-            score=score,
-            full_name=full_name,
-            first_name=first_name,
-            last_name=last_name,
-            phone=phone,
-            email=email,
-            location=location,
-            summary=summary,
-            driving_license=driving_license,
-        )
+        return InfoEvaluation(**evaluate_info(profile.get("info") or {}))
 
 
 class ExperienceEvaluation(BaseModel):
@@ -130,59 +176,8 @@ class ExperienceEvaluation(BaseModel):
 
     @staticmethod
     def from_profile(profile: t.Dict[str, t.Any]) -> "ExperienceEvaluation":
-        experiences = profile["experiences"]
-
-        count = len(experiences)
-
-        title = 0
-        company = 0
-        start_date = 0
-        end_date = 0
-        location = 0
-        description = 0
-
-        skills = 0
-        tasks = 0
-        courses = 0
-        certifications = 0
-
-        for experience in experiences:
-            title += 1 if experience.get("title") else 0
-            company += 1 if experience.get("company") else 0
-            start_date += 1 if experience.get("date_start") else 0
-            end_date += 1 if experience.get("date_end") else 0
-            location += 1 if experience.get("location", {}).get("text") else 0
-            description += 1 if experience.get("description") else 0
-
-            skills += len(experience.get("skills", []))
-            tasks += len(experience.get("tasks", []))
-            courses += len(experience.get("courses", []))
-            certifications += len(experience.get("certifications", []))
-
-        if count > 0:
-            title /= count
-            company /= count
-            start_date /= count
-            end_date /= count
-            location /= count
-            description /= count
-
-        score = title + company + start_date + end_date + location + description
-        score /= 6
-
         return ExperienceEvaluation(
-            score=score,
-            count=count,
-            title=title,
-            company=company,
-            start_date=start_date,
-            end_date=end_date,
-            location=location,
-            description=description,
-            skills=skills,
-            tasks=tasks,
-            courses=courses,
-            certifications=certifications,
+            **evaluate_items(profile.get("experiences") or [], EXPERIENCE_FIELD_LIST)
         )
 
 
@@ -202,59 +197,8 @@ class EducationEvaluation(BaseModel):
 
     @staticmethod
     def from_profile(profile: t.Dict[str, t.Any]) -> "EducationEvaluation":
-        educations = profile["educations"]
-
-        count = len(educations)
-
-        title = 0
-        school = 0
-        start_date = 0
-        end_date = 0
-        location = 0
-        description = 0
-
-        skills = 0
-        tasks = 0
-        courses = 0
-        certifications = 0
-
-        for education in educations:
-            title += 1 if education.get("title") else 0
-            school += 1 if education.get("school") else 0
-            start_date += 1 if education.get("date_start") else 0
-            end_date += 1 if education.get("date_end") else 0
-            location += 1 if education.get("location", {}).get("text") else 0
-            description += 1 if education.get("description") else 0
-
-            skills += len(education.get("skills", []))
-            tasks += len(education.get("tasks", []))
-            courses += len(education.get("courses", []))
-            certifications += len(education.get("certifications", []))
-
-        if count > 0:
-            title /= count
-            school /= count
-            start_date /= count
-            end_date /= count
-            location /= count
-            description /= count
-
-        score = title + school + start_date + end_date + location + description
-        score /= 6
-
         return EducationEvaluation(
-            score=score,
-            count=count,
-            title=title,
-            school=school,
-            start_date=start_date,
-            end_date=end_date,
-            location=location,
-            description=description,
-            skills=skills,
-            tasks=tasks,
-            courses=courses,
-            certifications=certifications,
+            **evaluate_items(profile.get("educations") or [], EDUCATION_FIELD_LIST)
         )
 
 
@@ -268,21 +212,7 @@ class OtherEvaluation(BaseModel):
 
     @staticmethod
     def from_profile(profile: t.Dict[str, t.Any]) -> "OtherEvaluation":
-        skills = len(profile.get("skills", []))
-        languages = len(profile.get("languages", []))
-        tasks = len(profile.get("tasks", []))
-        courses = len(profile.get("courses", []))
-        certifications = len(profile.get("certifications", []))
-        interests = len(profile.get("interests", []))
-
-        return OtherEvaluation(
-            skills=skills,
-            languages=languages,
-            tasks=tasks,
-            courses=courses,
-            certifications=certifications,
-            interests=interests,
-        )
+        return OtherEvaluation(**evaluate_other(profile))
 
 
 class ProfileEvaluation(BaseModel):
@@ -309,6 +239,44 @@ class ProfileEvaluation(BaseModel):
         base_url = resume_url.rsplit("/", 2)[0]
         return f"{base_url}/object.json"
 
+    def to_row(self) -> t.List[t.Any]:
+        """The values of the evaluation, in the order of the report columns"""
+        row = [self.filename, self.resume_url, self.profile_url]
+        row += [getattr(self.info, field) for field in INFO_FIELD_LIST]
+        row += [getattr(self.experience, field) for field in EXPERIENCE_FIELD_LIST]
+        row += [getattr(self.education, field) for field in EDUCATION_FIELD_LIST]
+        row += [getattr(self.other, field) for field in OTHER_FIELD_LIST]
+        return row
+
+    @staticmethod
+    def from_row(row: t.Sequence[t.Any]) -> "ProfileEvaluation":
+        """Rebuild an evaluation from the values of `to_row`, without validation"""
+        values = iter(row)
+        filename = next(values)
+        resume_url = next(values)
+        profile_url = next(values)
+        info = InfoEvaluation.model_construct(
+            **{field: next(values) for field in INFO_FIELD_LIST}
+        )
+        experience = ExperienceEvaluation.model_construct(
+            **{field: next(values) for field in EXPERIENCE_FIELD_LIST}
+        )
+        education = EducationEvaluation.model_construct(
+            **{field: next(values) for field in EDUCATION_FIELD_LIST}
+        )
+        other = OtherEvaluation.model_construct(
+            **{field: next(values) for field in OTHER_FIELD_LIST}
+        )
+        return ProfileEvaluation.model_construct(
+            info=info,
+            experience=experience,
+            education=education,
+            other=other,
+            filename=filename,
+            resume_url=resume_url,
+            profile_url=profile_url,
+        )
+
     @staticmethod
     def from_profile(profile: t.Dict[str, t.Any]) -> "ProfileEvaluation":
         return ProfileEvaluation(
@@ -343,6 +311,52 @@ def parsing_evaluator(
     return [ProfileEvaluation.from_profile(profile) for profile in profile_list]
 
 
+def evaluation_row(profile: t.Dict[str, t.Any]) -> t.List[t.Any]:
+    """Evaluate a profile, as a row of values in the order of the report columns"""
+    return ProfileEvaluation.from_profile(profile).to_row()
+
+
+def parallel_parsing_evaluator(
+    profile_list: t.Iterable[t.Dict[str, t.Any]],
+    show_progress: bool = False,
+    max_workers: t.Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> t.List[t.List[t.Any]]:
+    """
+    Evaluate a list of profiles in a pool of processes
+
+    The workers send back the evaluations as rows of values, in the order of the
+    report columns (see `ProfileEvaluation.to_row`), as building the pydantic
+    models costs as much as the evaluation itself. The rows can be written
+    directly with `write_work_sheet`, or converted with `ProfileEvaluation.from_row`.
+
+    Args:
+        profile_list:           <Iterable[Dict[str, Any]]>
+                                 List of profiles
+        show_progress:          <bool>
+                                 Show the progress bar
+        max_workers:            <Optional[int]>
+                                 The number of processes, the number of CPUs by
+                                 default
+        chunk_size:             <int>
+                                 The number of profiles sent at once to a process
+
+    Returns:
+        <List[List[Any]]>:
+        List of profile evaluation rows, in the order of the profiles
+    """
+    return list(
+        parallel_evaluate(
+            evaluation_row,
+            profile_list,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            show_progress=show_progress,
+            description="Evaluating profiles",
+        )
+    )
+
+
 def fill_metadata(
     work_sheet: Worksheet,
     profile_eval_list: t.List[ProfileEvaluation],
@@ -494,3 +508,41 @@ def fill_work_sheet(
     fill_experience(work_sheet, profile_eval_list, show_progress)
     fill_education(work_sheet, profile_eval_list, show_progress)
     fill_other(work_sheet, profile_eval_list, show_progress)
+
+
+def write_work_sheet(
+    work_sheet: WriteOnlyWorksheet,
+    profile_eval_list: t.Iterable[t.Union[ProfileEvaluation, t.List[t.Any]]],
+    show_progress: bool = False,
+) -> int:
+    """
+    Write the profile evaluations in a write-only worksheet, in a single pass
+
+    The columns are the same as in the template filled by `fill_work_sheet`,
+    the evaluations can be a generator, of models or of rows returned by
+    `parallel_parsing_evaluator`.
+
+    Args:
+        work_sheet:                  <WriteOnlyWorksheet>
+                                     The worksheet to write
+        profile_eval_list:           <Iterable[Union[ProfileEvaluation, List[Any]]]>
+                                     The profile evaluations or their rows
+        show_progress:               <bool>
+                                     Show the progress bar
+
+    Returns:
+        <int>
+        The number of profile evaluations written
+    """
+    if show_progress:
+        profile_eval_list = tqdm(profile_eval_list, desc="Writing profile evaluations")
+    return write_rows(
+        work_sheet,
+        SECTION_LIST,
+        (
+            profile_eval if isinstance(profile_eval, list) else profile_eval.to_row()
+            for profile_eval in profile_eval_list
+        ),
+        START_ROW_ID,
+        HYPERLINK_COLUMN_ID_LIST,
+    )
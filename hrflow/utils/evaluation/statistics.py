@@ -0,0 +1,215 @@
+"""
+Columnar statistics of parsing evaluations.
+
+The evaluations are stored as one NumPy array per field ("info.email",
+"experience.count", ...) and aggregated directly, without building pydantic
+models nor any workbook.
+
+Usage:
+>>> columns = EvaluationColumns.from_profiles(get_all_profiles(client, source_key))
+>>> columns.statistics()["info.email"]["mean"]
+>>> columns.histogram("experience.count")
+"""
+
+import itertools
+import typing as t
+
+from ...core import require_numpy
+from .profile import (
+    EDUCATION_FIELD_LIST,
+    EXPERIENCE_FIELD_LIST,
+    INFO_FIELD_LIST,
+    OTHER_FIELD_LIST,
+)
+from .profile import SECTION_LIST as PROFILE_SECTION_LIST
+from .profile import evaluate_info, evaluate_items, evaluate_other
+from .writer import Section, column_names
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+_CHUNK_SIZE = 10000
+
+
+def _column_names(section_list: t.Sequence[Section]) -> t.List[str]:
+    # The first section holds the metadata (file name, urls, key)
+    return column_names(section_list)[len(section_list[0][3]) :]
+
+
+def profile_evaluation_values(profile: t.Dict[str, t.Any]) -> t.List[float]:
+    """
+    The numeric values of the evaluation of a profile, computed with the rules
+    of `ProfileEvaluation` without building its models. Same values as the
+    numeric part of `ProfileEvaluation.to_row`.
+    """
+    info = evaluate_info(profile.get("info") or {})
+    experience = evaluate_items(profile.get("experiences") or [], EXPERIENCE_FIELD_LIST)
+    education = evaluate_items(profile.get("educations") or [], EDUCATION_FIELD_LIST)
+    other = evaluate_other(profile)
+    return [
+        *(info[field] for field in INFO_FIELD_LIST),
+        *(experience[field] for field in EXPERIENCE_FIELD_LIST),
+        *(education[field] for field in EDUCATION_FIELD_LIST),
+        *(other[field] for field in OTHER_FIELD_LIST),
+    ]
+
+
+class EvaluationColumns:
+    """
+    Parsing evaluations stored column by column, one NumPy array per field.
+
+    Presence fields hold 0 or 1, item fields (experience.title, ...) the ratio
+    of items where the field is present, and counts are stored as floats.
+    """
+
+    def __init__(self, columns: t.Dict[str, "np.ndarray"], keys: t.List[t.Any]):
+        require_numpy()
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1 or (lengths and lengths.pop() != len(keys)):
+            raise ValueError("All the columns must have one value per key")
+        self.columns = columns
+        self.keys = keys
+
+    @classmethod
+    def _from_values(
+        cls,
+        value_rows: t.Iterable[t.Tuple[t.Any, t.List[float]]],
+        names: t.List[str],
+    ) -> "EvaluationColumns":
+        require_numpy()
+        keys = []
+        chunks = [np.empty((0, len(names)), dtype=np.float64)]
+        value_rows = iter(value_rows)
+        while True:
+            chunk = list(itertools.islice(value_rows, _CHUNK_SIZE))
+            if not chunk:
+                break
+            keys += [key for key, _ in chunk]
+            chunks.append(np.array([values for _, values in chunk], dtype=np.float64))
+        matrix = np.concatenate(chunks)
+        columns = {name: matrix[:, index].copy() for index, name in enumerate(names)}
+        return cls(columns, keys)
+
+    @classmethod
+    def from_profiles(
+        cls, profile_list: t.Iterable[t.Dict[str, t.Any]]
+    ) -> "EvaluationColumns":
+        """
+        Evaluate a stream of profiles
+
+        Args:
+            profile_list:           <Iterable[Dict[str, Any]]>
+                                    The profiles, can be a generator
+
+        Returns:
+            <EvaluationColumns>
+            The evaluations, keyed by the profile keys
+        """
+        return cls._from_values(
+            (
+                (profile.get("key"), profile_evaluation_values(profile))
+                for profile in profile_list
+            ),
+            _column_names(PROFILE_SECTION_LIST),
+        )
+
+    @classmethod
+    def from_rows(
+        cls,
+        row_list: t.Iterable[t.List[t.Any]],
+        section_list: t.Sequence[Section] = PROFILE_SECTION_LIST,
+    ) -> "EvaluationColumns":
+        """
+        Load evaluation rows, as returned by `to_row` or the parallel evaluators
+
+        Args:
+            row_list:               <Iterable[List[Any]]>
+                                    The evaluation rows
+            section_list:           <Sequence[Section]>
+                                    The sections of the rows, the profile ones by
+                                    default. Use job.SECTION_LIST for jobs.
+
+        Returns:
+            <EvaluationColumns>
+            The evaluations, keyed by the last metadata field of the rows
+            (profile url or job key)
+        """
+        metadata_size = len(section_list[0][3])
+        return cls._from_values(
+            ((row[metadata_size - 1], row[metadata_size:]) for row in row_list),
+            _column_names(section_list),
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, name: str) -> "np.ndarray":
+        return self.columns[name]
+
+    def statistics(
+        self, percentiles: t.Sequence[float] = DEFAULT_PERCENTILES
+    ) -> t.Dict[str, t.Dict[str, float]]:
+        """
+        Aggregate statistics of every field
+
+        Args:
+            percentiles:            <Sequence[float]>
+                                    The percentiles to compute, between 0 and 100
+
+        Returns:
+            <Dict[str, Dict[str, float]]>
+            For each field: mean, std, min, max, presence (share of non zero
+            values) and the percentiles as p{percentile}. The values are NaN
+            when there are no evaluations.
+        """
+        if not self.keys:
+            nan = float("nan")
+            names = ["mean", "std", "min", "max", "presence"]
+            names += [f"p{percentile:g}" for percentile in percentiles]
+            return {name: dict.fromkeys(names, nan) for name in self.columns}
+
+        matrix = np.column_stack(list(self.columns.values()))
+        aggregates = {
+            "mean": matrix.mean(axis=0),
+            "std": matrix.std(axis=0),
+            "min": matrix.min(axis=0),
+            "max": matrix.max(axis=0),
+            "presence": (matrix != 0).mean(axis=0),
+        }
+        if percentiles:
+            values = np.percentile(matrix, percentiles, axis=0)
+            for percentile, row in zip(percentiles, values):
+                aggregates[f"p{percentile:g}"] = row
+        return {
+            name: {key: float(values[index]) for key, values in aggregates.items()}
+            for index, name in enumerate(self.columns)
+        }
+
+    def histogram(
+        self, name: str, bins: t.Optional[int] = None
+    ) -> t.Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Distribution of the values of a field
+
+        Args:
+            name:                   <str>
+                                    The field, e.g. "experience.count"
+            bins:                   <Optional[int]>
+                                    The number of bins. By default one bin per
+                                    integer value for counts, 10 bins otherwise.
+
+        Returns:
+            <Tuple[np.ndarray, np.ndarray]>
+            The number of evaluations per bin and the bin edges
+        """
+        column = self.columns[name]
+        if bins is None and len(column) and np.all(column == np.round(column)):
+            maximum = int(column.max())
+            return (
+                np.bincount(column.astype(np.int64), minlength=maximum + 1),
+                np.arange(maximum + 2, dtype=np.float64),
+            )
+        return np.histogram(column, bins=bins or 10)
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import typing as t
+import urllib.request
+
+from openpyxl import load_workbook
+from openpyxl.workbook.workbook import Workbook
+
+from .job import TEMPLATE_URL as JOB_TEMPLATE_URL
+from .profile import TEMPLATE_URL as PROFILE_TEMPLATE_URL
+
+TEMPLATE_CACHE_ENV = "HRFLOW_TEMPLATE_CACHE"
+# Bumped when the templates change in a way the cached files must not be reused
+TEMPLATE_CACHE_VERSION = "1"
+TEMPLATE_URL_LIST = (PROFILE_TEMPLATE_URL, JOB_TEMPLATE_URL)
+
+
+def get_template_cache_dir(cache_dir: t.Optional[str] = None) -> str:
+    """
+    Get the directory where the evaluation templates are cached
+
+    Args:
+        cache_dir:                   <Optional[str]>
+                                     The cache directory. By default the
+                                     HRFLOW_TEMPLATE_CACHE environment variable,
+                                     or hrflow/templates in the user cache
+                                     directory (XDG_CACHE_HOME or ~/.cache).
+
+    Returns:
+        <str>
+        The versioned cache directory
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get(TEMPLATE_CACHE_ENV)
+    if cache_dir is None:
+        user_cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        cache_dir = os.path.join(user_cache_dir, "hrflow", "templates")
+    return os.path.join(cache_dir, f"v{TEMPLATE_CACHE_VERSION}")
+
+
+def get_template_path(url: str, cache_dir: t.Optional[str] = None) -> str:
+    """
+    Get the local path of an evaluation template, downloaded on the first use
+
+    Args:
+        url:                         <str>
+                                     The url of the template
+        cache_dir:                   <Optional[str]>
+                                     The cache directory, see
+                                     `get_template_cache_dir`
+
+    Returns:
+        <str>
+        The path of the cached template
+    """
+    directory = get_template_cache_dir(cache_dir)
+    # The name of the templates holds their version
+    path = os.path.join(directory, url.rsplit("/", 1)[-1])
+    if os.path.isfile(path):
+        return path
+
+    os.makedirs(directory, exist_ok=True)
+    try:
+        content = urllib.request.urlopen(url).read()
+    except OSError as error:
+        raise ValueError(
+            f"Template {url} is not cached in {directory} and can not be"
+            f" downloaded: {error}. Run prefetch_templates where the network is"
+            f" available and copy the directory, or set {TEMPLATE_CACHE_ENV}."
+        ) from error
+    # Written next to its final path then renamed, so that concurrent reports
+    # never read a partial file
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(content)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    return path
+
+
+def load_template(url: str, cache_dir: t.Optional[str] = None) -> Workbook:
+    """
+    Load an evaluation template from the cache, downloaded on the first use
+
+    Args:
+        url:                         <str>
+                                     The url of the template
+        cache_dir:                   <Optional[str]>
+                                     The cache directory, see
+                                     `get_template_cache_dir`
+
+    Returns:
+        <Workbook>
+        The loaded workbook
+    """
+    return load_workbook(filename=get_template_path(url, cache_dir))
+
+
+def prefetch_templates(cache_dir: t.Optional[str] = None) -> t.List[str]:
+    """
+    Download the profile and job templates in the cache, to generate the reports
+    without network access afterwards
+
+    Args:
+        cache_dir:                   <Optional[str]>
+                                     The cache directory, see
+                                     `get_template_cache_dir`
+
+    Returns:
+        <List[str]>
+        The paths of the cached templates
+    """
+    return [get_template_path(url, cache_dir) for url in TEMPLATE_URL_LIST]
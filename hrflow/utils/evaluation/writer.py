@@ -0,0 +1,115 @@
+import typing as t
+
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import Cell
+from openpyxl.styles import Font
+from openpyxl.utils.cell import column_index_from_string, get_column_interval
+from openpyxl.workbook.workbook import Workbook
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+
+# (section name, first column id, last column id, field list)
+Section = t.Tuple[str, str, str, t.Tuple[str, ...]]
+
+_HEADER_FONT = Font(bold=True)
+
+
+def column_names(section_list: t.Sequence[Section]) -> t.List[str]:
+    """The names of the columns, as {section name}.{field}"""
+    return [
+        f"{name}.{field}"
+        for name, _, _, field_list in section_list
+        for field in field_list
+    ]
+
+
+def create_write_only_work_sheet(
+    sheet_name: str,
+) -> t.Tuple[Workbook, WriteOnlyWorksheet]:
+    """
+    Create a write-only workbook with an empty worksheet
+
+    Args:
+        sheet_name:                  <str>
+                                     The name of the worksheet
+
+    Returns:
+        <Tuple[Workbook, WriteOnlyWorksheet]>
+        The workbook and its worksheet
+    """
+    work_book = Workbook(write_only=True)
+    work_sheet = work_book.create_sheet(sheet_name)
+    return work_book, work_sheet
+
+
+def _header_rows(
+    work_sheet: WriteOnlyWorksheet, section_list: t.Sequence[Section]
+) -> t.Tuple[t.List[Cell], t.List[Cell]]:
+    section_row, field_row = [], []
+    for name, start_column_id, end_column_id, field_list in section_list:
+        column_id_list = get_column_interval(start_column_id, end_column_id)
+        if len(column_id_list) != len(field_list) or (
+            column_index_from_string(start_column_id) != len(field_row) + 1
+        ):
+            raise ValueError(f"Columns of the {name} section do not match its fields")
+        for index, field in enumerate(field_list):
+            section_cell = WriteOnlyCell(work_sheet, value=name if index == 0 else None)
+            field_cell = WriteOnlyCell(work_sheet, value=field)
+            section_cell.font = field_cell.font = _HEADER_FONT
+            section_row.append(section_cell)
+            field_row.append(field_cell)
+    return section_row, field_row
+
+
+def write_rows(
+    work_sheet: WriteOnlyWorksheet,
+    section_list: t.Sequence[Section],
+    row_list: t.Iterable[t.List[t.Any]],
+    start_row_id: int,
+    hyperlink_column_id_list: t.Sequence[str] = (),
+) -> int:
+    """
+    Write the header and the rows of a report in a single pass
+
+    The section names and the field names are written on the two rows above
+    `start_row_id`, so that every value lands in the same cell as in the
+    template of the report.
+
+    Args:
+        work_sheet:                  <WriteOnlyWorksheet>
+                                     The worksheet to write
+        section_list:                <Sequence[Section]>
+                                     The sections of the columns, in order
+        row_list:                    <Iterable[List[Any]]>
+                                     The values of each row, one per field
+        start_row_id:                <int>
+                                     The row of the first values
+        hyperlink_column_id_list:    <Sequence[str]>
+                                     The columns holding urls, written as links
+
+    Returns:
+        <int>
+        The number of rows written
+    """
+    if start_row_id < 3:
+        raise ValueError("start_row_id must leave two rows for the header")
+    for _ in range(start_row_id - 3):
+        work_sheet.append([])
+    for header_row in _header_rows(work_sheet, section_list):
+        work_sheet.append(header_row)
+
+    hyperlink_index_list = [
+        column_index_from_string(column_id) - 1
+        for column_id in hyperlink_column_id_list
+    ]
+    count = 0
+    for row in row_list:
+        if hyperlink_index_list:
+            row = list(row)
+        for index in hyperlink_index_list:
+            if row[index]:
+                cell = WriteOnlyCell(work_sheet)
+                cell.hyperlink = row[index]
+                row[index] = cell
+        work_sheet.append(row)
+        count += 1
+    return count
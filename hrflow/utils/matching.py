@@ -0,0 +1,282 @@
+import typing as t
+
+from ..core import require_numpy
+from .embedding import EmbeddingStore
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+METRIC_VALUES = ["cosine", "dot"]
+DEFAULT_BLOCK_SIZE = 65536
+SAMPLES_PER_CLUSTER = 256
+
+Match = t.Tuple[str, float]
+
+
+def _top_k(scores: "np.ndarray", k: int) -> t.Tuple["np.ndarray", "np.ndarray"]:
+    """Columns and values of the k best scores of each row, in decreasing order"""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return (
+            np.empty((len(scores), 0), dtype=np.int64),
+            np.empty((len(scores), 0), dtype=scores.dtype),
+        )
+    columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    return (
+        np.take_along_axis(columns, order, axis=1),
+        np.take_along_axis(values, order, axis=1),
+    )
+
+
+def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+class ExactIndex:
+    """
+    Brute-force similarity search over an EmbeddingStore
+
+    Scores are computed with a matrix multiply over blocks of `block_size` rows of
+    the memory-mapped vectors, so memory usage does not depend on the store size.
+    """
+
+    def __init__(
+        self,
+        store: EmbeddingStore,
+        metric: str = "cosine",
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        """
+        Args:
+            store:                  <EmbeddingStore>
+                                    Store of the searched embeddings
+            metric:                 <str>
+                                    "cosine" or "dot"
+            block_size:             <int>
+                                    Number of vectors scored at once
+        """
+        require_numpy()
+        if metric not in METRIC_VALUES:
+            raise ValueError(f"metric must be in {METRIC_VALUES}")
+        self.store = store
+        self.metric = metric
+        self.block_size = block_size
+        self._norms = None
+
+    def _prepare_queries(self, queries: "np.ndarray") -> "np.ndarray":
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if self.metric == "cosine":
+            queries = _normalize(queries)
+        return queries
+
+    def _block_norms(self, start: int, stop: int) -> "np.ndarray":
+        if self._norms is None or len(self._norms) != len(self.store):
+            self._norms = np.concatenate([
+                np.linalg.norm(self.store.vectors[i : i + self.block_size], axis=1)
+                for i in range(0, len(self.store), self.block_size)
+            ])
+            self._norms[self._norms == 0] = 1
+        return self._norms[start:stop]
+
+    def _score(self, queries: "np.ndarray", rows: "np.ndarray") -> "np.ndarray":
+        """Scores of the queries against the given rows of the store"""
+        vectors = self.store.vectors[rows]
+        scores = queries @ vectors.T
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1)
+            norms[norms == 0] = 1
+            scores /= norms
+        return scores
+
+    def _matches(
+        self, rows: "np.ndarray", scores: "np.ndarray"
+    ) -> t.List[t.List[Match]]:
+        keys = self.store.keys
+        return [
+            [(keys[row], float(score)) for row, score in zip(row_list, score_list)]
+            for row_list, score_list in zip(rows, scores)
+        ]
+
+    def search(self, queries: "np.ndarray", top_k: int = 10) -> t.List[t.List[Match]]:
+        """
+        Find the most similar items to each query
+
+        Args:
+            queries:                <np.ndarray>
+                                    A vector or a (n_queries, dimension) matrix
+            top_k:                  <int>
+                                    Number of items to return per query
+
+        Returns:
+            <List[List[Tuple[str, float]]]>
+            For each query, the (key, score) pairs of the top_k items by
+            decreasing score
+        """
+        queries = self._prepare_queries(queries)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self.store), self.block_size):
+            stop = min(start + self.block_size, len(self.store))
+            scores = queries @ self.store.vectors[start:stop].T
+            if self.metric == "cosine":
+                scores /= self._block_norms(start, stop)
+            rows, scores = _top_k(scores, top_k)
+            rows = np.concatenate([best_rows, rows + start], axis=1)
+            scores = np.concatenate([best_scores, scores], axis=1)
+            columns, best_scores = _top_k(scores, top_k)
+            best_rows = np.take_along_axis(rows, columns, axis=1)
+        return self._matches(best_rows, best_scores)
+
+    def search_key(self, key: str, top_k: int = 10) -> t.List[Match]:
+        """Find the most similar items to the stored item `key`, excluding it"""
+        matches = self.search(self.store.get(key), top_k + 1)[0]
+        return [match for match in matches if match[0] != key][:top_k]
+
+
+class IVFIndex(ExactIndex):
+    """
+    Approximate similarity search over an EmbeddingStore
+
+    The vectors are partitioned with k-means into `n_clusters` inverted lists.
+    A query is only scored against the vectors of the `n_probe` clusters whose
+    centroids are the closest to it, trading recall for speed.
+    """
+
+    def __init__(
+        self,
+        store: EmbeddingStore,
+        n_clusters: t.Optional[int] = None,
+        n_probe: int = 8,
+        metric: str = "cosine",
+        n_iter: int = 10,
+        seed: int = 0,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        """
+        Args:
+            store:                  <EmbeddingStore>
+                                    Store of the searched embeddings
+            n_clusters:             <Optional[int]>
+                                    Number of clusters, defaults to sqrt(len(store))
+            n_probe:                <int>
+                                    Number of clusters scored per query
+            metric:                 <str>
+                                    "cosine" or "dot"
+            n_iter:                 <int>
+                                    Number of k-means iterations
+            seed:                   <int>
+                                    Seed of the k-means initialization
+            block_size:             <int>
+                                    Number of vectors assigned at once
+        """
+        super().__init__(store, metric, block_size)
+        self.n_clusters = n_clusters or max(1, int(np.sqrt(len(store))))
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = None
+        self.rows = None
+        self.offsets = None
+
+    def _assign(self, vectors: "np.ndarray") -> "np.ndarray":
+        if self.metric == "cosine":
+            vectors = _normalize(vectors)
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def train(self) -> "IVFIndex":
+        """Compute the centroids on a sample of the store and fill the lists"""
+        if not len(self.store):
+            raise ValueError("Cannot train an index on an empty store")
+        n_clusters = min(self.n_clusters, len(self.store))
+        rng = np.random.default_rng(self.seed)
+        n_samples = min(len(self.store), n_clusters * SAMPLES_PER_CLUSTER)
+        samples = np.sort(rng.choice(len(self.store), n_samples, replace=False))
+        samples = np.asarray(self.store.vectors[samples], dtype=np.float32)
+        if self.metric == "cosine":
+            samples = _normalize(samples)
+
+        self.centroids = samples[rng.choice(n_samples, n_clusters, replace=False)]
+        for _ in range(self.n_iter):
+            labels = np.argmax(samples @ self.centroids.T, axis=1)
+            for cluster in range(n_clusters):
+                members = samples[labels == cluster]
+                if len(members):
+                    self.centroids[cluster] = members.mean(axis=0)
+            if self.metric == "cosine":
+                self.centroids = _normalize(self.centroids)
+
+        labels = np.concatenate([
+            self._assign(self.store.vectors[i : i + self.block_size])
+            for i in range(0, len(self.store), self.block_size)
+        ])
+        self.rows = np.argsort(labels, kind="stable")
+        self.offsets = np.searchsorted(
+            labels[self.rows], np.arange(n_clusters + 1), side="left"
+        )
+        return self
+
+    def save(self, path: str) -> None:
+        """Save the trained centroids and lists to a .npz file"""
+        if self.centroids is None:
+            raise ValueError("The index must be trained before being saved")
+        np.savez(path, centroids=self.centroids, rows=self.rows, offsets=self.offsets)
+
+    def load(self, path: str) -> "IVFIndex":
+        """Load centroids and lists saved with `save`"""
+        with np.load(path) as data:
+            self.centroids = data["centroids"]
+            self.rows = data["rows"]
+            self.offsets = data["offsets"]
+        if len(self.rows) != len(self.store):
+            raise ValueError("The index was trained on a different store")
+        return self
+
+    def search(
+        self,
+        queries: "np.ndarray",
+        top_k: int = 10,
+        n_probe: t.Optional[int] = None,
+    ) -> t.List[t.List[Match]]:
+        """
+        Find items similar to each query among the closest clusters
+
+        Args:
+            queries:                <np.ndarray>
+                                    A vector or a (n_queries, dimension) matrix
+            top_k:                  <int>
+                                    Number of items to return per query
+            n_probe:                <Optional[int]>
+                                    Overrides the number of scored clusters
+
+        Returns:
+            <List[List[Tuple[str, float]]]>
+            For each query, the (key, score) pairs of at most top_k items by
+            decreasing score
+        """
+        if self.centroids is None:
+            self.train()
+        queries = self._prepare_queries(queries)
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        clusters, _ = _top_k(queries @ self.centroids.T, n_probe)
+
+        results = []
+        for query, query_clusters in zip(queries, clusters):
+            candidates = np.sort(
+                np.concatenate([
+                    self.rows[self.offsets[cluster] : self.offsets[cluster + 1]]
+                    for cluster in query_clusters
+                ])
+            )
+            if not len(candidates):
+                results.append([])
+                continue
+            scores = self._score(query[None], candidates)
+            columns, scores = _top_k(scores, top_k)
+            results += self._matches(candidates[columns], scores)
+        return results
@@ -1,7 +1,31 @@
+import heapq
+import os
 import typing as t
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
+from tqdm import tqdm
+
+from ..core.codec import dumps, loads
+from ..core.pagination import check_page
 from ..schemas import Education, Experience, HrFlowProfile
-from .searching import is_valid_for_searching
+from .searching import (
+    SEARCHING_COLUMNS,
+    _as_columns,
+    _is_valid_dict_for_searching,
+    _searching_reasons,
+    _searching_row,
+    is_valid_for_searching,
+)
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+DEFAULT_GROUP_SIZE = 20
+DEFAULT_MAX_WORKERS = 8
+MAX_PAGE_LIMIT = 30
+
+REASON_NO_SCORING_CONTENT = 4
+SCORING_COLUMNS = SEARCHING_COLUMNS + ("content",)
 
 
 def is_valid_experiences_for_scoring(
@@ -43,8 +67,71 @@ def is_valid_educations_for_scoring(
     return False
 
 
+def _has_scoring_content(profile: t.Dict) -> bool:
+    if (
+        (profile.get("info") or {}).get("summary")
+        or profile.get("skills")
+        or profile.get("tasks")
+    ):
+        return True
+    for experience in profile.get("experiences") or []:
+        if experience.get("title"):
+            return True
+    for education in profile.get("educations") or []:
+        if education.get("title") or education.get("school"):
+            return True
+    return False
+
+
+def _is_valid_dict_for_scoring(profile: t.Dict) -> bool:
+    """
+    Same check as is_valid_for_scoring on a raw profile, without building a
+    HrFlowProfile
+    """
+    return _is_valid_dict_for_searching(profile) and _has_scoring_content(profile)
+
+
+def _scoring_row(profile: t.Dict) -> t.Tuple:
+    """Values of the SCORING_COLUMNS of a raw profile"""
+    return _searching_row(profile) + (_has_scoring_content(profile),)
+
+
+def bulk_is_valid_for_scoring(
+    profiles: t.Union[t.Iterable[t.Dict], t.Mapping[str, t.Sequence]],
+) -> t.Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Check if many raw profiles are valid for scoring
+
+    The few fields the rules depend on are extracted in a single pass over the
+    profiles, then the rules are evaluated on whole columns at once.
+
+    Args:
+        profiles:               <Iterable[dict]> or <Mapping[str, Sequence]>
+                                Raw profiles as returned by the API, or a columnar
+                                batch mapping each of SCORING_COLUMNS to the values
+                                of all the profiles. See
+                                bulk_is_valid_for_searching for the searching
+                                columns, "content" being True when the profile
+                                has a titled experience, a titled education or an
+                                education with a school, a summary, skills or
+                                tasks.
+    Return:
+        <Tuple[np.ndarray, np.ndarray]>
+                                A boolean array, True for the profiles valid for
+                                scoring, and a uint8 array of reason codes: the
+                                bitwise or of REASON_NO_TEXT,
+                                REASON_INSUFFICIENT_INFO and
+                                REASON_NO_SCORING_CONTENT, 0 for valid profiles
+    """
+    columns = _as_columns(profiles, SCORING_COLUMNS, _scoring_row)
+    reasons = _searching_reasons(columns)
+    reasons[~columns["content"]] |= REASON_NO_SCORING_CONTENT
+    return reasons == 0, reasons
+
+
 def is_valid_for_scoring(
     profile: t.Union[t.Dict, HrFlowProfile],
+    trusted: bool = False,
 ) -> bool:
     """
     Check if a profile is valid for scoring
@@ -56,11 +143,18 @@ def is_valid_for_scoring(
                                 Hrflow client
         profile:                <dict> or <HrFlowProfile>
                                 Profile to check
+        trusted:                <bool>
+                                If True, a dict profile is checked as is instead of
+                                being validated as a HrFlowProfile. Use it for
+                                profiles returned by the API, which are already
+                                valid.
     Return:
         <bool>                  True if the profile is valid for scoring,
                                 False otherwise
     """
     if isinstance(profile, dict):
+        if trusted:
+            return _is_valid_dict_for_scoring(profile)
         profile = HrFlowProfile.model_validate(profile)
 
     if not isinstance(profile, HrFlowProfile):
@@ -73,3 +167,269 @@ def is_valid_for_scoring(
         or bool(profile.skills)
         or bool(profile.tasks)
     )
+
+
+def score_across_sources(
+    client: "Hrflow",  # noqa: F821
+    source_keys: t.List[str],
+    board_key: str,
+    job_key: str,
+    top_k: int = 30,
+    group_size: int = DEFAULT_GROUP_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    **kwargs,
+) -> t.Dict[str, t.Any]:
+    """
+    Score the profiles of many sources for a job
+
+    Instead of a single `profiles/scoring` call with all the source keys, the
+    sources are split into groups of `group_size` keys scored concurrently. The
+    best `top_k` profiles of each group are then merged into the global top_k.
+
+    Args:
+        client:                 <Hrflow>
+                                Hrflow client
+        source_keys:            <list>
+                                Keys of the sources of the scored profiles
+        board_key:              <string>
+                                board_key
+        job_key:                <string>
+                                job_key
+        top_k:                  <int>
+                                Number of profiles to return
+        group_size:             <int>
+                                Number of source keys per `profiles/scoring` call
+        max_workers:            <int>
+                                Number of groups scored concurrently
+        **kwargs:               Other arguments of ProfileScoring.list
+                                (use_agent, agent_key, stage, ...)
+    Return:
+        <dict>                  A response shaped like the one of
+                                ProfileScoring.list, holding the top_k profiles
+                                of all the sources sorted by decreasing score
+    """
+    if not source_keys:
+        raise ValueError("source_keys must contain at least one key")
+    groups = [
+        source_keys[i : i + group_size] for i in range(0, len(source_keys), group_size)
+    ]
+    kwargs.pop("page", None)
+    kwargs.pop("sort_by", None)
+    kwargs.pop("order_by", None)
+    limit = kwargs.pop("limit", min(top_k, MAX_PAGE_LIMIT))
+
+    def score_group(group: t.List[str]) -> t.Tuple[int, t.List[t.Tuple]]:
+        entries = []
+        total = 0
+        page, max_page = 1, 1
+        while page <= max_page and len(entries) < top_k:
+            response = check_page(
+                client.profile.scoring.list(
+                    source_keys=group,
+                    board_key=board_key,
+                    job_key=job_key,
+                    page=page,
+                    limit=limit,
+                    sort_by="scoring",
+                    order_by="desc",
+                    **kwargs,
+                )
+            )
+            meta = response.get("meta") or {}
+            max_page = meta.get("maxPage") or 1
+            total = meta.get("total", total)
+            data = response.get("data") or {}
+            for profile, prediction in zip(
+                data.get("profiles") or [], data.get("predictions") or []
+            ):
+                entries.append((prediction[-1], profile, prediction))
+            page += 1
+        return total, entries[:top_k]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups)))) as pool:
+        results = list(pool.map(score_group, groups))
+
+    best = heapq.nlargest(
+        top_k,
+        (entry for _, entries in results for entry in entries),
+        key=lambda entry: entry[0],
+    )
+    return {
+        "code": 200,
+        "message": "Profile Scoring results",
+        "meta": {
+            "page": 1,
+            "maxPage": 1,
+            "count": len(best),
+            "total": sum(total for total, _ in results),
+        },
+        "data": {
+            "profiles": [profile for _, profile, _ in best],
+            "predictions": [prediction for _, _, prediction in best],
+        },
+    }
+
+
+def _scored_keys(output_path: str) -> t.Set[str]:
+    """Keys successfully scored in a batch output file"""
+    keys = set()
+    if not os.path.isfile(output_path):
+        return keys
+    with open(output_path, "r") as file:
+        for line in file:
+            try:
+                result = loads(line)
+            except ValueError:  # line truncated by an interruption
+                continue
+            if result.get("response", {}).get("code") == 200:
+                keys.add(result["key"])
+    return keys
+
+
+def _score_batch(
+    keys: t.Iterable[str],
+    score_item: t.Callable[[str], t.Dict[str, t.Any]],
+    output_path: str,
+    max_workers: int,
+    description: str,
+    show_progress: bool,
+) -> t.Dict[str, int]:
+    done_keys = _scored_keys(output_path)
+    unique_keys = list(dict.fromkeys(keys))
+    keys = [key for key in unique_keys if key not in done_keys]
+    # The output file may hold the keys of other batches
+    counts = {"scored": 0, "failed": 0, "skipped": len(unique_keys) - len(keys)}
+
+    progress = tqdm(total=len(keys), desc=description, disable=not show_progress)
+    with open(output_path, "a+") as file, ThreadPoolExecutor(max_workers) as pool:
+        file.seek(0, os.SEEK_END)
+        if file.tell() > 0:
+            file.seek(file.tell() - 1)
+            if file.read(1) != "\n":
+                file.write("\n")
+
+        key_iterator = iter(keys)
+        pending = {}
+        while True:
+            # Bound the number of queued calls instead of submitting all the keys
+            for key in key_iterator:
+                pending[pool.submit(score_item, key)] = key
+                if len(pending) >= 2 * max_workers:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as error:
+                    response = {"code": None, "message": repr(error)}
+                file.write(dumps({"key": key, "response": response}) + "\n")
+                file.flush()
+                counts["scored" if response.get("code") == 200 else "failed"] += 1
+                progress.update()
+    progress.close()
+    return counts
+
+
+def score_jobs_batch(
+    client: "Hrflow",  # noqa: F821
+    job_keys: t.Iterable[str],
+    board_key: str,
+    source_keys: t.List[str],
+    output_path: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    show_progress: bool = False,
+    **kwargs,
+) -> t.Dict[str, int]:
+    """
+    Score the profiles of sources for many jobs, with ProfileScoring.list
+
+    The jobs are scored concurrently and each response is appended to
+    `output_path` as a JSON line {"key": job_key, "response": response} as soon
+    as it is received. Jobs already successfully scored in `output_path` are
+    skipped, so an interrupted batch is resumed by calling the function again.
+
+    Args:
+        client:                 <Hrflow>
+                                Hrflow client
+        job_keys:               <Iterable[str]>
+                                Keys of the jobs to score profiles for
+        board_key:              <string>
+                                board_key of the jobs
+        source_keys:            <list>
+                                Keys of the sources of the scored profiles
+        output_path:            <string>
+                                Path of the JSONL output file
+        max_workers:            <int>
+                                Number of concurrent calls
+        show_progress:          <bool>
+                                Show the progress bar
+        **kwargs:               Other arguments of ProfileScoring.list
+    Return:
+        <dict>                  Number of "scored", "failed" and "skipped" jobs
+    """
+    return _score_batch(
+        job_keys,
+        lambda job_key: client.profile.scoring.list(
+            source_keys=source_keys, board_key=board_key, job_key=job_key, **kwargs
+        ),
+        output_path,
+        max_workers,
+        "Scoring jobs",
+        show_progress,
+    )
+
+
+def score_profiles_batch(
+    client: "Hrflow",  # noqa: F821
+    profile_keys: t.Iterable[str],
+    source_key: str,
+    board_keys: t.List[str],
+    output_path: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    show_progress: bool = False,
+    **kwargs,
+) -> t.Dict[str, int]:
+    """
+    Score the jobs of boards for many profiles, with JobScoring.list
+
+    The profiles are scored concurrently and each response is appended to
+    `output_path` as a JSON line {"key": profile_key, "response": response} as
+    soon as it is received. Profiles already successfully scored in
+    `output_path` are skipped, so an interrupted batch is resumed by calling the
+    function again.
+
+    Args:
+        client:                 <Hrflow>
+                                Hrflow client
+        profile_keys:           <Iterable[str]>
+                                Keys of the profiles to score jobs for
+        source_key:             <string>
+                                source_key of the profiles
+        board_keys:             <list>
+                                Keys of the boards of the scored jobs
+        output_path:            <string>
+                                Path of the JSONL output file
+        max_workers:            <int>
+                                Number of concurrent calls
+        show_progress:          <bool>
+                                Show the progress bar
+        **kwargs:               Other arguments of JobScoring.list
+    Return:
+        <dict>                  Number of "scored", "failed" and "skipped" profiles
+    """
+    return _score_batch(
+        profile_keys,
+        lambda profile_key: client.job.scoring.list(
+            board_keys=board_keys,
+            source_key=source_key,
+            profile_key=profile_key,
+            **kwargs,
+        ),
+        output_path,
+        max_workers,
+        "Scoring profiles",
+        show_progress,
+    )
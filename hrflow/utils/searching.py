@@ -1,7 +1,34 @@
 import typing as t
 
+from ..core import require_numpy
 from ..schemas import HrFlowProfile, ProfileInfo
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+INFO_SCORE_FIELDS = (
+    "first_name",
+    "last_name",
+    "phone",
+    "date_birth",
+    "gender",
+    "summary",
+    "urls",
+    "location",
+)
+
+_INFO_SCORE_TEXT_FIELDS = tuple(
+    field for field in INFO_SCORE_FIELDS if field != "location"
+)
+
+REASON_NO_TEXT = 1
+REASON_INSUFFICIENT_INFO = 2
+SEARCHING_COLUMNS = ("text", "email", "person", "info_score")
+
+Columns = t.Dict[str, "np.ndarray"]
+
 
 def is_valid_info_for_searching(info: ProfileInfo) -> bool:
     """
@@ -41,8 +68,36 @@ def is_valid_info_for_searching(info: ProfileInfo) -> bool:
     return info.email or has_person or info_score >= 0.5
 
 
+def _info_score_count(info: t.Dict) -> int:
+    get = info.get
+    # a location is an object, set even when all its fields are empty
+    return (get("location") is not None) + len(
+        [field for field in _INFO_SCORE_TEXT_FIELDS if get(field)]
+    )
+
+
+def _is_valid_info_dict_for_searching(info: t.Optional[t.Dict]) -> bool:
+    """
+    Same check as is_valid_info_for_searching on the raw info of a profile,
+    without building a ProfileInfo
+    """
+    if not info:
+        return False
+    info_score = _info_score_count(info) / len(INFO_SCORE_FIELDS)
+    has_person = info.get("first_name") and info.get("last_name")
+
+    return info.get("email") or has_person or info_score >= 0.5
+
+
+def _is_valid_dict_for_searching(profile: t.Dict) -> bool:
+    return bool(_is_valid_info_dict_for_searching(profile.get("info"))) and bool(
+        profile.get("text")
+    )
+
+
 def is_valid_for_searching(
     profile: t.Union[t.Dict, HrFlowProfile],
+    trusted: bool = False,
 ) -> bool:
     """
     Check if a profile is valid for searching
@@ -54,14 +109,103 @@ def is_valid_for_searching(
                                 Hrflow client
         profile:                <dict> or <HrFlowProfile>
                                 Profile to check
+        trusted:                <bool>
+                                If True, a dict profile is checked as is instead of
+                                being validated as a HrFlowProfile. Use it for
+                                profiles returned by the API, which are already
+                                valid.
     Return:
         <bool>                  True if the profile is valid for searching,
                                 False otherwise
     """
     if isinstance(profile, dict):
+        if trusted:
+            return _is_valid_dict_for_searching(profile)
         profile = HrFlowProfile.model_validate(profile)
 
     if not isinstance(profile, HrFlowProfile):
         raise ValueError("profile must be a dict or a HrFlowProfile object")
 
     return is_valid_info_for_searching(profile.info) and bool(profile.text)
+
+
+def _searching_row(profile: t.Dict) -> t.Tuple[bool, bool, bool, int]:
+    """Values of the SEARCHING_COLUMNS of a raw profile"""
+    info = profile.get("info") or {}
+    return (
+        bool(profile.get("text")),
+        bool(info.get("email")),
+        bool(info.get("first_name") and info.get("last_name")),
+        _info_score_count(info),
+    )
+
+
+def _rows_to_columns(
+    rows: t.Iterable[t.Tuple], column_names: t.Tuple[str, ...]
+) -> Columns:
+    matrix = np.array(list(rows), dtype=np.uint8).reshape(-1, len(column_names))
+    return {
+        name: matrix[:, i] if name == "info_score" else matrix[:, i].astype(bool)
+        for i, name in enumerate(column_names)
+    }
+
+
+def _as_columns(
+    profiles: t.Union[t.Iterable[t.Dict], t.Mapping[str, t.Sequence]],
+    column_names: t.Tuple[str, ...],
+    get_row: t.Callable[[t.Dict], t.Tuple],
+) -> Columns:
+    require_numpy()
+    if isinstance(profiles, t.Mapping):
+        missing = set(column_names) - set(profiles)
+        if missing:
+            raise ValueError(f"Missing columns: {sorted(missing)}")
+        return {
+            name: np.asarray(
+                profiles[name], dtype=np.uint8 if name == "info_score" else bool
+            )
+            for name in column_names
+        }
+    return _rows_to_columns(map(get_row, profiles), column_names)
+
+
+def _searching_reasons(columns: Columns) -> "np.ndarray":
+    reasons = np.zeros(len(columns["text"]), dtype=np.uint8)
+    reasons[~columns["text"]] |= REASON_NO_TEXT
+    has_info = (
+        columns["email"]
+        | columns["person"]
+        | (columns["info_score"] / len(INFO_SCORE_FIELDS) >= 0.5)
+    )
+    reasons[~has_info] |= REASON_INSUFFICIENT_INFO
+    return reasons
+
+
+def bulk_is_valid_for_searching(
+    profiles: t.Union[t.Iterable[t.Dict], t.Mapping[str, t.Sequence]],
+) -> t.Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Check if many raw profiles are valid for searching
+
+    The few fields the rules depend on are extracted in a single pass over the
+    profiles, then the rules are evaluated on whole columns at once.
+
+    Args:
+        profiles:               <Iterable[dict]> or <Mapping[str, Sequence]>
+                                Raw profiles as returned by the API, or a columnar
+                                batch mapping each of SEARCHING_COLUMNS to the
+                                values of all the profiles:
+                                    - text: the profile has a text
+                                    - email: the info has an email
+                                    - person: the info has a first and last name
+                                    - info_score: number of INFO_SCORE_FIELDS set
+    Return:
+        <Tuple[np.ndarray, np.ndarray]>
+                                A boolean array, True for the profiles valid for
+                                searching, and a uint8 array of reason codes: the
+                                bitwise or of REASON_NO_TEXT and
+                                REASON_INSUFFICIENT_INFO, 0 for valid profiles
+    """
+    columns = _as_columns(profiles, SEARCHING_COLUMNS, _searching_row)
+    reasons = _searching_reasons(columns)
+    return reasons == 0, reasons
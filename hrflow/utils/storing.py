@@ -2,6 +2,8 @@ import typing as t
 
 from tqdm import tqdm
 
+from ..core.pagination import DEFAULT_PREFETCH, iterate_pages
+
 
 def get_all_profiles(
     client: "Hrflow",  # noqa: F821
@@ -67,3 +69,84 @@ def get_all_jobs(
         )["data"]
 
     return job_list
+
+
+def iterate_all_profiles(
+    client: "Hrflow",  # noqa: F821
+    source_key: str,
+    show_progress: bool = False,
+    prefetch: int = DEFAULT_PREFETCH,
+    sort_by: str = "created_at",
+) -> t.Iterator[t.Dict[str, t.Any]]:
+    """
+    Iterate over all the profiles of a source, page by page, while the next
+    pages are being retrieved in background threads.
+
+    Args:
+        client:                 <hrflow.Client>
+                                hrflow client
+        source_key:             <string>
+                                source_key
+        show_progress:          <bool>
+                                Show the progress bar
+        prefetch:               <int>
+                                Number of pages retrieved ahead of the current one
+        sort_by:                <string>
+                                Field sorting the items, in descending order
+
+    Yields
+        <Dict>:
+        The profiles, only `prefetch` + 1 pages being held in memory
+    """
+
+    def list_page(page: int) -> t.Dict[str, t.Any]:
+        return client.profile.storing.list(
+            source_keys=[source_key],
+            page=page,
+            return_profile=True,
+            sort_by=sort_by,
+        )
+
+    profiles = (profile for profile, _ in iterate_pages(list_page, None, prefetch))
+    if show_progress:
+        profiles = tqdm(profiles, "Retrieving profiles")
+    return profiles
+
+
+def iterate_all_jobs(
+    client: "Hrflow",  # noqa: F821
+    board_key: str,
+    show_progress: bool = False,
+    prefetch: int = DEFAULT_PREFETCH,
+    sort_by: str = "created_at",
+) -> t.Iterator[t.Dict[str, t.Any]]:
+    """
+    Iterate over all the jobs of a board, page by page, while the next pages
+    are being retrieved in background threads.
+
+    Args:
+        client:                 <hrflow.Client>
+                                hrflow client
+        board_key:              <string>
+                                board_key
+        show_progress:          <bool>
+                                Show the progress bar
+        prefetch:               <int>
+                                Number of pages retrieved ahead of the current one
+        sort_by:                <string>
+                                Field sorting the items, in descending order
+
+    Yields
+        <Dict>:
+        The jobs, only `prefetch` + 1 pages being held in memory
+    """
+
+    def list_page(page: int) -> t.Dict[str, t.Any]:
+        return client.job.storing.list(
+            board_keys=[board_key], page=page, return_job=True, sort_by=sort_by
+        )
+
+    jobs = (job for job, _ in iterate_pages(list_page, None, prefetch))
+    if show_progress:
+        jobs = tqdm(jobs, "Retrieving jobs")
+    return jobs
@@ -0,0 +1,127 @@
+"""
+Read-only views over the raw profile and job JSON returned by the API.
+
+A view only holds a reference to its dict: nested objects (info, location,
+experiences, educations) are wrapped in views when accessed, and the full
+pydantic models of hrflow.schemas are only built on `to_model()`.
+
+Usage:
+>>> response = client.profile.storing.list(source_keys=[key], return_profile=True)
+>>> profiles = [ProfileView(profile) for profile in response["data"]]
+>>> profiles[0].experiences[0].location.text
+"""
+
+import typing as t
+
+from pydantic import BaseModel
+
+from .schemas import (
+    Education,
+    Experience,
+    HrFlowJob,
+    HrFlowProfile,
+    Location,
+    ProfileInfo,
+)
+
+
+class JsonView:
+    """Read-only attribute access to a dict, following the fields of a model."""
+
+    __slots__ = ("_data",)
+
+    _model: t.ClassVar[t.Type[BaseModel]] = BaseModel
+    # Fields holding nested objects (or lists of them) and their view class
+    _nested: t.ClassVar[t.Dict[str, t.Type["JsonView"]]] = {}
+
+    def __init__(self, data: t.Dict[str, t.Any]):
+        object.__setattr__(self, "_data", data)
+
+    def __getattr__(self, name: str) -> t.Any:
+        if name not in self._model.model_fields:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        value = self._data.get(name)
+        view = self._nested.get(name)
+        if view is None or value is None:
+            return value
+        if isinstance(value, list):
+            return tuple(view(item) for item in value)
+        return view(value)
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"'{type(self).__name__}' object is read-only")
+
+    def __reduce__(self) -> t.Tuple[t.Any, ...]:
+        # Rebuilt through __init__ by pickle and copy, __setattr__ raising
+        return type(self), (self._data,)
+
+    def __getitem__(self, name: str) -> t.Any:
+        """Raw value of a field, without any view"""
+        return self._data[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._data
+
+    def __eq__(self, other: t.Any) -> bool:
+        if isinstance(other, JsonView):
+            return type(self) is type(other) and self._data == other._data
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+    def get(self, name: str, default: t.Any = None) -> t.Any:
+        """Raw value of a field, without any view"""
+        return self._data.get(name, default)
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        """The raw dict of the view (not a copy)"""
+        return self._data
+
+    def to_model(self) -> BaseModel:
+        """Validate the raw dict into the full pydantic model"""
+        return self._model.model_validate(self._data)
+
+
+class LocationView(JsonView):
+    __slots__ = ()
+    _model = Location
+
+
+class ExperienceView(JsonView):
+    __slots__ = ()
+    _model = Experience
+    _nested = {"location": LocationView}
+
+
+class EducationView(JsonView):
+    __slots__ = ()
+    _model = Education
+    _nested = {"location": LocationView}
+
+
+class ProfileInfoView(JsonView):
+    __slots__ = ()
+    _model = ProfileInfo
+    _nested = {"location": LocationView}
+
+
+class ProfileView(JsonView):
+    __slots__ = ()
+    _model = HrFlowProfile
+    _nested = {
+        "info": ProfileInfoView,
+        "experiences": ExperienceView,
+        "educations": EducationView,
+    }
+
+
+class JobView(JsonView):
+    __slots__ = ()
+    _model = HrFlowJob
+    _nested = {"location": LocationView}
@@ -1,13 +1,17 @@
 """Webhook support."""
 
+import asyncio
+import base64
+import binascii
 import hashlib
 import hmac
 import inspect
-import json
 import sys
 
-from . import base64Wrapper as base64W
-from . import bytesutils, hmacutils
+from ..core.codec import loads
+from .batching import DEFAULT_BATCH_SIZE, DEFAULT_BATCH_WAIT, EventBatcher
+from .dedup import DedupCache, MemoryDedupCache, SqliteDedupCache
+from .receiver import WebhookReceiver
 
 EVENT_PROFILE_PARSE_SUCCESS = "profile.parse.success"
 EVENT_PROFILE_PARSE_ERROR = "profile.parse.error"
@@ -28,6 +32,20 @@ ACTION_RATING_ERROR = "action.rating.error"
 SIGNATURE_HEADER = "HTTP-HRFLOW-SIGNATURE"
 
 
+def _urlsafe_b64decode(inp):
+    """Decode base64url, with or without its padding."""
+    if isinstance(inp, str):
+        inp = inp.encode("ascii")
+    try:
+        return base64.urlsafe_b64decode(inp + b"=" * (-len(inp) % 4))
+    except binascii.Error as error:
+        raise ValueError("Error invalid request: {}".format(error)) from error
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
 class Webhook(object):
     """Class that handles Webhooks."""
 
@@ -50,6 +68,33 @@ class Webhook(object):
             ACTION_RATING_SUCCESS: None,
             ACTION_RATING_ERROR: None,
         }
+        # (secret, HMAC keyed with it), copied for each signature to verify
+        self._hmac = (None, None)
+        # event name -> (max_size, max_wait) of the batch handlers
+        self.batch_settings = {}
+        self._batchers = {}
+        # Open WebhookReceivers, holding batches of their own
+        self._receivers = set()
+        # Set by your own server calling handle, see listening
+        self._listening = False
+        # Called with every verified event, before its handler
+        self._listeners = []
+        # DedupCache of the deliveries handled already (e.g. MemoryDedupCache),
+        # the repeated deliveries are ignored
+        self.dedup_cache = None
+
+    @property
+    def listening(self):
+        """
+        Whether the webhooks are received, by an open WebhookReceiver or by
+        your own server calling handle. Set it in the latter case, so that the
+        parsing waits do not poll the API.
+        """
+        return self._listening or bool(self._receivers)
+
+    @listening.setter
+    def listening(self, listening):
+        self._listening = listening
 
     def check(self, url, type):
         """
@@ -69,21 +114,68 @@ class Webhook(object):
         data["url"] = url
         data["type"] = type
         response = self.client.post("webhook/check", json=data)
-        return response.json()
+        return loads(response.content)
 
     def test(self):
         """Get response from api for POST webhook/check."""
         response = self.client.post("webhook/test")
-        return response.json()
+        return loads(response.content)
 
     def setHandler(self, event_name, callback):
-        """Set an handler for given event."""
+        """Set an handler (function or async function) for given event."""
         if event_name not in self.handlers:
             raise ValueError("{} is not a valid event".format(event_name))
         if callable(event_name):
             raise TypeError("{} is not callable".format(callback))
+        self._remove_batch_handler(event_name)
         self.handlers[event_name] = callback
 
+    def setBatchHandler(
+        self,
+        event_name,
+        callback,
+        max_size=DEFAULT_BATCH_SIZE,
+        max_wait=DEFAULT_BATCH_WAIT,
+    ):
+        """
+        Set an handler receiving the events of a type in batches.
+
+        The handler is called with a list of at most max_size events, at the
+        latest max_wait seconds after the first one was received.
+
+        Args:
+            event_name:       <string>
+                              event type
+            callback:         <callable>
+                              function or async function called with the list
+                              of events (and the event type)
+            max_size:         <int>
+                              maximum number of events of a batch
+            max_wait:         <float>
+                              maximum time in seconds an event waits in a batch
+
+        """
+        if not callable(callback):
+            raise TypeError("{} is not callable".format(callback))
+        if max_size < 1 or max_wait < 0:
+            raise ValueError("max_size must be positive and max_wait not negative")
+        self.setHandler(event_name, callback)
+        self.batch_settings[event_name] = (max_size, max_wait)
+
+    def _remove_batch_handler(self, event_name):
+        # The pending events go to the handler being replaced
+        batcher = self._batchers.pop(event_name, None)
+        if batcher is not None:
+            batcher.flush()
+        for receiver in list(self._receivers):
+            receiver._remove_batcher(event_name)
+        self.batch_settings.pop(event_name, None)
+
+    def flush(self):
+        """Call the batch handlers with the events they are waiting for."""
+        for batcher in list(self._batchers.values()):
+            batcher.flush()
+
     def isHandlerPresent(self, event_name):
         """Check if an event has an handler."""
         if event_name not in self.handlers:
@@ -94,16 +186,12 @@ class Webhook(object):
         """Remove handler for given event."""
         if event_name not in self.handlers:
             raise ValueError("{} is not a valid event".format(event_name))
+        self._remove_batch_handler(event_name)
         self.handlers[event_name] = None
 
     def _strtr(self, inp, fr, to):
-        res = ""
-        for c in inp:
-            for idx, c_to_replace in enumerate(fr):
-                if c == c_to_replace and idx < len(to):
-                    c = to[idx]
-            res = res + c
-        return res
+        size = min(len(fr), len(to))
+        return inp.translate(str.maketrans(fr[:size], to[:size]))
 
     def _get_signature_header(self, signature_header, request_headers):
         if signature_header is not None:
@@ -120,35 +208,182 @@ class Webhook(object):
         return len(inspect.getargspec(fct)[0])
 
     def handle(self, request_headers={}, signature_header=None):
-        """Handle request."""
+        """
+        Handle request.
+
+        An async handler is run to completion, use handle_async instead when
+        an event loop is running.
+
+        """
+        decoded_request = self._verify(request_headers, signature_header)
+        if decoded_request is None:
+            return
+        self._notify(decoded_request)
+        try:
+            self._dispatch(decoded_request)
+        except Exception:
+            self._forget(request_headers, signature_header)
+            raise
+
+    def receiver(self, **kwargs):
+        """
+        Create a receiver handling the requests on worker threads.
+
+        Args:
+            **kwargs:         see WebhookReceiver
+
+        Returns
+            <WebhookReceiver>
+
+        """
+        return WebhookReceiver(self, **kwargs)
+
+    def _verify(self, request_headers={}, signature_header=None):
+        """
+        Verify the signature of a request and decode its event.
+
+        Returns
+            the event, None if the request was handled already (see dedup_cache)
+
+        """
         if self.client.webhook_secret is None:
             raise ValueError("Error: no webhook secret.")
         encoded_header = self._get_signature_header(signature_header, request_headers)
-        decoded_request = self._decode_request(encoded_header)
+        signature, data = self._verify_payload(encoded_header)
+        # The signature, verified against the payload, identifies the delivery:
+        # a repeated one is dropped before decoding its JSON. Added atomically
+        # against a concurrent delivery.
+        dedup_cache = self.dedup_cache
+        if dedup_cache is not None and not dedup_cache.add(signature):
+            return None
+        decoded_request = loads(data)
         if "type" not in decoded_request:
+            if dedup_cache is not None:
+                dedup_cache.discard(signature)
             raise ValueError("Error invalid request: no type field found.")
-        handler = self._getHandlerForEvent(decoded_request["type"])
+        return decoded_request
+
+    def _forget(self, request_headers={}, signature_header=None):
+        """Let a request be handled again, when its handler failed."""
+        if self.dedup_cache is not None:
+            encoded_header = self._get_signature_header(
+                signature_header, request_headers
+            )
+            self.dedup_cache.discard(encoded_header.split(".", 1)[0])
+
+    async def handle_async(self, request_headers={}, signature_header=None):
+        """Handle request, awaiting the handler if it is an async function."""
+        decoded_request = self._verify(request_headers, signature_header)
+        if decoded_request is None:
+            return
+        self._notify(decoded_request)
+        event_name = decoded_request["type"]
+        handler = self._getHandlerForEvent(event_name)
         if handler is None:
             return
+        if event_name in self.batch_settings:
+            # A full batch is handled on this loop, the other ones when they
+            # expire or are flushed
+            events = self._get_batcher(event_name).add(decoded_request, flush=False)
+            if events:
+                result = self._handle_batch(event_name, events)
+                if inspect.isawaitable(result):
+                    await result
+            return
+        try:
+            result = self._call_handler(handler, decoded_request, event_name)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            self._forget(request_headers, signature_header)
+            raise
+
+    def _add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def _notify(self, decoded_request):
+        for listener in self._listeners:
+            listener(decoded_request)
+
+    def _dispatch(self, decoded_request):
+        """Call the handler of a decoded event, or add it to its batch."""
+        event_name = decoded_request["type"]
+        handler = self._getHandlerForEvent(event_name)
+        if handler is None:
+            return
+        if event_name in self.batch_settings:
+            self._get_batcher(event_name).add(decoded_request)
+            return
+        self._run(self._call_handler(handler, decoded_request, event_name))
+
+    def _get_batcher(self, event_name):
+        batcher = self._batchers.get(event_name)
+        if batcher is None:
+            max_size, max_wait = self.batch_settings[event_name]
+            batcher = self._batchers.setdefault(
+                event_name,
+                EventBatcher(
+                    lambda events: self._run(self._handle_batch(event_name, events)),
+                    max_size,
+                    max_wait,
+                ),
+            )
+        return batcher
+
+    def _handle_batch(self, event_name, events):
+        handler = self._getHandlerForEvent(event_name)
+        if handler is None:
+            return None
+        return self._call_handler(handler, events, event_name)
+
+    def _call_handler(self, handler, events, event_name):
+        """Call an handler, return the awaitable of an async handler."""
         if self._get_fct_number_of_arg(handler) == 1:
-            handler(decoded_request)
+            return handler(events)
+        return handler(events, event_name)
+
+    def _run(self, result):
+        """Run the awaitable returned by an async handler."""
+        if not inspect.isawaitable(result):
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(_await(result))
             return
-        handler(decoded_request, decoded_request["type"])
+        if inspect.iscoroutine(result):
+            result.close()
+        raise RuntimeError(
+            "An async handler can not be run by handle in a running event loop,"
+            " use handle_async instead"
+        )
 
     def _base64Urldecode(self, inp):
-        inp = self._strtr(inp, "-_", "+/")
-        byte_inp = base64W.decodebytes(bytesutils.strtobytes(inp, "ascii"))
-        return byte_inp.decode("ascii")
+        return _urlsafe_b64decode(inp).decode("ascii")
 
-    def _is_signature_valid(self, signature, payload):
-        utf8_payload = bytesutils.strtobytes(payload, "utf8")
-        utf8_wb_secret = bytesutils.strtobytes(self.client.webhook_secret, "utf8")
-        hasher = hmac.new(utf8_wb_secret, utf8_payload, hashlib.sha256)
-        exp_sign_digest = hasher.hexdigest()
+    def _get_hasher(self):
+        """Get an HMAC keyed with the webhook secret, keyed once per secret."""
+        secret, keyed_hmac = self._hmac
+        if keyed_hmac is None or secret != self.client.webhook_secret:
+            secret = self.client.webhook_secret
+            keyed_hmac = hmac.new(secret.encode("utf8"), digestmod=hashlib.sha256)
+            self._hmac = (secret, keyed_hmac)
+        return keyed_hmac.copy()
 
-        return hmacutils.compare_digest(exp_sign_digest, signature)
+    def _is_signature_valid(self, signature, payload):
+        if isinstance(signature, str):
+            signature = signature.encode("ascii")
+        if isinstance(payload, str):
+            payload = payload.encode("utf8")
+        hasher = self._get_hasher()
+        hasher.update(payload)
+        return hmac.compare_digest(hasher.hexdigest().encode("ascii"), signature)
 
     def _decode_request(self, encoded_request):
+        return loads(self._verify_payload(encoded_request)[1])
+
+    def _verify_payload(self, encoded_request):
+        """Return the encoded signature and the payload bytes, once verified."""
         tmp = encoded_request.split(".", 2)
         if len(tmp) < 2:
             raise ValueError(
@@ -157,11 +392,11 @@ class Webhook(object):
             )
         encoded_sign = tmp[0]
         payload = tmp[1]
-        sign = self._base64Urldecode(encoded_sign)
-        data = self._base64Urldecode(payload)
+        sign = _urlsafe_b64decode(encoded_sign)
+        data = _urlsafe_b64decode(payload)
         if not self._is_signature_valid(sign, data):
             raise ValueError("Error: invalid signature.")
-        return json.loads(data)
+        return encoded_sign, data
 
     def _getHandlerForEvent(self, event_name):
         if event_name not in self.handlers:
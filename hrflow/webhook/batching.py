@@ -0,0 +1,93 @@
+"""
+Accumulation of webhook events in batches, flushed by size or by time.
+"""
+
+import threading
+import typing as t
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_WAIT = 1.0
+
+Event = t.Dict[str, t.Any]
+
+
+class EventBatcher:
+    """
+    Accumulate events and flush them as a list when `max_size` events are
+    pending, or `max_wait` seconds after the first pending event
+
+    Args:
+        flush:                       <Callable[[List[Dict]], None]>
+                                     Called with each batch, in the thread adding
+                                     the last event or in a timer thread
+        max_size:                    <int>
+                                     The maximum number of events of a batch
+        max_wait:                    <float>
+                                     The maximum time in seconds an event waits
+                                     for the batch to be full
+    """
+
+    def __init__(
+        self,
+        flush: t.Callable[[t.List[Event]], None],
+        max_size: int = DEFAULT_BATCH_SIZE,
+        max_wait: float = DEFAULT_BATCH_WAIT,
+    ):
+        if max_size < 1 or max_wait < 0:
+            raise ValueError("max_size must be positive and max_wait not negative")
+        self._flush = flush
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._events: t.List[Event] = []
+        self._timer: t.Optional[threading.Timer] = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _take(self) -> t.List[Event]:
+        events, self._events = self._events, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return events
+
+    def add(self, event: Event, flush: bool = True) -> t.Optional[t.List[Event]]:
+        """
+        Add an event, flushing the batch if it is full. With flush=False, the
+        full batch is returned instead, for the caller to handle it.
+        """
+        with self._lock:
+            self._events.append(event)
+            if len(self._events) >= self.max_size:
+                events = self._take()
+            else:
+                events = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.max_wait, self._expire)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if events and flush:
+            self._flush(events)
+            return None
+        return events
+
+    def _expire(self) -> None:
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                return  # flushed by size meanwhile
+            events = self._take()
+        if events:
+            self._flush(events)
+
+    def flush(self) -> None:
+        """Flush the pending events now"""
+        with self._lock:
+            events = self._take()
+        if events:
+            self._flush(events)
+
+    def clear(self) -> t.List[Event]:
+        """Drop the pending events, without flushing them, and return them"""
+        with self._lock:
+            return self._take()
@@ -0,0 +1,171 @@
+"""
+Caches of the webhook deliveries already handled, to drop the repeated ones.
+
+The deliveries are identified by the signature of their header, the HMAC of
+their payload, once it is verified: a forged request is rejected, not taken for
+a repeated delivery.
+
+Usage:
+>>> client.webhooks.dedup_cache = MemoryDedupCache(max_size=100000, ttl=3600)
+"""
+
+import abc
+import collections
+import sqlite3
+import threading
+import time
+import typing as t
+
+DEFAULT_DEDUP_MAX_SIZE = 10000
+DEFAULT_DEDUP_TTL = 24 * 3600
+
+
+class DedupCache(abc.ABC):
+    """
+    Interface of the dedup caches, to implement for another storage (e.g. a
+    key-value store shared by several servers)
+    """
+
+    @abc.abstractmethod
+    def seen(self, key: str) -> bool:
+        """Whether the key was added less than ttl seconds ago"""
+
+    @abc.abstractmethod
+    def add(self, key: str) -> bool:
+        """Add a key, return False if it was seen already (atomically)"""
+
+    @abc.abstractmethod
+    def discard(self, key: str) -> None:
+        """Remove a key, e.g. when its handler failed and it can be retried"""
+
+
+class MemoryDedupCache(DedupCache):
+    """
+    In-memory cache of at most max_size keys, expiring after ttl seconds. The
+    oldest keys are dropped first when the cache is full.
+
+    Args:
+        max_size:                    <int>
+                                     The maximum number of keys
+        ttl:                         <Optional[float]>
+                                     The time in seconds a key is kept, None to
+                                     keep it until it is dropped by max_size
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_DEDUP_MAX_SIZE,
+        ttl: t.Optional[float] = DEFAULT_DEDUP_TTL,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> expiration time, in order of addition
+        self._keys: t.OrderedDict[str, float] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _expire(self, now: float) -> None:
+        while self._keys:
+            key, expiration = next(iter(self._keys.items()))
+            if expiration > now:
+                break
+            del self._keys[key]
+
+    def seen(self, key: str) -> bool:
+        with self._lock:
+            self._expire(time.monotonic())
+            return key in self._keys
+
+    def add(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if key in self._keys:
+                return False
+            self._keys[key] = float("inf") if self.ttl is None else now + self.ttl
+            if len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+            return True
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._keys.pop(key, None)
+
+
+class SqliteDedupCache(DedupCache):
+    """
+    Cache persisted in a SQLite database, kept across restarts and shared by
+    the processes of a server
+
+    Args:
+        path:                        <str>
+                                     The path of the database
+        max_size:                    <int>
+                                     The maximum number of keys
+        ttl:                         <Optional[float]>
+                                     The time in seconds a key is kept
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int = DEFAULT_DEDUP_MAX_SIZE,
+        ttl: t.Optional[float] = DEFAULT_DEDUP_TTL,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS deliveries"
+                " (key TEXT PRIMARY KEY, expiration REAL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS deliveries_expiration"
+                " ON deliveries (expiration)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite connections can not be shared by threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            self._local.connection = connection
+        return connection
+
+    def seen(self, key: str) -> bool:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT 1 FROM deliveries WHERE key = ? AND expiration > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def add(self, key: str) -> bool:
+        now = time.time()
+        expiration = float("inf") if self.ttl is None else now + self.ttl
+        with self._connect() as connection:
+            connection.execute("DELETE FROM deliveries WHERE expiration <= ?", (now,))
+            added = connection.execute(
+                "INSERT OR IGNORE INTO deliveries VALUES (?, ?)", (key, expiration)
+            ).rowcount
+            connection.execute(
+                "DELETE FROM deliveries WHERE key IN (SELECT key FROM deliveries"
+                " ORDER BY expiration DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+        return bool(added)
+
+    def discard(self, key: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM deliveries WHERE key = ?", (key,))
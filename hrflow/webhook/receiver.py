@@ -0,0 +1,342 @@
+"""
+Webhook receiver dispatching the events on a pool of worker threads.
+
+The signature is verified in the caller's request thread, then the event is
+queued and the request can be acknowledged right away, while the handlers run
+in the background. The async handlers run on an event loop shared by the
+workers, and the events of the batch handlers are queued batch by batch.
+
+Usage:
+>>> receiver = WebhookReceiver(client.webhooks, max_workers=8)
+>>> def on_request(headers):  # in the HTTP server
+...     if not receiver.receive(headers):
+...         return 503  # the queue is full, the sender retries later
+...     return 200
+>>> receiver.close()
+"""
+
+import asyncio
+import collections
+import functools
+import inspect
+import logging
+import queue
+import threading
+import typing as t
+
+from .batching import EventBatcher
+
+DEFAULT_MAX_QUEUE_SIZE = 1000
+DEFAULT_MAX_WORKERS = 4
+# Stops a worker thread
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+Event = t.Dict[str, t.Any]
+
+
+async def _await(awaitable: t.Awaitable) -> t.Any:
+    return await awaitable
+
+
+def _log_error(item: t.Any, error: BaseException) -> None:
+    event = item[0] if isinstance(item, list) else item
+    logger.error("Webhook handler of %s failed", event.get("type"), exc_info=error)
+
+
+class _Batch(list):
+    """The events of a batch, with the handler set when it was flushed"""
+
+    __slots__ = ("handler",)
+
+
+class WebhookReceiver:
+    """
+    Verify the webhook requests, queue the events and dispatch them to the
+    handlers of a `Webhook` on worker threads
+
+    Args:
+        webhook:                     <Webhook>
+                                     The webhook holding the secret and handlers
+        max_queue_size:              <int>
+                                     The maximum number of events received but
+                                     not handled yet. Beyond it, `receive`
+                                     waits for `timeout` then rejects the event.
+        max_workers:                 <int>
+                                     The number of worker threads
+        concurrency_limits:          <Optional[Dict[str, int]]>
+                                     The maximum number of events of a type
+                                     handled at the same time, e.g.
+                                     {"profile.parse.success": 2}. The other
+                                     types are only limited by max_workers.
+        timeout:                     <Optional[float]>
+                                     The time `receive` waits when the queue is
+                                     full, 0 to reject right away, None to wait
+                                     until there is room
+        on_error:                    <Optional[Callable[[Any, Exception], None]]>
+                                     Called with the event (or the list of events
+                                     of a batch) and the exception raised by its
+                                     handler, logged by default
+    """
+
+    def __init__(
+        self,
+        webhook: t.Any,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        concurrency_limits: t.Optional[t.Dict[str, int]] = None,
+        timeout: t.Optional[float] = 0,
+        on_error: t.Optional[t.Callable[[t.Any, BaseException], None]] = None,
+    ):
+        if max_queue_size < 1 or max_workers < 1:
+            raise ValueError("max_queue_size and max_workers must be positive")
+        concurrency_limits = dict(concurrency_limits or {})
+        for event_name, limit in concurrency_limits.items():
+            if event_name not in webhook.handlers:
+                raise ValueError("{} is not a valid event".format(event_name))
+            if limit < 1:
+                raise ValueError("Concurrency limits must be positive")
+        self.webhook = webhook
+        self.timeout = timeout
+        self.concurrency_limits = concurrency_limits
+        self.on_error = on_error or _log_error
+        self.stats = collections.Counter()
+        # Counted in webhook.listening while open
+        webhook._receivers.add(self)
+
+        # Bounds the events received and not handled yet, the queue itself and
+        # the events deferred by the concurrency limits
+        self._slots = threading.BoundedSemaphore(max_queue_size)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._unfinished = 0
+        self._running: t.Dict[str, int] = collections.Counter()
+        self._deferred: t.Dict[str, t.Deque[Event]] = collections.defaultdict(
+            collections.deque
+        )
+        self._batchers: t.Dict[str, EventBatcher] = {}
+        self._loop: t.Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: t.Optional[threading.Thread] = None
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True) for _ in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def receive(
+        self, request_headers: t.Dict[str, str] = {}, signature_header=None
+    ) -> bool:
+        """
+        Verify a webhook request and queue its event
+
+        Args:
+            request_headers:         <Dict[str, str]>
+                                     The headers of the request, holding
+                                     HTTP-HRFLOW-SIGNATURE
+            signature_header:        <Optional[str]>
+                                     The signature header, instead of the headers
+
+        Returns:
+            <bool>
+            True if the event is queued (or was delivered already, with the
+            dedup cache of the webhook), False if the queue stayed full. A
+            ValueError is raised when the signature is invalid.
+        """
+        if self._closed:
+            raise ValueError("The webhook receiver is closed")
+        event = self.webhook._verify(request_headers, signature_header)
+        if event is None:
+            # Delivered again, acknowledged without handling it
+            with self._lock:
+                self.stats["duplicates"] += 1
+            return True
+        if not self.submit(event):
+            # Not handled, its retry must not be ignored
+            self.webhook._forget(request_headers, signature_header)
+            return False
+        return True
+
+    def submit(self, event: Event) -> bool:
+        """Queue an event already verified, see `receive`"""
+        if self._closed:
+            raise ValueError("The webhook receiver is closed")
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.stats["rejected"] += 1
+            return False
+        with self._lock:
+            self._unfinished += 1
+            self.stats["received"] += 1
+        self.webhook._notify(event)
+        if event["type"] in self.webhook.batch_settings:
+            self._get_batcher(event["type"]).add(event)
+        else:
+            self._queue.put(event)
+        return True
+
+    def _get_batcher(self, event_name: str) -> EventBatcher:
+        with self._lock:
+            batcher = self._batchers.get(event_name)
+            if batcher is None:
+                batcher = self._batchers[event_name] = EventBatcher(
+                    functools.partial(self._queue_batch, event_name),
+                    *self.webhook.batch_settings[event_name],
+                )
+            return batcher
+
+    def _queue_batch(self, event_name: str, events: t.List[Event]) -> None:
+        # The full batches are queued as a single item, for the batch handler
+        # even if it is replaced meanwhile
+        batch = _Batch(events)
+        batch.handler = self.webhook._getHandlerForEvent(event_name)
+        self._queue.put(batch)
+
+    def _remove_batcher(self, event_name: str) -> None:
+        """Queue the pending events of a batch handler being replaced"""
+        with self._lock:
+            batcher = self._batchers.pop(event_name, None)
+        if batcher is not None:
+            batcher.flush()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def _handle(self, event_name: str, item: t.Any) -> None:
+        if isinstance(item, _Batch):
+            handler = item.handler
+        else:
+            handler = self.webhook._getHandlerForEvent(event_name)
+        if handler is None:
+            return
+        result = self.webhook._call_handler(handler, item, event_name)
+        if inspect.isawaitable(result):
+            # The worker waits, so that the concurrency limits hold
+            asyncio.run_coroutine_threadsafe(_await(result), self._get_loop()).result()
+
+    def _work(self) -> None:
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                return
+            self._dispatch(event)
+
+    def _dispatch(self, item: t.Any) -> None:
+        # An event, or the list of events of a batch
+        event_name = (item[0] if isinstance(item, list) else item)["type"]
+        limit = self.concurrency_limits.get(event_name)
+        with self._lock:
+            if limit is not None and self._running[event_name] >= limit:
+                # Handled by the worker releasing the type, without blocking
+                # this one for the events of the other types
+                self._deferred[event_name].append(item)
+                return
+            self._running[event_name] += 1
+        while item is not None:
+            try:
+                self._handle(event_name, item)
+                failed = False
+            except Exception as error:
+                failed = True
+                self.on_error(item, error)
+            count = len(item) if isinstance(item, list) else 1
+            for _ in range(count):
+                self._slots.release()
+            with self._lock:
+                self.stats["failed" if failed else "handled"] += count
+                self._unfinished -= count
+                if not self._unfinished:
+                    self._idle.notify_all()
+                deferred = self._deferred.get(event_name)
+                if deferred:
+                    item = deferred.popleft()
+                else:
+                    self._running[event_name] -= 1
+                    item = None
+
+    def join(self, timeout: t.Optional[float] = None) -> bool:
+        """
+        Wait until all the received events are handled
+
+        Returns:
+            <bool>
+            False if the timeout expired before
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._unfinished, timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop receiving events and stop the workers
+
+        Args:
+            wait:                    <bool>
+                                     Handle the queued events before stopping,
+                                     otherwise they are dropped, and counted in
+                                     stats["dropped"]
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.webhook._receivers.discard(self)
+        if wait:
+            for batcher in list(self._batchers.values()):
+                batcher.flush()
+            self.join()
+        else:
+            with self._lock:
+                batchers = list(self._batchers.values())
+                dropped = [
+                    item for deferred in self._deferred.values() for item in deferred
+                ]
+                for deferred in self._deferred.values():
+                    deferred.clear()
+            dropped += [batcher.clear() for batcher in batchers]
+            self._drop(dropped + self._take_queued())
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        if not wait:
+            # Queued by a batch timer while closing
+            self._drop(self._take_queued())
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+
+    def _take_queued(self) -> t.List[t.Any]:
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _drop(self, items: t.List[t.Any]) -> None:
+        """Account for events and batches dropped without being handled"""
+        count = sum(len(item) if isinstance(item, list) else 1 for item in items)
+        if not count:
+            return
+        for _ in range(count):
+            self._slots.release()
+        with self._lock:
+            self.stats["dropped"] += count
+            self._unfinished -= count
+            if not self._unfinished:
+                self._idle.notify_all()
+
+    def __enter__(self) -> "WebhookReceiver":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,36 @@
+import pytest
+
+from hrflow.core import codec
+
+_PAYLOAD = {"key": "xxx", "url": "https://hrflow.ai/a", "name": "Élève", "ids": [1]}
+
+
+def _installed_backends():
+    backends = []
+    for name in codec.JSON_BACKENDS:
+        try:
+            backends.append(codec.JsonCodec(name))
+        except ImportError:
+            continue
+    return backends
+
+
+@pytest.mark.codec
+@pytest.mark.parametrize("json_codec", _installed_backends(), ids=lambda c: c.name)
+def test_codec_round_trip(json_codec):
+    assert json_codec.loads(json_codec.dumps(_PAYLOAD)) == _PAYLOAD
+    assert json_codec.loads(json_codec.dumps_bytes(_PAYLOAD)) == _PAYLOAD
+    # integers out of the 64 bits range fall back to the standard library
+    assert json_codec.loads(json_codec.dumps([2**70])) == [2**70]
+
+
+@pytest.mark.codec
+def test_set_json_backend():
+    default = codec.get_json_codec().name
+    try:
+        assert codec.set_json_backend("json").name == "json"
+        assert codec.dumps(["a"]) == '["a"]'
+        with pytest.raises(ValueError):
+            codec.set_json_backend("pickle")
+    finally:
+        codec.set_json_backend(default)
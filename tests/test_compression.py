@@ -0,0 +1,66 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from hrflow import Hrflow
+
+_PROFILE = {"text": "Senior data engineer " * 200, "skills": [{"name": "python"}]}
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    """Answer the decoded request body, gzip-encoded when accepted."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        response = json.dumps({"code": 200, "data": json.loads(body)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            response = gzip.compress(response)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url():
+    server = HTTPServer(("127.0.0.1", 0), _EchoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.compression
+def test_gzip_request_and_response(api_url):
+    client = Hrflow(api_url=api_url, api_secret="x", request_compression="gzip")
+    response = client.post("profile/indexing", json={"profile": _PROFILE})
+    assert response.json()["data"] == {"profile": _PROFILE}
+
+    transfer = client.transfer_stats.last
+    assert transfer.endpoint == "profile/indexing"
+    assert transfer.content_encoding == "gzip"
+    assert transfer.bytes_sent * 10 < transfer.bytes_sent_raw
+    assert transfer.bytes_received * 10 < transfer.bytes_received_raw
+    assert client.transfer_stats.to_dict()["calls"] == 1
+    assert client.transfer_stats.bytes_saved > 0
+
+
+@pytest.mark.compression
+def test_small_bodies_are_not_compressed(api_url):
+    client = Hrflow(api_url=api_url, api_secret="x", request_compression="gzip")
+    client.post("profile/indexing", json={"key": "xxx"})
+    transfer = client.transfer_stats.last
+    assert transfer.bytes_sent == transfer.bytes_sent_raw
+
+    with pytest.raises(ValueError):
+        Hrflow(api_url=api_url, request_compression="br")
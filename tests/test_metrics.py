@@ -0,0 +1,177 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from hrflow import Hrflow
+from hrflow.core.metrics import RequestMetrics
+from hrflow.core.rate_limit import rate_limiter
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    """Answer 503 to every other GET, echo the POST bodies."""
+
+    calls = 0
+
+    def _answer(self, status, content):
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 503:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        type(self).calls += 1
+        if type(self).calls % 2:
+            self._answer(503, {"code": 503, "message": "unavailable"})
+        else:
+            self._answer(200, {"code": 200, "data": []})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self._answer(201, {"code": 201, "data": json.loads(body)})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url():
+    _FlakyHandler.calls = 0
+    server = HTTPServer(("127.0.0.1", 0), _FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.metrics
+def test_endpoint_metrics(api_url):
+    client = Hrflow(api_url=api_url, api_secret="x", max_retries=1)
+    assert client.get("profiles/searching").status_code == 200
+    client.post("profile/parsing/file", json={"text": "x" * 100})
+    # POST is not retried
+    client.post("profile/parsing/file", json={})
+
+    snapshot = client.metrics.snapshot()
+    searching = snapshot["GET profiles/searching"]
+    assert searching["count"] == 2 and searching["retries"] == 1
+    assert searching["status_codes"] == {503: 1, 200: 1}
+    assert searching["latency"]["buckets"][float("inf")] == 2
+    parsing = snapshot["POST profile/parsing/file"]
+    assert parsing["count"] == 2 and parsing["retries"] == 0
+    assert parsing["bytes_sent"] > 100 and parsing["bytes_received"] > 100
+
+    text = client.metrics.to_prometheus()
+    assert (
+        'hrflow_client_requests_total{method="GET",endpoint="profiles/searching",'
+        'status="503"} 1'
+        in text
+    )
+    assert (
+        'hrflow_client_request_duration_seconds_bucket{method="POST",'
+        'endpoint="profile/parsing/file",le="+Inf"} 2'
+        in text
+    )
+    assert "# TYPE hrflow_client_request_duration_seconds histogram" in text
+
+
+@pytest.mark.metrics
+def test_connection_errors_are_retried():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = Hrflow(
+        api_url=f"http://127.0.0.1:{port}/", max_retries=2, retry_backoff=0.001
+    )
+    with pytest.raises(requests.ConnectionError):
+        client.get("profile/indexing")
+    metrics = client.metrics.snapshot()["GET profile/indexing"]
+    assert metrics["errors"] == 3 and metrics["retries"] == 2 and metrics["count"] == 0
+
+
+@pytest.mark.metrics
+def test_latency_buckets():
+    metrics = RequestMetrics(latency_buckets=(0.1, 1))
+    for latency in (0.05, 0.1, 0.5, 2):
+        metrics.record("GET", "jobs/searching", latency, 200)
+    latency = metrics.snapshot()["GET jobs/searching"]["latency"]
+    assert latency["buckets"] == {0.1: 2, 1: 3, float("inf"): 4}
+    assert latency["max"] == 2 and latency["mean"] == pytest.approx(2.65 / 4)
+    with pytest.raises(ValueError):
+        RequestMetrics(latency_buckets=(1, 0.1))
+
+
+class _Searching:
+    def __init__(self, client):
+        self.client = client
+
+    @rate_limiter
+    def list(self):
+        return self.client.get("profiles/searching")
+
+
+@pytest.mark.hooks
+def test_request_hooks(api_url):
+    client = Hrflow(api_url=api_url, max_retries=1, connection_timings=True)
+    calls = []
+    client.hooks.add(
+        "before_request", lambda event: event.headers.update({"X-Trace": "1"})
+    )
+    client.hooks.add("on_retry", lambda event, delay: calls.append(("retry", delay)))
+    client.hooks.add("after_response", lambda event: calls.append(("after", event)))
+    client.hooks.add(
+        "on_rate_limit_wait", lambda seconds, name: calls.append(("wait", name))
+    )
+    with pytest.raises(ValueError):
+        client.hooks.add("on_success", print)
+
+    _Searching(client).list(min_sleep_per_request=0.05)
+    assert [call[0] for call in calls] == ["wait", "retry", "after"]
+    assert calls[0][1] == "_Searching.list" and calls[1][1] == 0
+    event = calls[2][1]
+    assert event.attempt == 1 and event.response.status_code == 200
+    assert event.response.request.headers["X-Trace"] == "1"
+    timings = event.timings
+    # waited before the first attempt only
+    assert timings.rate_limit_wait == 0
+    assert timings.ttfb > 0 and timings.download >= 0 and timings.total > 0
+
+    calls.clear()
+    client.max_retries = 0
+    _Searching(client).list(min_sleep_per_request=0.05)
+    event = calls[-1][1]
+    assert event.attempt == 0 and event.timings.rate_limit_wait >= 0.05
+
+    # the wait of a call without request is not charged to the next one
+    rate_limiter(lambda: None)(min_sleep_per_request=0.05)
+    client.get("searching/profiles")
+    assert calls[-1][1].timings.rate_limit_wait == 0
+
+    # nor is anything reported when the limiter does not sleep
+    calls.clear()
+    _Searching(client).list(max_requests_per_minute=1000)
+    assert [call[0] for call in calls] == ["after"]
+    assert calls[0][1].timings.rate_limit_wait == 0
+
+
+@pytest.mark.hooks
+def test_request_hooks_connection_timings_and_errors(api_url):
+    client = Hrflow(api_url=api_url, connection_timings=True)
+    events = []
+    client.hooks.add("after_response", events.append)
+    client.hooks.add("on_error", events.append)
+    client.post("profile/indexing", json={"profile": {}})
+    timings = events[0].timings
+    assert timings.connect >= 0 and timings.tls is None
+
+    client.api_url = "http://127.0.0.1:1/"
+    with pytest.raises(requests.ConnectionError):
+        client.post("profile/indexing", json={})
+    assert isinstance(events[1].error, requests.ConnectionError)
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from hrflow.core.pagination import bind_pages, iterate_pages
+
+
+def _list_page_get(max_page=5, page_size=3, fail_page=None):
+    calls = []
+    lock = threading.Lock()
+
+    def list_page(page):
+        with lock:
+            calls.append(page)
+        if page == fail_page:
+            return {"code": 400, "message": "Invalid parameters"}
+        start = (page - 1) * page_size
+        return {
+            "code": 200,
+            "meta": {"page": page, "maxPage": max_page},
+            "data": {
+                "profiles": [{"key": str(i)} for i in range(start, start + page_size)],
+                "predictions": [
+                    [0, 1 - i / 100] for i in range(start, start + page_size)
+                ],
+            },
+        }
+
+    return list_page, calls
+
+
+@pytest.mark.pagination
+def test_iterate_pages_all_items_in_order():
+    list_page, calls = _list_page_get()
+    items = list(iterate_pages(list_page, "profiles", prefetch=3))
+    assert [item["key"] for item, _ in items] == [str(i) for i in range(15)]
+    assert items[1][1] == pytest.approx(0.99)
+    assert sorted(calls) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.pagination
+def test_iterate_pages_early_stop():
+    list_page, _ = _list_page_get()
+    items = list(iterate_pages(list_page, "profiles", max_items=4))
+    assert len(items) == 4
+
+    items = list(iterate_pages(list_page, "profiles", prefetch=0, min_score=0.955))
+    assert [item["key"] for item, _ in items] == [str(i) for i in range(5)]
+
+
+@pytest.mark.pagination
+def test_iterate_pages_error():
+    list_page, _ = _list_page_get(fail_page=2)
+    with pytest.raises(ValueError):
+        list(iterate_pages(list_page, "profiles"))
+
+
+@pytest.mark.pagination
+def test_bind_pages_rejects_page():
+    def list_method(source_keys=None, stage=None, page=1, limit=30, **kwargs):
+        return dict(page=page, source_keys=source_keys, limit=limit)
+
+    assert bind_pages(list_method, (["s"],), dict(limit=5))(3) == dict(
+        page=3, source_keys=["s"], limit=5
+    )
+    with pytest.raises(ValueError):
+        bind_pages(list_method, (["s"], None, 2), {})
+    with pytest.raises(ValueError):
+        bind_pages(list_method, (), dict(page=2))
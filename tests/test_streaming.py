@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from hrflow.core.streaming import JsonArrayStream, stream_response
+
+_RESPONSE = {
+    "code": 200,
+    "message": "List of profiles",
+    "data": [
+        {"key": "a", "info": {"full_name": 'Élodie "E" Durant'}, "score": 1.5},
+        {"key": "b", "experiences": [], "text": "[not, an, array] {}"},
+        {"key": "c", "count": 12345},
+    ],
+    "meta": {"page": 1, "maxPage": 1, "count": 3, "total": 3},
+}
+
+
+def _chunks_get(payload, size):
+    body = json.dumps(payload, indent=1).encode()
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.streaming
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_json_array_stream(chunk_size):
+    stream = JsonArrayStream(_chunks_get(_RESPONSE, chunk_size))
+    assert list(stream) == _RESPONSE["data"]
+    assert stream.fields["code"] == 200
+    assert stream.fields["meta"] == _RESPONSE["meta"]
+
+
+@pytest.mark.streaming
+def test_json_array_stream_without_array():
+    error = {"code": 400, "message": "Invalid parameters"}
+    stream = JsonArrayStream(_chunks_get(error, 3))
+    assert list(stream) == []
+    assert stream.fields == error
+
+    with pytest.raises(ValueError):
+        list(JsonArrayStream([b'{"code": 200, "data": [{"key": "a"}']))
+
+
+@pytest.mark.streaming
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_json_array_stream_large_element(chunk_size):
+    large = {
+        "key": "a",
+        "text": 'escaped \\" quote, [brackets] and {braces} ' * 20,
+        "nested": [[{"a": [1, 2.5, None]}], {"b": "\\\\"}] * 10,
+    }
+    payload = {"code": 200, "data": [large, "x", 12], "meta": {"maxPage": 3}}
+    stream = JsonArrayStream(_chunks_get(payload, chunk_size))
+    assert list(stream) == payload["data"]
+    assert stream.fields["meta"] == {"maxPage": 3}
+
+
+class _Response:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self.closed = False
+        self._chunks = _chunks_get(payload, 16)
+
+    def iter_content(self, chunk_size):
+        return iter(self._chunks)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.streaming
+def test_stream_response_fields():
+    response = _Response(_RESPONSE)
+    stream = stream_response(response)
+    assert list(stream) == _RESPONSE["data"]
+    assert stream.fields["meta"]["maxPage"] == 1
+    assert response.closed
+
+    error = _Response({"code": 400, "message": "Invalid parameters"}, 400)
+    with pytest.raises(ValueError):
+        list(stream_response(error))
+    assert error.closed
+
+
+@pytest.mark.streaming
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        [b'{"data": [1.', b"5]}"],
+        [b'{"data": [1e', b"3]}"],
+        [b'{"data": [1', b".5]}"],
+        [b'{"data": [-', b"2E+", b"1]}"],
+    ],
+)
+def test_json_array_stream_split_number(chunks):
+    assert list(JsonArrayStream(chunks)) == [json.loads(b"".join(chunks))["data"][0]]
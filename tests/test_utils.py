@@ -0,0 +1,590 @@
+import base64
+import csv
+import json
+import typing as t
+from types import SimpleNamespace
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from hrflow.utils.embedding import (
+    EmbeddingStore,
+    decode_embedding,
+    fetch_profile_embeddings,
+)
+from hrflow.utils.evaluation import (
+    generate_parsing_evaluation_report,
+    load_workbook_from_url,
+)
+from hrflow.utils.evaluation.backends import write_report
+from hrflow.utils.evaluation.incremental import EvaluationStore
+from hrflow.utils.evaluation.parallel import iterate_in_thread
+from hrflow.utils.evaluation.profile import (
+    SECTION_LIST,
+    START_ROW_ID,
+    ProfileEvaluation,
+    parallel_parsing_evaluator,
+    parsing_evaluator,
+    write_work_sheet,
+)
+from hrflow.utils.evaluation.statistics import EvaluationColumns
+from hrflow.utils.evaluation.template import get_template_path, load_template
+from hrflow.utils.evaluation.writer import create_write_only_work_sheet
+from hrflow.utils.matching import ExactIndex, IVFIndex
+from hrflow.utils.scoring import (
+    REASON_NO_SCORING_CONTENT,
+    bulk_is_valid_for_scoring,
+    is_valid_for_scoring,
+    score_across_sources,
+    score_jobs_batch,
+)
+from hrflow.utils.searching import (
+    REASON_INSUFFICIENT_INFO,
+    REASON_NO_TEXT,
+    bulk_is_valid_for_searching,
+    is_valid_for_searching,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+requires_numpy = pytest.mark.skipif(np is None, reason="numpy is not installed")
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.embedding
+def test_embedding_store_append_and_reopen(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    assert len(store) == 0
+
+    vectors = np.arange(6, dtype=np.float32).reshape(3, 2)
+    assert store.append(["a", "b", "c"], vectors) == 3
+    # already stored keys are skipped
+    assert store.append(["c", "d"], [[9, 9], [6, 7]]) == 1
+
+    reopened = EmbeddingStore(str(tmp_path))
+    assert reopened.dimension == 2
+    assert reopened.keys == ["a", "b", "c", "d"]
+    assert isinstance(reopened.vectors, np.memmap)
+    assert reopened.get("c").tolist() == [4, 5]
+    assert reopened.get("d").tolist() == [6, 7]
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.embedding
+def test_fetch_profile_embeddings(tmp_path):
+    pages = []
+
+    def storing_list(source_keys, page=1):
+        pages.append(page)
+        data = [dict(key=f"{page}-{index}") for index in range(2)]
+        return {"code": 200, "meta": {"maxPage": 2}, "data": data}
+
+    def embedding_get(source_key, key):
+        return {"code": 200, "data": [[float(len(key)), 1.0]]}
+
+    client = SimpleNamespace(
+        profile=SimpleNamespace(
+            storing=SimpleNamespace(list=storing_list),
+            embedding=SimpleNamespace(get=embedding_get),
+        )
+    )
+    store = fetch_profile_embeddings(client, "source", str(tmp_path))
+    assert store.keys == ["1-0", "1-1", "2-0", "2-1"]
+    assert pages == [1, 2]
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.embedding
+def test_fetch_profile_embeddings_error(tmp_path):
+    client = SimpleNamespace(
+        profile=SimpleNamespace(
+            storing=SimpleNamespace(
+                list=lambda source_keys, page=1: {"code": 400, "message": "Invalid"}
+            ),
+        )
+    )
+    with pytest.raises(ValueError, match="400 Invalid"):
+        fetch_profile_embeddings(client, "source", str(tmp_path))
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.embedding
+def test_embedding_store_append_duplicate_keys(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dimension=2)
+    assert store.append(["a", "b", "a"], [[1, 2], [3, 4], [5, 6]]) == 2
+    assert store.append(["b", "c"], [[3, 4], [7, 8]]) == 1
+    assert store.keys == ["a", "b", "c"]
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.embedding
+def test_embedding_store_dimension_mismatch(tmp_path):
+    store = EmbeddingStore(str(tmp_path), dimension=2)
+    with pytest.raises(ValueError):
+        store.append(["a"], [[1, 2, 3]])
+    store.append(["a"], [[1, 2]])
+    with pytest.raises(ValueError):
+        EmbeddingStore(str(tmp_path), dimension=3)
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.embedding
+def test_decode_embedding_base64_sequences():
+    sequences = np.array([[1, 2], [3, 4]], dtype=">f4")
+    data = base64.b64encode(sequences.tobytes()).decode()
+    assert decode_embedding(data, dimension=2).tolist() == [2, 3]
+    assert decode_embedding([0.5, 1.5]).tolist() == [0.5, 1.5]
+
+
+def _random_store(path, size=2000, dimension=16):
+    vectors = np.random.default_rng(0).normal(size=(size, dimension))
+    store = EmbeddingStore(str(path))
+    store.append([str(row) for row in range(size)], vectors)
+    return store, vectors.astype(np.float32)
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.embedding
+def test_exact_index_matches_brute_force(tmp_path):
+    store, vectors = _random_store(tmp_path)
+    queries = vectors[:3] + 0.01
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(queries @ normalized.T), axis=1)[:, :5]
+
+    results = ExactIndex(store, block_size=300).search(queries, top_k=5)
+    assert [[int(key) for key, _ in matches] for matches in results] == (
+        expected.tolist()
+    )
+    assert ExactIndex(store).search(queries, top_k=0) == [[], [], []]
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.embedding
+def test_ivf_index_finds_nearest(tmp_path):
+    store, vectors = _random_store(tmp_path)
+    index = IVFIndex(store, n_clusters=16, n_probe=4).train()
+    index.save(str(tmp_path / "ivf.npz"))
+
+    reloaded = IVFIndex(store).load(str(tmp_path / "ivf.npz"))
+    assert reloaded.search(vectors[42], top_k=1)[0][0][0] == "42"
+    assert "42" not in [key for key, _ in index.search_key("42", top_k=3)]
+    assert index.search(vectors[:2], top_k=0) == [[], []]
+
+
+class _FakeProfileScoring:
+    def __init__(self, scores):
+        # scores: source_key -> list of scores
+        self.scores = scores
+        self.calls = []
+
+    def list(self, source_keys, page=1, limit=30, **kwargs):
+        self.calls.append(tuple(source_keys))
+        ranked = sorted(
+            (
+                (score, source_key)
+                for source_key in source_keys
+                for score in self.scores[source_key]
+            ),
+            reverse=True,
+        )
+        page_items = ranked[(page - 1) * limit : page * limit]
+        return {
+            "code": 200,
+            "meta": {"maxPage": -(-len(ranked) // limit), "total": len(ranked)},
+            "data": {
+                "profiles": [{"source_key": key} for _, key in page_items],
+                "predictions": [[1 - score, score] for score, _ in page_items],
+            },
+        }
+
+
+@pytest.mark.utils
+@pytest.mark.scoring
+def test_score_across_sources_merges_top_k():
+    scores = {f"s{i}": [i / 100, i / 1000] for i in range(10)}
+    scoring = _FakeProfileScoring(scores)
+    client = SimpleNamespace(profile=SimpleNamespace(scoring=scoring))
+
+    response = score_across_sources(
+        client, list(scores), "board", "job", top_k=3, group_size=4, limit=2
+    )
+    assert len(set(scoring.calls)) == 3
+    assert response["meta"]["total"] == 20
+    assert [p[1] for p in response["data"]["predictions"]] == [0.09, 0.08, 0.07]
+    assert [p["source_key"] for p in response["data"]["profiles"]] == [
+        "s9",
+        "s8",
+        "s7",
+    ]
+
+
+@pytest.mark.utils
+@pytest.mark.scoring
+def test_score_jobs_batch_resumes(tmp_path):
+    output_path = str(tmp_path / "scoring.jsonl")
+    failing = {"job_3"}
+    calls = []
+
+    def scoring_list(source_keys, board_key, job_key, **kwargs):
+        calls.append(job_key)
+        if job_key in failing:
+            raise ConnectionError("timeout")
+        return {"code": 200, "data": {"profiles": [], "predictions": []}}
+
+    client = SimpleNamespace(
+        profile=SimpleNamespace(scoring=SimpleNamespace(list=scoring_list))
+    )
+    job_keys = [f"job_{i}" for i in range(10)]
+
+    counts = score_jobs_batch(client, job_keys, "board", ["source"], output_path)
+    assert counts == {"scored": 9, "failed": 1, "skipped": 0}
+
+    # simulate a line truncated by an interruption
+    with open(output_path, "a") as file:
+        file.write('{"key": "job_')
+
+    failing.clear()
+    calls.clear()
+    counts = score_jobs_batch(client, job_keys, "board", ["source"], output_path)
+    assert counts == {"scored": 1, "failed": 0, "skipped": 9}
+    assert calls == ["job_3"]
+
+    # only the keys of the batch are counted
+    counts = score_jobs_batch(client, ["job_1", "job_10"], "board", ["s"], output_path)
+    assert counts == {"scored": 1, "failed": 0, "skipped": 1}
+
+
+def _raw_profiles_get() -> t.List[t.Dict[str, t.Any]]:
+    base = dict(text="resume", info=dict(), experiences=[], educations=[])
+    return [
+        base,
+        {**base, "text": ""},
+        {**base, "info": dict(email="a@b.c")},
+        {**base, "info": dict(first_name="Harry", last_name="Potter")},
+        {**base, "info": dict(phone="06", gender="male", urls=[], location={})},
+        {**base, "info": dict(phone="06", gender="male", location={}, summary="x")},
+        {
+            **base,
+            "info": dict(email="a@b.c"),
+            "experiences": [dict(company="Hogwarts", location=dict(text="UK"))],
+        },
+        {
+            **base,
+            "info": dict(email="a@b.c"),
+            "experiences": [dict(title="Wizard")],
+        },
+        {**base, "info": dict(email="a@b.c"), "educations": [dict(school="Hogw")]},
+        {**base, "info": dict(email="a@b.c"), "skills": [dict(name="magic")]},
+    ]
+
+
+@pytest.mark.utils
+@pytest.mark.searching
+@pytest.mark.scoring
+def test_trusted_checks_match_validated_checks():
+    for profile in _raw_profiles_get():
+        assert is_valid_for_searching(profile, trusted=True) == bool(
+            is_valid_for_searching(profile)
+        ), profile
+        assert is_valid_for_scoring(profile, trusted=True) == bool(
+            is_valid_for_scoring(profile)
+        ), profile
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.searching
+@pytest.mark.scoring
+def test_bulk_checks_match_single_checks():
+    profiles = _raw_profiles_get()
+    valid, reasons = bulk_is_valid_for_scoring(profiles)
+    assert valid.tolist() == [is_valid_for_scoring(p, trusted=True) for p in profiles]
+    assert reasons[1] & REASON_NO_TEXT
+    assert reasons[0] == REASON_INSUFFICIENT_INFO | REASON_NO_SCORING_CONTENT
+
+    valid, reasons = bulk_is_valid_for_searching(iter(profiles))
+    assert valid.tolist() == [is_valid_for_searching(p, trusted=True) for p in profiles]
+    assert (reasons[valid] == 0).all()
+
+    columns = dict(text=[1, 1], email=[0, 0], person=[0, 1], info_score=[4, 0])
+    assert bulk_is_valid_for_searching(columns)[0].tolist() == [True, True]
+    with pytest.raises(ValueError):
+        bulk_is_valid_for_scoring(columns)
+
+
+def _evaluated_profile_get(index: int) -> t.Dict[str, t.Any]:
+    return dict(
+        info=dict(first_name="Harry", email="a@b.c", location=dict(text="UK")),
+        experiences=[dict(title="Wizard", skills=[dict(name="magic")])] * index,
+        educations=[],
+        skills=[],
+        attachments=[
+            dict(
+                original_file_name=f"cv_{index}.pdf",
+                public_url=f"https://hrflow.ai/{index}/original/cv.pdf",
+            )
+        ],
+    )
+
+
+@pytest.mark.utils
+@pytest.mark.profile
+def test_write_only_profile_report(tmp_path):
+    evaluations = (
+        ProfileEvaluation.from_profile(_evaluated_profile_get(i)) for i in range(3)
+    )
+    work_book, work_sheet = create_write_only_work_sheet("1. Statistics")
+    assert write_work_sheet(work_sheet, evaluations) == 3
+    work_book.save(tmp_path / "report.xlsx")
+
+    work_sheet = load_workbook(tmp_path / "report.xlsx")["1. Statistics"]
+    last_row = START_ROW_ID + 2
+    assert work_sheet.max_row == last_row
+    assert work_sheet[f"A{last_row}"].value == "cv_2.pdf"
+    assert (
+        work_sheet[f"C{last_row}"].hyperlink.target == "https://hrflow.ai/2/object.json"
+    )
+    # info: first_name, email and location out of 7 fields
+    assert work_sheet[f"D{last_row}"].value == pytest.approx(3 / 7)
+    assert work_sheet[f"N{last_row}"].value == 2
+    assert work_sheet[f"U{last_row}"].value == 2
+    assert work_sheet[f"AP{START_ROW_ID - 1}"].value == "interests"
+
+
+@pytest.mark.utils
+@pytest.mark.profile
+def test_parallel_parsing_evaluator_keeps_order():
+    profiles = [_evaluated_profile_get(i % 4) for i in range(25)]
+    rows = parallel_parsing_evaluator(profiles, max_workers=2, chunk_size=3)
+    evaluations = parsing_evaluator(profiles)
+    assert rows == [evaluation.to_row() for evaluation in evaluations]
+    assert [ProfileEvaluation.from_row(row) for row in rows] == evaluations
+
+
+@requires_numpy
+@pytest.mark.utils
+@pytest.mark.profile
+def test_evaluation_columns_match_evaluations():
+    profiles = [_evaluated_profile_get(i % 4) for i in range(10)]
+    profiles[1]["educations"] = [dict(school="Hogwarts", date_end="1998")] * 2
+    profiles[2]["info"] = dict(full_name="Harry Potter", summary="Wizard")
+    # null fields as returned by the API
+    profiles[3]["info"]["location"] = None
+    profiles[3]["experiences"][0]["location"] = None
+    profiles[3]["experiences"][0]["skills"] = None
+    evaluations = parsing_evaluator(profiles)
+
+    columns = EvaluationColumns.from_profiles(iter(profiles))
+    from_rows = EvaluationColumns.from_rows(e.to_row() for e in evaluations)
+    assert len(columns) == len(from_rows) == 10
+    for name, column in from_rows.columns.items():
+        assert columns[name].tolist() == column.tolist(), name
+
+    statistics = columns.statistics()
+    counts = [e.experience.count for e in evaluations]
+    assert statistics["experience.count"]["mean"] == np.mean(counts)
+    assert statistics["experience.count"]["p50"] == np.median(counts)
+    assert statistics["info.full_name"]["presence"] == 0.1
+    histogram, _ = columns.histogram("experience.count")
+    assert histogram.tolist() == [3, 3, 2, 2]
+
+
+@pytest.mark.utils
+def test_template_cache(tmp_path, monkeypatch):
+    template = tmp_path / "parsing-evaluation-template-v3-profile.xlsx"
+    work_book = Workbook()
+    work_book.active.title = "1. Statistics"
+    work_book.save(template)
+
+    cache_dir = str(tmp_path / "cache")
+    path = get_template_path(template.as_uri(), cache_dir)
+    assert path.startswith(cache_dir) and path.endswith(template.name)
+    # cached templates are loaded without downloading them again
+    template.unlink()
+    assert load_template(template.as_uri(), cache_dir).sheetnames == ["1. Statistics"]
+    with pytest.raises(ValueError):
+        get_template_path((tmp_path / "missing.xlsx").as_uri(), cache_dir)
+
+    monkeypatch.setenv("HRFLOW_TEMPLATE_CACHE", cache_dir)
+    with pytest.deprecated_call():
+        work_book = load_workbook_from_url(template.as_uri())
+    assert work_book.sheetnames == ["1. Statistics"]
+
+
+@pytest.mark.utils
+@pytest.mark.profile
+@pytest.mark.parametrize("extension", [".csv", ".jsonl", ".parquet"])
+def test_write_report_backends(tmp_path, extension):
+    if extension == ".parquet" and pq is None:
+        pytest.skip("pyarrow is not installed")
+    rows = [
+        ProfileEvaluation.from_profile(_evaluated_profile_get(i)).to_row()
+        for i in range(3)
+    ]
+    path = str(tmp_path / f"report{extension}")
+    assert write_report(path, SECTION_LIST, iter(rows), START_ROW_ID) == 3
+
+    if extension == ".csv":
+        with open(path) as file:
+            records = list(csv.DictReader(file))
+    elif extension == ".jsonl":
+        with open(path) as file:
+            records = [json.loads(line) for line in file]
+    else:
+        records = pq.read_table(path).to_pylist()
+    assert [record["metadata.filename"] for record in records] == [
+        "cv_0.pdf",
+        "cv_1.pdf",
+        "cv_2.pdf",
+    ]
+    assert float(records[2]["experience.count"]) == 2
+
+
+@pytest.mark.utils
+def test_iterate_in_thread():
+    assert list(iterate_in_thread(iter(range(100)), buffer_size=3)) == list(range(100))
+
+    def failing():
+        yield 1
+        raise ConnectionError("timeout")
+
+    items = iterate_in_thread(failing())
+    assert next(items) == 1
+    with pytest.raises(ConnectionError):
+        next(items)
+
+
+@pytest.mark.utils
+@pytest.mark.profile
+def test_streaming_evaluation_report(tmp_path, capsys):
+    profiles = [_evaluated_profile_get(i % 3) for i in range(70)]
+    pages = []
+
+    def storing_list(source_keys, page=1, return_profile=False, **kwargs):
+        pages.append(page)
+        return {
+            "code": 200,
+            "meta": {"maxPage": 3},
+            "data": profiles[(page - 1) * 30 : page * 30],
+        }
+
+    client = SimpleNamespace(
+        profile=SimpleNamespace(storing=SimpleNamespace(list=storing_list))
+    )
+    report_path = str(tmp_path / "report.csv")
+    generate_parsing_evaluation_report(
+        client, report_path, source_key="source", show_progress=True
+    )
+
+    assert sorted(pages) == [1, 2, 3]
+    assert "Evaluating profiles: 70" in capsys.readouterr().err
+    with open(report_path) as file:
+        records = list(csv.DictReader(file))
+    assert [record["experience.count"] for record in records] == [
+        str(i % 3) for i in range(70)
+    ]
+
+
+@pytest.mark.utils
+@pytest.mark.profile
+def test_incremental_evaluation_report(tmp_path):
+    profiles = [
+        dict(_evaluated_profile_get(i % 3), key=f"k{i}", updated_at=f"2024-01-{i:02}")
+        for i in range(1, 71)
+    ]
+    pages = []
+
+    def storing_list(source_keys, page=1, sort_by="created_at", **kwargs):
+        pages.append(page)
+        ranked = sorted(profiles, key=lambda p: p["updated_at"], reverse=True)
+        return {
+            "code": 200,
+            "meta": {"maxPage": 3},
+            "data": ranked[(page - 1) * 30 : page * 30],
+        }
+
+    client = SimpleNamespace(
+        profile=SimpleNamespace(storing=SimpleNamespace(list=storing_list))
+    )
+    report_path = str(tmp_path / "report.jsonl")
+    store_dir = str(tmp_path / "store")
+    generate_parsing_evaluation_report(
+        client, report_path, source_key="s", incremental_dir=store_dir
+    )
+    assert EvaluationStore(store_dir).synced_until == "2024-01-70"
+    with pytest.raises(ValueError):
+        generate_parsing_evaluation_report(
+            client,
+            report_path,
+            source_key="s",
+            incremental_dir=store_dir,
+            parallel=True,
+        )
+
+    pages.clear()
+    profiles[0] = dict(profiles[0], experiences=[], updated_at="2024-02-01")
+    evaluate_calls = []
+    store = EvaluationStore(store_dir)
+
+    def evaluate(profile):
+        evaluate_calls.append(profile["key"])
+        return ProfileEvaluation.from_profile(profile).to_row()
+
+    ranked = sorted(profiles, key=lambda p: p["updated_at"], reverse=True)
+    assert store.update(iter(ranked), evaluate) == {"evaluated": 1, "stored": 70}
+    assert evaluate_calls == ["k1"]
+
+    generate_parsing_evaluation_report(
+        client, report_path, source_key="s", incremental_dir=store_dir
+    )
+    assert pages == [1]
+    with open(report_path) as file:
+        records = [json.loads(line) for line in file]
+    assert len(records) == 70
+    assert records[0]["metadata.filename"] == "cv_1.pdf"
+
+
+@pytest.mark.utils
+@pytest.mark.profile
+def test_evaluation_report_template_extension(tmp_path):
+    template = tmp_path / "cache" / "v1" / "parsing-evaluation-template-v3-profile.xlsx"
+    template.parent.mkdir(parents=True)
+    work_book = Workbook()
+    work_book.active.title = "1. Statistics"
+    work_book.active["A1"] = "template"
+    work_book.save(template)
+
+    def storing_list(source_keys, page=1, **kwargs):
+        data = [_evaluated_profile_get(2)] if page == 1 else []
+        return {"code": 200, "meta": {"maxPage": 1}, "data": data}
+
+    client = SimpleNamespace(
+        profile=SimpleNamespace(storing=SimpleNamespace(list=storing_list))
+    )
+    report_path = str(tmp_path / "report.XLSX")
+    generate_parsing_evaluation_report(
+        client,
+        report_path,
+        source_key="source",
+        template_cache_dir=str(tmp_path / "cache"),
+    )
+    work_sheet = load_workbook(report_path)["1. Statistics"]
+    assert work_sheet["A1"].value == "template"
+    assert work_sheet[f"A{START_ROW_ID}"].value == "cv_2.pdf"
@@ -0,0 +1,63 @@
+import copy
+import pickle
+
+import pytest
+
+from hrflow.schemas import HrFlowProfile
+from hrflow.views import ExperienceView, JobView, LocationView, ProfileView
+
+
+def _profile_get():
+    return dict(
+        key="xxx",
+        text="Harry Potter, Magic Investigator",
+        info=dict(first_name="Harry", location=dict(text="Hogwarts")),
+        experiences=[dict(title="Magic Investigator", location=dict(text="UK"))],
+        educations=None,
+    )
+
+
+@pytest.mark.profile
+def test_profile_view_lazy_nested_access():
+    raw = _profile_get()
+    profile = ProfileView(raw)
+
+    assert not hasattr(profile, "__dict__")
+    assert profile.key == "xxx"
+    assert profile.info.location.text == "Hogwarts"
+    assert isinstance(profile.experiences[0], ExperienceView)
+    assert profile.experiences[0].location == LocationView(dict(text="UK"))
+    assert profile.educations is None
+    assert profile.skills is None
+    assert profile["info"] is raw["info"]
+
+    with pytest.raises(AttributeError):
+        profile.unknown_field
+    with pytest.raises(AttributeError):
+        profile.key = "yyy"
+
+    model = profile.to_model()
+    assert isinstance(model, HrFlowProfile)
+    assert model.experiences[0].title == "Magic Investigator"
+
+
+@pytest.mark.job
+def test_job_view():
+    job = JobView(dict(name="Wizard", location=dict(text="Hogwarts", lat=1.0)))
+    assert job.location.lat == 1.0
+    assert job.summary is None
+
+
+@pytest.mark.profile
+def test_profile_view_pickle_and_copy():
+    profile = ProfileView(_profile_get())
+    for copied in (
+        pickle.loads(pickle.dumps(profile)),
+        copy.copy(profile),
+        copy.deepcopy(profile),
+    ):
+        assert type(copied) is ProfileView
+        assert copied == profile
+        assert copied.info.location.text == "Hogwarts"
+    assert copy.copy(profile)["info"] is profile["info"]
+    assert copy.deepcopy(profile)["info"] is not profile["info"]
@@ -0,0 +1,375 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import hrflow.webhook
+from hrflow.profile.parsing import ProfileParsing
+from hrflow.profile.waiting import ParsingWaiter
+from hrflow.webhook import (
+    EVENT_PROFILE_PARSE_ERROR,
+    EVENT_PROFILE_PARSE_SUCCESS,
+    SIGNATURE_HEADER,
+    MemoryDedupCache,
+    SqliteDedupCache,
+    Webhook,
+)
+
+_SECRET = "webhook-secret"
+
+
+def _signature_header(event, secret=_SECRET, padding=True):
+    payload = json.dumps(event).encode("utf8")
+    signature = hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
+    parts = [
+        base64.urlsafe_b64encode(part).decode("ascii")
+        for part in (signature.encode("ascii"), payload)
+    ]
+    if not padding:
+        parts = [part.rstrip("=") for part in parts]
+    return ".".join(parts)
+
+
+def _event(key="xxx"):
+    return {"type": EVENT_PROFILE_PARSE_SUCCESS, "profile": {"key": key, "t": "é?>"}}
+
+
+@pytest.mark.webhook
+def test_webhook_decode_request():
+    client = SimpleNamespace(webhook_secret=_SECRET)
+    webhook = Webhook(client)
+    assert webhook._decode_request(_signature_header(_event())) == _event()
+    assert webhook._decode_request(_signature_header(_event(), padding=False)) == (
+        _event()
+    )
+    with pytest.raises(ValueError):
+        webhook._decode_request(_signature_header(_event(), secret="other"))
+    with pytest.raises(ValueError):
+        webhook._decode_request("not a signature")
+
+    # the HMAC is keyed again when the secret changes
+    client.webhook_secret = "other"
+    assert webhook._decode_request(_signature_header(_event(), secret="other"))
+    with pytest.raises(ValueError):
+        webhook._decode_request(_signature_header(_event()))
+
+
+@pytest.mark.webhook
+def test_webhook_handle():
+    webhook = Webhook(SimpleNamespace(webhook_secret=_SECRET))
+    received = []
+    webhook.setHandler(EVENT_PROFILE_PARSE_SUCCESS, received.append)
+    webhook.handle({SIGNATURE_HEADER: _signature_header(_event())})
+    assert received == [_event()]
+    assert webhook._strtr("a-b_c", "-_", "+") == "a+b_c"
+
+
+@pytest.mark.webhook
+def test_webhook_receiver_concurrency_limits():
+    webhook = Webhook(SimpleNamespace(webhook_secret=_SECRET))
+    lock = threading.Lock()
+    running = {"current": 0, "max": 0}
+    handled = []
+
+    def slow_handler(event):
+        with lock:
+            running["current"] += 1
+            running["max"] = max(running["max"], running["current"])
+        time.sleep(0.01)
+        with lock:
+            running["current"] -= 1
+            handled.append(event["profile"]["key"])
+
+    webhook.setHandler(EVENT_PROFILE_PARSE_SUCCESS, slow_handler)
+    webhook.setHandler(EVENT_PROFILE_PARSE_ERROR, lambda event: 1 / 0)
+    errors = []
+    with webhook.receiver(
+        max_workers=4,
+        concurrency_limits={EVENT_PROFILE_PARSE_SUCCESS: 2},
+        on_error=lambda event, error: errors.append(error),
+    ) as receiver:
+        for index in range(20):
+            assert receiver.receive(signature_header=_signature_header(_event(index)))
+        receiver.submit({"type": EVENT_PROFILE_PARSE_ERROR})
+        with pytest.raises(ValueError):
+            receiver.receive(signature_header=_signature_header(_event(), "other"))
+        assert receiver.join(timeout=5)
+
+    assert sorted(handled) == list(range(20))
+    assert running["max"] == 2
+    assert len(errors) == 1 and isinstance(errors[0], ZeroDivisionError)
+    assert receiver.stats == {"received": 21, "handled": 20, "failed": 1}
+
+
+@pytest.mark.webhook
+def test_webhook_receiver_backpressure():
+    webhook = Webhook(SimpleNamespace(webhook_secret=_SECRET))
+    release = threading.Event()
+    webhook.setHandler(EVENT_PROFILE_PARSE_SUCCESS, lambda event: release.wait())
+    receiver = webhook.receiver(max_queue_size=2, max_workers=1)
+    header = _signature_header(_event())
+    assert receiver.receive(signature_header=header)
+    assert receiver.receive(signature_header=header)
+    assert not receiver.receive(signature_header=header)
+    release.set()
+    receiver.close()
+    assert receiver.stats == {"received": 2, "handled": 2, "rejected": 1}
+    with pytest.raises(ValueError):
+        receiver.receive(signature_header=header)
+
+
+@pytest.mark.webhook
+def test_webhook_receiver_close_without_waiting():
+    webhook = Webhook(SimpleNamespace(webhook_secret=_SECRET))
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_handler(event):
+        started.set()
+        release.wait()
+
+    webhook.setHandler(EVENT_PROFILE_PARSE_SUCCESS, blocking_handler)
+    webhook.setBatchHandler(
+        EVENT_PROFILE_PARSE_ERROR, lambda events: None, max_size=10, max_wait=60
+    )
+    receiver = webhook.receiver(max_queue_size=5, max_workers=1)
+    for index in range(3):
+        assert receiver.receive(signature_header=_signature_header(_event(index)))
+    assert receiver.submit({"type": EVENT_PROFILE_PARSE_ERROR})
+    assert started.wait(timeout=5)
+    threading.Timer(0.05, release.set).start()
+    receiver.close(wait=False)
+
+    # the queued event and the pending batch are dropped and accounted for
+    assert receiver.join(timeout=1)
+    assert receiver.stats == {"received": 4, "handled": 1, "dropped": 3}
+    assert all(receiver._slots.acquire(blocking=False) for _ in range(5))
+
+
+@pytest.mark.webhook
+def test_webhook_async_and_batch_handlers():
+    webhook = Webhook(SimpleNamespace(webhook_secret=_SECRET))
+    received = []
+
+    async def async_handler(event, event_name):
+        await asyncio.sleep(0)
+        received.append((event_name, event["profile"]["key"]))
+
+    webhook.setHandler(EVENT_PROFILE_PARSE_SUCCESS, async_handler)
+    webhook.handle(signature_header=_signature_header(_event(1)))
+    asyncio.run(webhook.handle_async(signature_header=_signature_header(_event(2))))
+    assert received == [
+        (EVENT_PROFILE_PARSE_SUCCESS, 1),
+        (EVENT_PROFILE_PARSE_SUCCESS, 2),
+    ]
+
+    async def handle_in_loop():
+        webhook.handle(signature_header=_signature_header(_event(3)))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(handle_in_loop())
+    assert len(received) == 2
+
+    batches = []
+    webhook.setBatchHandler(
+        EVENT_PROFILE_PARSE_SUCCESS,
+        lambda events: batches.append([e["profile"]["key"] for e in events]),
+        max_size=3,
+        max_wait=60,
+    )
+    for index in range(4):
+        webhook.handle(signature_header=_signature_header(_event(index)))
+    assert batches == [[0, 1, 2]]
+    webhook.flush()
+    assert batches == [[0, 1, 2], [3]]
+
+    async def handle_batch_async():
+        for index in range(4, 7):
+            await webhook.handle_async(
+                signature_header=_signature_header(_event(index))
+            )
+
+    asyncio.run(handle_batch_async())
+    assert batches[-1] == [4, 5, 6]
+    with pytest.raises(TypeError):
+        webhook.setBatchHandler(EVENT_PROFILE_PARSE_SUCCESS, None)
+
+
+@pytest.mark.webhook
+def test_webhook_receiver_async_batch_handler():
+    webhook = Webhook(SimpleNamespace(webhook_secret=_SECRET))
+    batches = []
+
+    async def batch_handler(events):
+        await asyncio.sleep(0)
+        batches.append(sorted(event["profile"]["key"] for event in events))
+
+    webhook.setBatchHandler(
+        EVENT_PROFILE_PARSE_SUCCESS, batch_handler, max_size=4, max_wait=0.05
+    )
+    with webhook.receiver(max_workers=2) as receiver:
+        for index in range(6):
+            receiver.receive(signature_header=_signature_header(_event(index)))
+        # the last 2 events are flushed by the time window
+        assert receiver.join(timeout=5)
+        assert batches == [[0, 1, 2, 3], [4, 5]]
+        receiver.receive(signature_header=_signature_header(_event(6)))
+    # and the pending events when closing
+    assert batches[-1] == [6]
+    assert receiver.stats == {"received": 7, "handled": 7}
+
+    # the pending events go to the batch handler being replaced
+    single = []
+    with webhook.receiver(max_workers=2) as receiver:
+        webhook.setBatchHandler(
+            EVENT_PROFILE_PARSE_SUCCESS, batch_handler, max_size=4, max_wait=60
+        )
+        receiver.receive(signature_header=_signature_header(_event(7)))
+        webhook.setHandler(EVENT_PROFILE_PARSE_SUCCESS, single.append)
+        receiver.receive(signature_header=_signature_header(_event(8)))
+        assert receiver.join(timeout=5)
+    assert batches[-1] == [7]
+    assert [event["profile"]["key"] for event in single] == [8]
+
+
+class _ParsingClient:
+    """Client whose profile/parsing endpoint finds the parsing after a delay"""
+
+    def __init__(self, parsed_after):
+        self.webhook_secret = _SECRET
+        self.webhooks = Webhook(self)
+        self.parsed_after = parsed_after
+        self.calls = 0
+
+    def get(self, resource_endpoint, query_params={}):
+        self.calls += 1
+        found = self.calls > self.parsed_after
+        content = {"code": 200 if found else 404, "data": query_params}
+        return SimpleNamespace(
+            headers={"Content-Type": "application/json"},
+            content=json.dumps(content).encode(),
+        )
+
+
+@pytest.mark.webhook
+def test_parsing_wait_polling():
+    client = _ParsingClient(parsed_after=3)
+    waiter = ParsingWaiter(ProfileParsing(client), poll_interval=0.01, backoff=2)
+    response = waiter.wait("source", key="xxx", timeout=5).result(timeout=5)
+    assert response["code"] == 200 and response["data"]["key"] == "xxx"
+    assert client.calls == 4
+    # the polling thread stops once no wait is pending, and starts again
+    thread = waiter._thread
+    if thread is not None:
+        thread.join(timeout=5)
+    assert waiter._thread is None
+    waiter.wait("source", key="xxx", timeout=5).result(timeout=5)
+
+    client = _ParsingClient(parsed_after=100)
+    waiter = ParsingWaiter(ProfileParsing(client), poll_interval=0.01)
+    with pytest.raises(TimeoutError):
+        waiter.wait("source", key="xxx", timeout=0.1).result(timeout=5)
+
+
+@pytest.mark.webhook
+def test_parsing_wait_webhook():
+    client = _ParsingClient(parsed_after=1)
+    parsing = ProfileParsing(client)
+    other_receiver = client.webhooks.receiver()
+    with client.webhooks.receiver():
+        # still received by the other receiver
+        other_receiver.close()
+        assert client.webhooks.listening
+        future = parsing.wait("source", reference="ref", timeout=5)
+        time.sleep(0.05)
+        # only checked once while waiting for the webhook
+        assert not future.done() and client.calls == 1
+        event = {"type": EVENT_PROFILE_PARSE_SUCCESS, "profile": {"reference": "ref"}}
+        client.webhooks.handle(signature_header=_signature_header(event))
+        assert future.result(timeout=5)["code"] == 200
+
+        async def wait_error():
+            return await parsing.wait_async("source", key="yyy", timeout=5)
+
+        client.parsed_after = 100
+        event = {"type": EVENT_PROFILE_PARSE_ERROR, "profile": {"key": "yyy"}}
+        threading.Timer(
+            0.05,
+            client.webhooks.handle,
+            (),
+            {"signature_header": _signature_header(event)},
+        ).start()
+        with pytest.raises(ValueError):
+            asyncio.run(wait_error())
+    assert not client.webhooks.listening
+
+
+@pytest.mark.webhook
+def test_dedup_caches(tmp_path):
+    cache = MemoryDedupCache(max_size=2, ttl=0.05)
+    assert cache.add("a") and not cache.add("a") and cache.seen("a")
+    cache.add("b")
+    cache.add("c")
+    assert not cache.seen("a") and len(cache) == 2
+    time.sleep(0.06)
+    assert not cache.seen("b") and cache.add("b")
+
+    cache = SqliteDedupCache(str(tmp_path / "dedup.db"), max_size=2)
+    assert cache.add("a") and not cache.add("a")
+    cache.add("b")
+    cache.add("c")
+    assert not cache.seen("a") and cache.seen("c")
+    cache.discard("c")
+    # persisted
+    cache = SqliteDedupCache(str(tmp_path / "dedup.db"), max_size=2)
+    assert cache.seen("b") and not cache.seen("c")
+
+
+@pytest.mark.webhook
+def test_webhook_dedup(monkeypatch):
+    webhook = Webhook(SimpleNamespace(webhook_secret=_SECRET))
+    webhook.dedup_cache = MemoryDedupCache()
+    received = []
+    webhook.setHandler(EVENT_PROFILE_PARSE_SUCCESS, received.append)
+    decoded = []
+
+    def loads(data):
+        decoded.append(data)
+        return json.loads(data)
+
+    monkeypatch.setattr(hrflow.webhook, "loads", loads)
+    header = _signature_header(_event(1))
+    webhook.handle(signature_header=header)
+    webhook.handle(signature_header=header)
+    assert len(received) == 1
+    # the repeated delivery is dropped before decoding its JSON
+    assert len(decoded) == 1
+    # a forged delivery does not prevent the genuine one
+    forged = _signature_header(_event(2), secret="other")
+    with pytest.raises(ValueError):
+        webhook.handle(signature_header=forged)
+    # nor is a forged payload taken for a delivery of a known signature
+    replayed = header.split(".")[0] + "." + _signature_header(_event(3)).split(".")[1]
+    with pytest.raises(ValueError):
+        webhook.handle(signature_header=replayed)
+
+    # a delivery whose handler failed is handled again
+    def failing_handler(event):
+        raise RuntimeError()
+
+    webhook.setHandler(EVENT_PROFILE_PARSE_SUCCESS, failing_handler)
+    with pytest.raises(RuntimeError):
+        webhook.handle(signature_header=_signature_header(_event(2)))
+    webhook.setHandler(EVENT_PROFILE_PARSE_SUCCESS, received.append)
+    webhook.handle(signature_header=_signature_header(_event(2)))
+    assert len(received) == 2
+
+    with webhook.receiver() as receiver:
+        assert receiver.receive(signature_header=header)
+    assert receiver.stats == {"duplicates": 1}